@@ -0,0 +1,101 @@
+"""Compare two benchmark result files.
+
+Usage::
+
+    python benchmarks/compare.py benchmarks/results/old.json benchmarks/results/new.json
+
+Exits with status 1 if a metric of the new results is worse than the old one
+by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+
+# metrics where lower is better, as path within a result
+METRICS = {
+    "cycle median (s)": ("update_cycle_seconds", "median"),
+    "cycle p95 (s)": ("update_cycle_seconds", "p95"),
+    "loop blocked (s)": ("loop_blocking", "total_seconds"),
+    "writes/cycle": ("state_writes_per_cycle",),
+    "bytes/plant": ("memory_bytes_per_plant",),
+}
+
+
+def _get_metric(result: dict, path: tuple) -> float | None:
+    value = result
+
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+
+        value = value[key]
+
+    return value
+
+
+def compare(old: dict, new: dict, threshold: float) -> bool:
+    """Print the changes of all metrics
+
+    :param old: The reference results
+    :type old: dict
+    :param new: The new results
+    :type new: dict
+    :param threshold: Relative change that is considered a regression
+    :type threshold: float
+    :return: Whether a regression was found
+    :rtype: bool
+    """
+    old_results = {result["plants"]: result for result in old["results"]}
+    regression = False
+
+    print(f"{old['version']} -> {new['version']}")
+
+    for new_result in new["results"]:
+        old_result = old_results.get(new_result["plants"])
+
+        if not old_result:
+            continue
+
+        print(f"{new_result['plants']} plants")
+
+        for name, path in METRICS.items():
+            old_value = _get_metric(old_result, path)
+            new_value = _get_metric(new_result, path)
+
+            if old_value is None or new_value is None:
+                continue
+
+            change = (new_value - old_value) / old_value if old_value else 0.0
+            marker = ""
+
+            # very small absolute values (f.e. no loop blocking) are not compared
+            if change > threshold and new_value - old_value > 1e-3:
+                marker = "  REGRESSION"
+                regression = True
+
+            print(f"  {name:<18} {old_value:>12.4f} {new_value:>12.4f} {change:>+8.1%}{marker}")
+
+    return regression
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("old", type=pathlib.Path, help="The reference results")
+    parser.add_argument("new", type=pathlib.Path, help="The new results")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative change considered a regression"
+    )
+    args = parser.parse_args()
+
+    old = json.loads(args.old.read_text())
+    new = json.loads(args.new.read_text())
+
+    sys.exit(1 if compare(old, new, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
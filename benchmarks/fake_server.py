@@ -0,0 +1,276 @@
+"""Local stand-in for the FusionSolar API used by the benchmarks"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import json
+import random
+import secrets
+
+from aiohttp import web
+
+# FusionSolar reports the data of a day in 5 minute slots
+SLOT_COUNT = 288
+SESSION_COOKIE = "bspsession"
+
+
+class FakeFusionSolarServer:
+    """Simulates the FusionSolar endpoints used by FusionSolarAsyncClient.
+
+    The server simulates any number of plants. The latency of every response,
+    the rate of failing requests and the rate of failing logins can be set.
+    A part of the plants changes its values with every request, the others
+    always report the same values. The server also accepts InfluxDB writes,
+    so the exporter can be run against it.
+    """
+
+    def __init__(
+        self,
+        plant_count: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        login_failure_rate: float = 0.0,
+        changing_ratio: float = 0.5,
+        filled_slots: int = 144,
+        seed: int | None = None,
+    ) -> None:
+        """Create a new FakeFusionSolarServer
+
+        :param plant_count: Number of simulated plants
+        :type plant_count: int
+        :param latency: Delay of every response (in seconds)
+        :type latency: float
+        :param jitter: Maximum random delay added to the latency (in seconds)
+        :type jitter: float
+        :param error_rate: Share of data requests that fail with a server error
+        :type error_rate: float
+        :param login_failure_rate: Share of logins that fail with a server error
+        :type login_failure_rate: float
+        :param changing_ratio: Share of plants whose values change with every request
+        :type changing_ratio: float
+        :param filled_slots: Number of 5 minute slots of the day that already have data
+        :type filled_slots: int
+        :param seed: Seed of the random generator, defaults to a random seed
+        :type seed: int, optional
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.login_failure_rate = login_failure_rate
+        self.changing_ratio = changing_ratio
+        self.filled_slots = min(filled_slots, SLOT_COUNT)
+
+        # number of requests by endpoint
+        self.request_counts: Counter = Counter()
+        # number of points received through the InfluxDB write endpoint
+        self.written_points = 0
+
+        self._random = random.Random(seed)
+        self._sessions: set[str] = set()
+        self._plant_requests: Counter = Counter()
+        self._runner: web.AppRunner | None = None
+        self._x_axis = [
+            f"2024-01-01 {slot // 12:02d}:{slot % 12 * 5:02d}" for slot in range(SLOT_COUNT)
+        ]
+
+        self.set_plant_count(plant_count)
+
+    def set_plant_count(self, plant_count: int) -> None:
+        """Change the number of simulated plants
+
+        :param plant_count: The new number of plants
+        :type plant_count: int
+        """
+        self.plant_ids = [f"NE={100000 + index}" for index in range(plant_count)]
+        self._changing_plants = set(
+            self.plant_ids[: round(plant_count * self.changing_ratio)]
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start the server
+
+        :param host: The host to listen on
+        :type host: str
+        :param port: The port to listen on, defaults to a free port
+        :type port: int
+        :return: The server's base URL
+        :rtype: str
+        """
+        app = web.Application()
+        app.add_routes(
+            [
+                web.post("/unisso/v2/validateUser.action", self._handle_login),
+                web.get("/rest/neteco/web/organization/v2/company/current", self._handle_company),
+                web.get("/unisess/v1/auth/session", self._handle_session),
+                web.get("/unisess/v1/logout", self._handle_logout),
+                web.get("/rest/pvms/web/station/v1/station/total-real-kpi", self._handle_kpi),
+                web.post("/rest/pvms/web/station/v1/station/station-list", self._handle_station_list),
+                web.get("/rest/pvms/web/station/v1/overview/energy-balance", self._handle_energy_balance),
+                web.post("/api/v2/write", self._handle_write),
+            ]
+        )
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _delay(self, endpoint: str) -> None:
+        """Count the request and simulate the latency"""
+        self.request_counts[endpoint] += 1
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _fails(self, rate: float) -> bool:
+        """Randomly decide whether a request fails"""
+        return rate > 0 and self._random.random() < rate
+
+    def _is_authenticated(self, request: web.Request) -> bool:
+        """Whether the request carries a valid session"""
+        return request.cookies.get(SESSION_COOKIE) in self._sessions
+
+    async def _handle_login(self, request: web.Request) -> web.Response:
+        await self._delay("login")
+
+        if self._fails(self.login_failure_rate):
+            return web.Response(status=503, text="Service unavailable")
+
+        token = secrets.token_hex(16)
+        self._sessions.add(token)
+
+        response = web.json_response({"errorCode": None, "errorMsg": None})
+        response.set_cookie(SESSION_COOKIE, token)
+
+        return response
+
+    async def _handle_company(self, request: web.Request) -> web.Response:
+        await self._delay("company")
+
+        # an expired session returns the HTML login page
+        if not self._is_authenticated(request):
+            return web.Response(text="<html></html>")
+
+        return web.Response(text=json.dumps({"data": {"moDn": "NE=1"}}))
+
+    async def _handle_session(self, request: web.Request) -> web.Response:
+        await self._delay("session")
+
+        return web.json_response({"csrfToken": secrets.token_hex(8)})
+
+    async def _handle_logout(self, request: web.Request) -> web.Response:
+        await self._delay("logout")
+
+        self._sessions.discard(request.cookies.get(SESSION_COOKIE))
+
+        return web.Response(text="")
+
+    async def _handle_kpi(self, request: web.Request) -> web.Response:
+        await self._delay("power_status")
+
+        if not self._is_authenticated(request):
+            return web.Response(text="<html></html>")
+
+        if self._fails(self.error_rate):
+            return web.Response(status=500)
+
+        current_power = round(self._random.uniform(0, 5 * len(self.plant_ids)), 3)
+
+        return web.json_response(
+            {
+                "data": {
+                    "currentPower": str(current_power),
+                    "dailyEnergy": str(round(10.0 * len(self.plant_ids), 2)),
+                    "cumulativeEnergy": str(round(1000.0 * len(self.plant_ids), 2)),
+                }
+            }
+        )
+
+    async def _handle_station_list(self, request: web.Request) -> web.Response:
+        await self._delay("station_list")
+
+        if not self._is_authenticated(request):
+            return web.Response(text="<html></html>")
+
+        body = await request.json()
+        page_size = body.get("pageSize", 10)
+        start = (body.get("curPage", 1) - 1) * page_size
+
+        return web.json_response(
+            {
+                "success": True,
+                "data": {
+                    "list": [{"dn": plant_id} for plant_id in self.plant_ids[start : start + page_size]],
+                    "total": len(self.plant_ids),
+                },
+            }
+        )
+
+    async def _handle_energy_balance(self, request: web.Request) -> web.Response:
+        await self._delay("plant_stats")
+
+        if not self._is_authenticated(request):
+            return web.Response(text="<html></html>")
+
+        plant_id = request.query.get("stationDn")
+
+        if plant_id not in self.plant_ids or self._fails(self.error_rate):
+            return web.json_response({"success": False})
+
+        self._plant_requests[plant_id] += 1
+
+        return web.json_response({"success": True, "data": self._create_plant_stats(plant_id)})
+
+    async def _handle_write(self, request: web.Request) -> web.Response:
+        await self._delay("write")
+
+        if self._fails(self.error_rate):
+            return web.Response(status=503)
+
+        body = await request.text()
+        self.written_points += len([line for line in body.split("\n") if line])
+
+        return web.Response(status=204)
+
+    def _create_plant_stats(self, plant_id: str) -> dict:
+        """Create the day series of a plant"""
+        # changing plants report a higher production with every request
+        offset = self._plant_requests[plant_id] if plant_id in self._changing_plants else 0
+
+        def series(scale: float) -> list[str]:
+            return [
+                f"{(slot + offset) * scale:.3f}" for slot in range(self.filled_slots)
+            ] + ["--"] * (SLOT_COUNT - self.filled_slots)
+
+        return {
+            "xAxis": self._x_axis,
+            "productPower": series(0.01),
+            "usePower": series(0.008),
+            "onGridPower": series(0.004),
+            "disGridPower": series(0.002),
+            "selfUsePower": series(0.006),
+            "totalUsePower": f"{5.5 + offset:.2f}",
+            "totalSelfUsePower": f"{3.0 + offset:.2f}",
+            "totalBuyPower": f"{2.5 + offset:.2f}",
+            "totalOnGridPower": f"{1.0 + offset:.2f}",
+            "buyPowerRatio": "45.00",
+            "selfUsePowerRatioByProduct": "60.00",
+            "totalProductPower": "--",
+            "existInverter": True,
+            "stationDn": plant_id,
+        }
@@ -0,0 +1,326 @@
+"""Replay of recorded FusionSolar API traffic through the coordinator and sensors.
+
+The traffic is recorded by the integration's capture_traffic option (or by
+run_benchmarks.py --capture). The replay runs offline: every request of the
+client is answered with the response that was recorded at the same point of
+the recording.
+
+Usage (from the repository's root directory)::
+
+    python benchmarks/replay.py fusion_solar_<entry id>_traffic.jsonl.gz --speed 0
+
+With --speed 0, the update cycles run back to back, so a whole day of polling
+is replayed in seconds. Any other value replays the recording at that
+multiple of the real speed, including the recorded latencies.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import logging
+import pathlib
+import statistics
+import sys
+import time
+import tracemalloc
+
+import aiohttp
+
+REPOSITORY_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPOSITORY_DIR))
+
+from yarl import URL  # noqa: E402
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+from benchmarks.run_benchmarks import (  # noqa: E402
+    RESULTS_DIR,
+    LoopMonitor,
+    _create_hass,
+    _get_integration_version,
+    _summarize,
+)
+from custom_components.fusion_solar import sensor  # noqa: E402
+from custom_components.fusion_solar.api import FusionSolarAsyncClient  # noqa: E402
+from custom_components.fusion_solar.const import (  # noqa: E402
+    CONF_SHARDED_POLLING,
+    CONF_SLOW_POLL_INTERVAL,
+    COORDINATOR,
+    DOMAIN,
+    PLANT_COORDINATORS,
+    SENSOR_STORE,
+)
+from custom_components.fusion_solar.snapshot_store import (  # noqa: E402
+    FusionSolarSnapshotStore,
+)
+from custom_components.fusion_solar.store import FusionSolarSensorStore  # noqa: E402
+from custom_components.fusion_solar.traffic import (  # noqa: E402
+    Recording,
+    get_request_key,
+    read_recording,
+)
+from custom_components.fusion_solar.update_coordinator import (  # noqa: E402
+    FusionSolarCoordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FusionSolarReplayClient(FusionSolarAsyncClient):
+    """Answers the requests from a recording instead of the FusionSolar API.
+
+    The position within the recording is set by the caller before every
+    update. Requests are answered with the last response recorded up to
+    that position. Recorded errors and timeouts are raised again. The login
+    is not replayed.
+    """
+
+    def __init__(self, recording: Recording, speed: float = 0.0) -> None:
+        """Create a new FusionSolarReplayClient
+
+        :param recording: The recorded traffic
+        :type recording: Recording
+        :param speed: Multiple of the real speed the recorded latencies are replayed
+                      with. 0 answers all requests right away.
+        :type speed: float
+        """
+        super().__init__(None, "replay", "replay", cache_size=0, rate_limit=0)
+
+        self.recording = recording
+        self.speed = speed
+        # time since the start of the recording (in seconds)
+        self.position = 0.0
+        self.unknown_requests = 0
+
+    async def _login(self) -> None:
+        """The recorded session is not needed to replay the responses"""
+        self._logged_in = True
+        self.metrics.record_login()
+
+    async def _send_raw(
+        self,
+        method: str,
+        url: str,
+        params: dict | None = None,
+        json_data: dict | None = None,
+    ) -> str:
+        """Answer a request with its recorded response
+
+        :raises aiohttp.ClientResponseError: For recorded errors and requests
+                                             that were never recorded
+        """
+        path = URL(url).path
+        endpoint = path.rsplit("/", 1)[-1]
+        entry = self.recording.find(
+            get_request_key(method, path, params, json_data), self.position
+        )
+
+        if entry is None:
+            self.unknown_requests += 1
+            self.metrics.record_request(endpoint, 0.0, error=True)
+            raise aiohttp.ClientResponseError(
+                None, (), status=404, message=f"{path} was not recorded"
+            )
+
+        if self.speed:
+            await asyncio.sleep(entry["d"] / self.speed)
+
+        error = entry.get("e")
+
+        if error == "timeout":
+            self.metrics.record_request(endpoint, entry["d"], timeout=True)
+            raise asyncio.TimeoutError
+
+        if error is not None:
+            self.metrics.record_request(endpoint, entry["d"], error=True)
+            raise aiohttp.ClientResponseError(
+                None, (), status=error if isinstance(error, int) else 500
+            )
+
+        self.metrics.record_request(endpoint, entry["d"])
+
+        return self.recording.bodies[entry["b"]]
+
+
+async def run_replay(args: argparse.Namespace) -> dict:
+    """Replay a recording through the coordinator and the sensors
+
+    :param args: The command line arguments
+    :type args: argparse.Namespace
+    :return: The measurements
+    :rtype: dict
+    """
+    recording = await asyncio.get_running_loop().run_in_executor(
+        None, read_recording, args.recording
+    )
+    poll_times = recording.get_poll_times()
+
+    if not poll_times:
+        raise SystemExit(f"{args.recording} does not contain any update cycles")
+
+    # the requests of a cycle are answered with the responses recorded until the next cycle
+    cycle_ends = [poll_time - 0.001 for poll_time in poll_times[1:]] + [recording.duration]
+    cycle_ends = cycle_ends[: args.cycles or None]
+
+    hass = await _create_hass()
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="FusionSolar replay",
+        data={"username": "replay", "password": "replay", "subdomain": "region01eu5"},
+        source="user",
+        # the cycles follow the recording, so every cycle fetches all plants
+        options={CONF_SHARDED_POLLING: False, CONF_SLOW_POLL_INTERVAL: 0},
+    )
+    client = FusionSolarReplayClient(recording, args.speed)
+
+    try:
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        client.position = cycle_ends[0]
+        coordinator = FusionSolarCoordinator(
+            hass, client, entry, FusionSolarSnapshotStore(hass, entry.entry_id)
+        )
+        await coordinator.async_refresh()
+
+        hass.data[DOMAIN] = {
+            entry.entry_id: {
+                COORDINATOR: coordinator,
+                PLANT_COORDINATORS: {},
+                SENSOR_STORE: FusionSolarSensorStore(hass, entry.entry_id),
+            }
+        }
+
+        entity_platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain="sensor",
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=coordinator.update_interval,
+            entity_namespace=None,
+        )
+        entity_platform.config_entry = entry
+
+        await sensor.async_setup_entry(
+            hass,
+            entry,
+            lambda entities: hass.async_create_task(entity_platform.async_add_entities(entities)),
+        )
+        await hass.async_block_till_done()
+
+        memory_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        # the update cycles at the recorded times
+        cycle_durations = []
+        failed_cycles = 0
+
+        monitor = LoopMonitor()
+        monitor.start()
+        replay_start = time.perf_counter()
+
+        for cycle_end in cycle_ends[1:]:
+            if args.speed:
+                await asyncio.sleep((cycle_end - client.position) / args.speed)
+
+            client.position = cycle_end
+
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            cycle_durations.append(time.perf_counter() - start)
+
+            if not coordinator.last_update_success:
+                failed_cycles += 1
+
+        replay_duration = time.perf_counter() - replay_start
+        await monitor.stop()
+
+        return {
+            "recording": str(args.recording),
+            "recorded_seconds": recording.duration,
+            "recorded_requests": len(recording.entries),
+            "replay_seconds": replay_duration,
+            "plants": len(coordinator.plant_ids or []),
+            "entities": len(entity_platform.entities),
+            "cycles": len(cycle_ends),
+            "failed_cycles": failed_cycles,
+            "unknown_requests": client.unknown_requests,
+            "update_cycle_seconds": _summarize(cycle_durations),
+            "loop_blocking": {
+                "total_seconds": monitor.blocked_time,
+                "max_seconds": monitor.max_block,
+                "count": monitor.block_count,
+            },
+            "state_writes_per_cycle": statistics.fmean(coordinator.metrics.writes)
+            if coordinator.metrics.writes
+            else 0,
+            "memory_bytes_per_plant": (memory_after - memory_before)
+            / max(len(coordinator.plant_ids or []), 1),
+            "counter_validation": coordinator.counter_validator.as_dict(),
+        }
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        await hass.async_stop(force=True)
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("recording", type=pathlib.Path, help="The recorded traffic (.jsonl.gz)")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="Multiple of the real speed. 0 runs the update cycles back to back",
+    )
+    parser.add_argument(
+        "--cycles", type=int, default=0, help="Only replay the first update cycles (0 replays all)"
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="Path of the JSON results")
+    parser.add_argument("--verbose", action="store_true", help="Show the integration's log")
+
+    return parser
+
+
+def main() -> None:
+    args = _create_parser().parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    result = asyncio.run(run_replay(args))
+
+    print(
+        f"Replayed {result['recorded_seconds'] / 3600:.1f} h ({result['cycles']} cycles, "
+        f"{result['plants']} plants) in {result['replay_seconds']:.1f} s: "
+        f"cycle {result['update_cycle_seconds'].get('median', 0):.3f} s, "
+        f"loop blocked {result['loop_blocking']['total_seconds']:.3f} s, "
+        f"{result['state_writes_per_cycle']:.0f} writes/cycle"
+    )
+
+    results = {
+        "version": _get_integration_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "parameters": {"speed": args.speed, "cycles": args.cycles},
+        "results": [result],
+    }
+
+    output = args.output or RESULTS_DIR / (
+        f"replay_{results['version']}_{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
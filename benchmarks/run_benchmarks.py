@@ -0,0 +1,493 @@
+"""Benchmarks of the FusionSolar coordinator and sensors against a local fake API.
+
+Usage (from the repository's root directory)::
+
+    python benchmarks/run_benchmarks.py --plants 1,10,100,500 --latency 0.05
+
+The results are written as JSON to benchmarks/results/ and can be compared
+with benchmarks/compare.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import json
+import logging
+import pathlib
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import aiohttp
+
+REPOSITORY_DIR = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPOSITORY_DIR))
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant import loader  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+)
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+from benchmarks.fake_server import FakeFusionSolarServer  # noqa: E402
+from custom_components.fusion_solar import sensor  # noqa: E402
+from custom_components.fusion_solar.api import FusionSolarAsyncClient  # noqa: E402
+from custom_components.fusion_solar.const import (  # noqa: E402
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_REDUCE_RECORDER_WRITES,
+    CONF_SHARDED_POLLING,
+    CONF_SLOW_POLL_INTERVAL,
+    COORDINATOR,
+    DOMAIN,
+    PLANT_COORDINATORS,
+    SENSOR_STORE,
+)
+from custom_components.fusion_solar.exporter import (  # noqa: E402
+    FusionSolarExporter,
+    InfluxDBSink,
+)
+from custom_components.fusion_solar.response_cache import DEFAULT_MAX_SIZE  # noqa: E402
+from custom_components.fusion_solar.snapshot_store import (  # noqa: E402
+    FusionSolarSnapshotStore,
+)
+from custom_components.fusion_solar.store import FusionSolarSensorStore  # noqa: E402
+from custom_components.fusion_solar.traffic import TrafficRecorder  # noqa: E402
+from custom_components.fusion_solar.update_coordinator import (  # noqa: E402
+    FusionSolarCoordinator,
+    FusionSolarPlantCoordinator,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PLANT_COUNTS = [1, 10, 50, 100, 250, 500]
+RESULTS_DIR = REPOSITORY_DIR / "benchmarks" / "results"
+
+
+class LoopMonitor:
+    """Measures how long the event loop was blocked.
+
+    A task sleeps for a short interval and records how much later than
+    expected it woke up.
+    """
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.01) -> None:
+        """Create a new LoopMonitor
+
+        :param interval: Interval of the probes (in seconds)
+        :type interval: float
+        :param threshold: Delays below this threshold are not counted as blocking (in seconds)
+        :type threshold: float
+        """
+        self._interval = interval
+        self._threshold = threshold
+        self._task: asyncio.Task | None = None
+        self.blocked_time = 0.0
+        self.max_block = 0.0
+        self.block_count = 0
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            delay = time.perf_counter() - expected
+
+            if delay > self._threshold:
+                self.blocked_time += delay
+                self.max_block = max(self.max_block, delay)
+                self.block_count += 1
+
+    def start(self) -> None:
+        """Start monitoring"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop monitoring"""
+        if self._task:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+def _summarize(values: list[float]) -> dict:
+    """Summary statistics of a list of measurements"""
+    if not values:
+        return {}
+
+    ordered = sorted(values)
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "max": ordered[-1],
+    }
+
+
+async def _create_hass() -> HomeAssistant:
+    """Create a minimal Home Assistant instance that can hold entities"""
+    hass = HomeAssistant(tempfile.mkdtemp(prefix="fusion_solar_benchmark_"))
+    hass.config.latitude, hass.config.longitude = 48.2, 16.4
+
+    loader.async_setup(hass)
+    entity.async_setup(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+
+    return hass
+
+
+async def run_scenario(plant_count: int, args: argparse.Namespace) -> dict:
+    """Run the benchmark for a single number of plants
+
+    :param plant_count: Number of simulated plants
+    :type plant_count: int
+    :param args: The command line arguments
+    :type args: argparse.Namespace
+    :return: The measurements
+    :rtype: dict
+    """
+    server = FakeFusionSolarServer(
+        plant_count=plant_count,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        login_failure_rate=args.login_failure_rate,
+        changing_ratio=args.changing_ratio,
+        seed=args.seed,
+    )
+    base_url = await server.start()
+
+    hass = await _create_hass()
+    entry = ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="FusionSolar benchmark",
+        data={"username": "benchmark", "password": "benchmark", "subdomain": "region01eu5"},
+        source="user",
+        options={
+            CONF_MAX_CONCURRENT_REQUESTS: args.max_concurrent_requests,
+            CONF_SHARDED_POLLING: args.sharded,
+            CONF_SLOW_POLL_INTERVAL: args.slow_poll_interval,
+            CONF_REDUCE_RECORDER_WRITES: args.reduce_recorder_writes,
+        },
+    )
+
+    # cookies of IP addresses are only accepted by an unsafe cookie jar
+    session = aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True))
+    # without the response cache, every cycle sends all requests
+    client = FusionSolarAsyncClient(
+        session,
+        "benchmark",
+        "benchmark",
+        base_url=base_url,
+        cache_size=DEFAULT_MAX_SIZE if args.response_cache else 0,
+        rate_limit=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+    )
+
+    # the traffic of the fake server can be replayed with replay.py
+    if args.capture:
+        client.traffic_recorder = TrafficRecorder(
+            args.capture.with_name(f"{args.capture.name.split('.')[0]}_{plant_count}.jsonl.gz")
+        )
+
+    # count the state writes of all sensors
+    state_writes = 0
+    state_changes = 0
+    original_write = sensor.FusionSolarSensor.async_write_ha_state
+
+    def counting_write(self) -> None:
+        nonlocal state_writes
+        state_writes += 1
+        original_write(self)
+
+    def count_state_change(event) -> None:
+        nonlocal state_changes
+        state_changes += 1
+
+    sensor.FusionSolarSensor.async_write_ha_state = counting_write
+    hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_change)
+
+    try:
+        # the memory is measured for the setup: the coordinators, the first data and the entities
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+
+        coordinator = FusionSolarCoordinator(
+            hass, client, entry, FusionSolarSnapshotStore(hass, entry.entry_id)
+        )
+        await coordinator.async_refresh()
+
+        plant_coordinators = {}
+
+        if coordinator.sharded:
+            plant_coordinators = {
+                plant_id: FusionSolarPlantCoordinator(hass, coordinator, plant_id)
+                for plant_id in coordinator.plant_ids or []
+            }
+            await asyncio.gather(
+                *[plant_coordinator.async_refresh() for plant_coordinator in plant_coordinators.values()]
+            )
+
+        # the exporter writes to the fake server's InfluxDB endpoint
+        exporter = None
+
+        if args.export:
+            exporter = FusionSolarExporter(
+                hass, entry.entry_id, InfluxDBSink(session, f"{base_url}/api/v2/write")
+            )
+
+            for export_coordinator in [coordinator, *plant_coordinators.values()]:
+                exporter.async_add_coordinator(export_coordinator)
+
+        hass.data[DOMAIN] = {
+            entry.entry_id: {
+                COORDINATOR: coordinator,
+                PLANT_COORDINATORS: plant_coordinators,
+                SENSOR_STORE: FusionSolarSensorStore(hass, entry.entry_id),
+            }
+        }
+
+        entity_platform = EntityPlatform(
+            hass=hass,
+            logger=_LOGGER,
+            domain="sensor",
+            platform_name=DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        entity_platform.config_entry = entry
+
+        await sensor.async_setup_entry(
+            hass,
+            entry,
+            lambda entities: hass.async_create_task(entity_platform.async_add_entities(entities)),
+        )
+        await hass.async_block_till_done()
+
+        memory_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        entity_count = len(entity_platform.entities)
+
+        # the update cycles
+        cycle_durations = []
+        cycle_writes = []
+        cycle_changes = []
+        failed_cycles = 0
+
+        monitor = LoopMonitor()
+        monitor.start()
+
+        for _ in range(args.cycles):
+            writes_before = state_writes
+            changes_before = state_changes
+
+            start = time.perf_counter()
+            await coordinator.async_refresh()
+            await asyncio.gather(
+                *[plant_coordinator.async_refresh() for plant_coordinator in plant_coordinators.values()]
+            )
+            await hass.async_block_till_done()
+            cycle_durations.append(time.perf_counter() - start)
+
+            if exporter:
+                await exporter.async_flush()
+
+            if not coordinator.last_update_success:
+                failed_cycles += 1
+
+            cycle_writes.append(state_writes - writes_before)
+            cycle_changes.append(state_changes - changes_before)
+
+        await monitor.stop()
+
+        if exporter:
+            await exporter.async_stop()
+
+        return {
+            "plants": plant_count,
+            "entities": entity_count,
+            "cycles": args.cycles,
+            "failed_cycles": failed_cycles,
+            "deferred_writes": sum(
+                plant_coordinator.metrics.deferred_writes
+                for plant_coordinator in [coordinator, *plant_coordinators.values()]
+            ),
+            "failed_plant_fetches": sum(
+                plant_coordinator.failed_plant_fetches
+                for plant_coordinator in [coordinator, *plant_coordinators.values()]
+            ),
+            "update_cycle_seconds": _summarize(cycle_durations),
+            "loop_blocking": {
+                "total_seconds": monitor.blocked_time,
+                "max_seconds": monitor.max_block,
+                "count": monitor.block_count,
+            },
+            "state_writes_per_cycle": statistics.fmean(cycle_writes) if cycle_writes else 0,
+            "state_changes_per_cycle": statistics.fmean(cycle_changes) if cycle_changes else 0,
+            "memory_bytes_per_plant": (memory_after - memory_before) / max(plant_count, 1),
+            "requests": dict(server.request_counts),
+            "merged_requests": client.merged_requests,
+            "cache": client.cache.as_dict(),
+            "rate_limiter": client.rate_limiter.as_dict(),
+            "export": {**exporter.as_dict(), "received_points": server.written_points}
+            if exporter
+            else None,
+        }
+    finally:
+        sensor.FusionSolarSensor.async_write_ha_state = original_write
+
+        if client.traffic_recorder:
+            await client.traffic_recorder.async_flush()
+
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        await session.close()
+        await hass.async_stop(force=True)
+        await server.stop()
+
+
+def _get_integration_version() -> str:
+    """Version of the integration from its manifest"""
+    manifest_path = REPOSITORY_DIR / "custom_components" / DOMAIN / "manifest.json"
+
+    return json.loads(manifest_path.read_text())["version"]
+
+
+def _parse_plant_counts(value: str) -> list[int]:
+    """Parse a comma separated list of plant counts"""
+    return [int(count) for count in value.split(",") if count.strip()]
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--plants",
+        type=_parse_plant_counts,
+        default=DEFAULT_PLANT_COUNTS,
+        help="Comma separated numbers of plants to benchmark",
+    )
+    parser.add_argument("--cycles", type=int, default=5, help="Update cycles per plant count")
+    parser.add_argument("--latency", type=float, default=0.05, help="Response latency (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum random latency added (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of failing data requests")
+    parser.add_argument("--login-failure-rate", type=float, default=0.0, help="Share of failing logins")
+    parser.add_argument(
+        "--changing-ratio",
+        type=float,
+        default=0.5,
+        help="Share of plants whose values change with every update",
+    )
+    parser.add_argument("--max-concurrent-requests", type=int, default=4)
+    parser.add_argument("--sharded", action="store_true", help="Use sharded polling")
+    parser.add_argument(
+        "--slow-poll-interval",
+        type=int,
+        default=0,
+        help="Interval of the slow polling tier (minutes). With 0, every cycle fetches all plants",
+    )
+    parser.add_argument(
+        "--response-cache", action="store_true", help="Enable the client's response cache"
+    )
+    parser.add_argument(
+        "--reduce-recorder-writes",
+        action="store_true",
+        help="Apply the sensors' write policies (deadbands and minimum write intervals)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=0,
+        help="Requests per minute allowed by the client's rate limiter (0 disables the limit)",
+    )
+    parser.add_argument("--rate-limit-burst", type=int, default=30)
+    parser.add_argument(
+        "--export", action="store_true", help="Export the updates to the fake InfluxDB endpoint"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the simulated errors")
+    parser.add_argument(
+        "--capture",
+        type=pathlib.Path,
+        help="Record the traffic of every scenario to <name>_<plants>.jsonl.gz next to this path",
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="Path of the JSON results")
+    parser.add_argument("--verbose", action="store_true", help="Show the integration's log")
+
+    return parser
+
+
+async def async_main(args: argparse.Namespace, report: Callable[[dict], None]) -> dict:
+    """Run all scenarios
+
+    :param args: The command line arguments
+    :type args: argparse.Namespace
+    :param report: Called with the result of every scenario
+    :type report: Callable[[dict], None]
+    :return: The complete results
+    :rtype: dict
+    """
+    results = []
+
+    for plant_count in args.plants:
+        result = await run_scenario(plant_count, args)
+        report(result)
+        results.append(result)
+
+    return {
+        "version": _get_integration_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": {
+            key: str(value) if isinstance(value, pathlib.Path) else value
+            for key, value in vars(args).items()
+            if key not in ("output", "verbose")
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    args = _create_parser().parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.CRITICAL)
+
+    def report(result: dict) -> None:
+        print(
+            f"{result['plants']:>4} plants: "
+            f"cycle {result['update_cycle_seconds'].get('median', 0):.3f} s, "
+            f"loop blocked {result['loop_blocking']['total_seconds']:.3f} s, "
+            f"{result['state_writes_per_cycle']:.0f} writes/cycle, "
+            f"{result['memory_bytes_per_plant'] / 1024:.1f} KiB/plant"
+        )
+
+    results = asyncio.run(async_main(args, report))
+
+    output = args.output or RESULTS_DIR / (
+        f"{results['version']}_{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,73 @@
 """The FusionSolar integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
-from fusion_solar_py.client import FusionSolarClient
+import aiohttp
 from fusion_solar_py.exceptions import AuthenticationException, FusionSolarException
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import (
+    ConfigEntryAuthFailed,
+    ConfigEntryNotReady,
+    HomeAssistantError,
+)
 from homeassistant.helpers import config_validation as cv, entity_platform, service
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import COORDINATOR, DOMAIN
+from .api import FusionSolarAsyncClient, create_client_session
+from .backfill import FusionSolarBackfill, async_remove_checkpoint
+from .client_registry import async_get_client_registry
+from .const import (
+    BACKFILL,
+    CLIENT_REGISTRY,
+    CONF_BACKFILL_DAYS,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_EXPORT_TARGET,
+    CONF_EXPORT_TOKEN,
+    CONF_EXPORT_TOPIC,
+    CONF_EXPORT_URL,
+    CONF_IMPORT_STATISTICS,
+    CONF_RATE_LIMIT,
+    CONF_RATE_LIMIT_BURST,
+    COORDINATOR,
+    DEFAULT_BACKFILL_DAYS,
+    DEFAULT_CAPTURE_TRAFFIC,
+    DEFAULT_EXPORT_TARGET,
+    DEFAULT_EXPORT_TOKEN,
+    DEFAULT_EXPORT_TOPIC,
+    DEFAULT_EXPORT_URL,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RATE_LIMIT_BURST,
+    DOMAIN,
+    EXPORT_TARGET_INFLUXDB,
+    EXPORT_TARGET_MQTT,
+    EXPORTER,
+    MAX_BACKFILL_DAYS,
+    PLANT_COORDINATORS,
+    SENSOR_STORE,
+    SERVICE_BACKFILL,
+    SESSION_STORE,
+    SNAPSHOT_STORE,
+)
+from .exporter import (
+    FusionSolarExporter,
+    InfluxDBSink,
+    MqttSink,
+    async_remove_spool,
+)
 from .sensor import FusionSolarSensor
-from .update_coordinator import FusionSolarCoordinator
+from .session_store import FusionSolarSessionStore
+from .snapshot_store import FusionSolarSnapshotStore
+from .statistics_import import FusionSolarStatisticsImporter
+from .store import FusionSolarSensorStore
+from .traffic import TrafficRecorder, async_remove_recording, get_recording_path
+from .update_coordinator import FusionSolarCoordinator, FusionSolarPlantCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,39 +75,331 @@ _LOGGER = logging.getLogger(__name__)
 # For your initial PR, limit it to 1 platform.
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+BACKFILL_SCHEMA = vol.Schema(
+    {
+        vol.Optional("days", default=7): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_BACKFILL_DAYS)
+        ),
+        vol.Optional("config_entry_id"): cv.string,
+    }
+)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up FusionSolar from a config entry."""
     # Store an API object for your platforms to access
     _LOGGER.debug("Creating FusionSolarClient")
 
-    # TODO: catch connection exceptions
+    rate_limit = entry.options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT)
+    rate_limit_burst = entry.options.get(CONF_RATE_LIMIT_BURST, DEFAULT_RATE_LIMIT_BURST)
+
+    session_store = FusionSolarSessionStore(hass, entry.entry_id, entry.data["username"])
+
+    # with the data of the last good update, the entities are created without
+    # waiting for the cloud
+    snapshot_store = FusionSolarSnapshotStore(hass, entry.entry_id)
+    snapshot = await snapshot_store.async_load()
+
+    async def async_create_client() -> FusionSolarAsyncClient:
+        """Create a new client, reusing a stored session if possible"""
+        fusion_client = FusionSolarAsyncClient(
+            create_client_session(hass),
+            entry.data["username"],
+            entry.data["password"],
+            entry.data["subdomain"],
+            rate_limit=rate_limit,
+            rate_limit_burst=rate_limit_burst,
+        )
+
+        # a stored session is reused. If it was rejected, the first request logs in again.
+        # When starting from a snapshot, the login is left to the first update.
+        if session_data := await session_store.async_load():
+            _LOGGER.debug("Restoring stored FusionSolar session")
+            fusion_client.restore_session(session_data)
+        elif not snapshot:
+            await fusion_client.login()
+
+        return fusion_client
+
+    # the account's client is shared through the registry. This picks up
+    # the client the config flow just authenticated.
+    client_registry = async_get_client_registry(hass)
+
     try:
-        fusion_client = await hass.async_add_executor_job(
-            FusionSolarClient, entry.data["username"], entry.data["password"], entry.data["subdomain"]
+        fusion_client = await client_registry.async_acquire(
+            entry.data["subdomain"], entry.data["username"], async_create_client
         )
     except AuthenticationException as error:
         raise ConfigEntryAuthFailed from error
+    except (aiohttp.ClientError, asyncio.TimeoutError, FusionSolarException) as error:
+        raise ConfigEntryNotReady from error
+
+    entry.async_on_unload(
+        lambda: client_registry.async_release(fusion_client, entry_id=entry.entry_id)
+    )
+
+    # if the client is shared, the strictest rate limit of its entries applies
+    client_registry.async_set_limits(
+        fusion_client, entry.entry_id, rate_limit / 60, rate_limit_burst
+    )
+
+    # the API traffic can be recorded, so it can be replayed offline
+    if entry.options.get(CONF_CAPTURE_TRAFFIC, DEFAULT_CAPTURE_TRAFFIC):
+        traffic_recorder = TrafficRecorder(get_recording_path(hass, entry.entry_id))
+        fusion_client.traffic_recorder = traffic_recorder
+        _LOGGER.info(f"Recording the API traffic to {traffic_recorder.path}")
+
+        async def async_stop_capture() -> None:
+            """Stop recording and write the remaining requests"""
+            if fusion_client.traffic_recorder is traffic_recorder:
+                fusion_client.traffic_recorder = None
+
+            await traffic_recorder.async_flush()
+
+        entry.async_on_unload(async_stop_capture)
+
+    # store every new session
+    entry.async_on_unload(fusion_client.add_session_listener(session_store.async_save))
+
+    if fusion_client.logged_in:
+        session_store.async_save(fusion_client.export_session())
 
     # create the update coordinator
-    coordinator = FusionSolarCoordinator(hass, fusion_client)
+    coordinator = FusionSolarCoordinator(hass, fusion_client, entry, snapshot_store)
+
+    # missed days can only be backfilled into the statistics
+    backfill = None
+
+    if entry.options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS):
+        coordinator.statistics_importer = FusionSolarStatisticsImporter(hass, entry.entry_id)
+        await coordinator.statistics_importer.async_load()
+
+        backfill_days = entry.options.get(CONF_BACKFILL_DAYS, DEFAULT_BACKFILL_DAYS)
+        backfill = FusionSolarBackfill(
+            hass, entry.entry_id, coordinator, coordinator.statistics_importer, backfill_days
+        )
+        await backfill.async_load()
+
+        if backfill_days:
+            entry.async_on_unload(
+                coordinator.statistics_importer.async_add_gap_listener(
+                    backfill.async_handle_gap
+                )
+            )
+
+    # the data of every update can be exported to a time-series database
+    exporter = None
+    export_target = entry.options.get(CONF_EXPORT_TARGET, DEFAULT_EXPORT_TARGET)
+
+    if export_target == EXPORT_TARGET_INFLUXDB:
+        exporter = FusionSolarExporter(
+            hass,
+            entry.entry_id,
+            InfluxDBSink(
+                async_get_clientsession(hass),
+                entry.options.get(CONF_EXPORT_URL, DEFAULT_EXPORT_URL),
+                entry.options.get(CONF_EXPORT_TOKEN, DEFAULT_EXPORT_TOKEN),
+            ),
+        )
+    elif export_target == EXPORT_TARGET_MQTT:
+        exporter = FusionSolarExporter(
+            hass,
+            entry.entry_id,
+            MqttSink(hass, entry.options.get(CONF_EXPORT_TOPIC, DEFAULT_EXPORT_TOPIC)),
+        )
+
+    if exporter:
+        await exporter.async_load()
+        exporter.async_add_coordinator(coordinator)
 
     # store the coordinator
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {COORDINATOR: coordinator}
+    hass.data[DOMAIN][entry.entry_id] = {
+        COORDINATOR: coordinator,
+        PLANT_COORDINATORS: {},
+        SENSOR_STORE: FusionSolarSensorStore(hass, entry.entry_id),
+        SESSION_STORE: session_store,
+        SNAPSHOT_STORE: snapshot_store,
+        BACKFILL: backfill,
+        EXPORTER: exporter,
+    }
+
+    # get the initial data - unless the snapshot can be used until the first update
+    if snapshot:
+        coordinator.async_restore_snapshot(snapshot)
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    # with sharded polling, every plant gets its own coordinator. A failing
+    # plant only makes its own sensors unavailable.
+    plant_coordinators = {}
+
+    if coordinator.sharded:
+        plant_coordinators = {
+            plant_id: FusionSolarPlantCoordinator(hass, coordinator, plant_id)
+            for plant_id in coordinator.plant_ids
+        }
+        hass.data[DOMAIN][entry.entry_id][PLANT_COORDINATORS] = plant_coordinators
+
+        for plant_id, plant_coordinator in plant_coordinators.items():
+            if exporter:
+                exporter.async_add_coordinator(plant_coordinator)
+
+            if snapshot and plant_id in snapshot["data"]["plants"]:
+                plant_coordinator.async_restore_data(
+                    {"plants": {plant_id: snapshot["data"]["plants"][plant_id]}}, snapshot
+                )
+
+        if not snapshot:
+            await asyncio.gather(
+                *[
+                    plant_coordinator.async_refresh()
+                    for plant_coordinator in plant_coordinators.values()
+                ]
+            )
 
-    # get the initial data
-    await coordinator.async_config_entry_first_refresh()
+        @callback
+        def async_update_plant_coordinators(added: list[str], removed: list[str]) -> None:
+            """Create the coordinators of new plants and drop the removed ones"""
+            for plant_id in removed:
+                plant_coordinator = plant_coordinators.pop(plant_id, None)
+
+                if exporter and plant_coordinator:
+                    exporter.async_remove_coordinator(plant_coordinator)
+
+            for plant_id in added:
+                plant_coordinator = FusionSolarPlantCoordinator(hass, coordinator, plant_id)
+                plant_coordinators[plant_id] = plant_coordinator
+
+                if exporter:
+                    exporter.async_add_coordinator(plant_coordinator)
+
+                entry.async_create_background_task(
+                    hass,
+                    plant_coordinator.async_refresh(),
+                    f"{DOMAIN} {entry.entry_id} {plant_id} first refresh",
+                )
+
+        # registered before the platforms, so the coordinators exist before the entities
+        entry.async_on_unload(
+            coordinator.async_add_plant_listener(async_update_plant_coordinators)
+        )
 
     # create the entities
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # the first real update of a restored entry runs in the background
+    if snapshot:
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_restored(coordinator, plant_coordinators),
+            f"{DOMAIN} {entry.entry_id} first refresh",
+        )
+
+    # an interrupted backfill continues once the API is reachable
+    if backfill:
+        backfill.async_resume()
+        entry.async_on_unload(coordinator.async_add_listener(backfill.async_resume))
+
+    if not hass.services.has_service(DOMAIN, SERVICE_BACKFILL):
+        _async_register_services(hass)
+
+    # reload the entry if the options change
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
 
+async def _async_refresh_restored(
+    coordinator: FusionSolarCoordinator,
+    plant_coordinators: dict[str, FusionSolarPlantCoordinator],
+) -> None:
+    """Run the first update of coordinators that were restored from a snapshot
+
+    :param coordinator: The account's coordinator
+    :type coordinator: FusionSolarCoordinator
+    :param plant_coordinators: The plant coordinators of sharded polling
+    :type plant_coordinators: dict[str, FusionSolarPlantCoordinator]
+    """
+    await coordinator.async_refresh()
+
+    await asyncio.gather(
+        *[
+            plant_coordinator.async_refresh()
+            for plant_coordinator in plant_coordinators.values()
+        ]
+    )
+
+
+@callback
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    """
+
+    async def async_backfill(call: ServiceCall) -> None:
+        """Fetch the given number of past days of all plants into the statistics"""
+        entry_ids = (
+            [call.data["config_entry_id"]]
+            if "config_entry_id" in call.data
+            else [entry_id for entry_id in hass.data[DOMAIN] if entry_id != CLIENT_REGISTRY]
+        )
+
+        for entry_id in entry_ids:
+            if entry_id == CLIENT_REGISTRY or entry_id not in hass.data[DOMAIN]:
+                raise HomeAssistantError(f"Unknown config entry {entry_id}")
+
+            if not (backfill := hass.data[DOMAIN][entry_id][BACKFILL]):
+                raise HomeAssistantError(
+                    "The backfill requires the import of the statistics to be enabled"
+                )
+
+            backfill.async_request_days(call.data["days"])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_BACKFILL, async_backfill, schema=BACKFILL_SCHEMA
+    )
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry after its options were changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        await entry_data[SENSOR_STORE].async_flush()
+        await entry_data[SNAPSHOT_STORE].async_flush()
+
+        if entry_data[BACKFILL]:
+            await entry_data[BACKFILL].async_stop()
+
+        if entry_data[EXPORTER]:
+            await entry_data[EXPORTER].async_stop()
+
+        if entry_data[COORDINATOR].statistics_importer:
+            await entry_data[COORDINATOR].statistics_importer.async_flush()
+
+        # the services are removed with the last entry
+        if not any(entry_id != CLIENT_REGISTRY for entry_id in hass.data[DOMAIN]):
+            hass.services.async_remove(DOMAIN, SERVICE_BACKFILL)
+
+        # Note: The session is not logged out, so the stored session can be
+        #       restored after a reload
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a removed config entry"""
+    await FusionSolarSessionStore(hass, entry.entry_id, entry.data["username"]).async_remove()
+    await FusionSolarSnapshotStore(hass, entry.entry_id).async_remove()
+    await FusionSolarSensorStore(hass, entry.entry_id).async_remove()
+    await FusionSolarStatisticsImporter(hass, entry.entry_id).async_remove()
+    await async_remove_checkpoint(hass, entry.entry_id)
+    await async_remove_spool(hass, entry.entry_id)
+    await async_remove_recording(hass, entry.entry_id)
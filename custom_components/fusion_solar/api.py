@@ -0,0 +1,702 @@
+"""Asynchronous client to the FusionSolar API"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import date, datetime
+from functools import wraps
+from http.cookies import SimpleCookie
+import json
+import logging
+import time
+from typing import Any
+
+import aiohttp
+from fusion_solar_py.client import PowerStatus
+from fusion_solar_py.exceptions import AuthenticationException, FusionSolarException
+
+from yarl import URL
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+
+from .const import DEFAULT_RATE_LIMIT, DEFAULT_RATE_LIMIT_BURST
+from .metrics import RequestMetrics
+from .rate_limiter import PRIORITY_HIGH, RateLimiter, request_priority
+from .response_cache import DEFAULT_MAX_SIZE, CachePolicy, ResponseCache
+from .traffic import TrafficRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+
+# timeout for a single request (in seconds)
+REQUEST_TIMEOUT = 30
+
+# larger responses are decoded in the executor (in characters)
+EXECUTOR_DECODE_SIZE = 16 * 1024
+
+# stations requested per page of the station list
+STATION_PAGE_SIZE = 100
+
+# cache policies of the endpoints. The plant stats only change with a new data slot.
+# Stale plant stats or station lists are not served, as the coordinator would lag one update behind.
+CACHE_POLICIES = {
+    "get_power_status": CachePolicy(ttl=30, stale_ttl=30),
+    "get_station_list": CachePolicy(ttl=300),
+    "get_plant_stats": CachePolicy(ttl=300, slot_aligned=True),
+}
+
+# fields of the plant stats that do not contain measurements
+IGNORED_PLANT_FIELDS = ("xAxis", "stationTimezone", "clientTimezone", "stationDn")
+
+
+def create_client_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Create a session for a single FusionSolar login.
+
+    The session uses Home Assistant's shared connector, so the keep-alive
+    connections are pooled, but has its own cookie jar as the login
+    state is stored in cookies. The session belongs to the client using it
+    and must be closed through the client's close.
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :return: The new session
+    :rtype: aiohttp.ClientSession
+    """
+    return async_create_clientsession(hass, auto_cleanup=False, cookie_jar=aiohttp.CookieJar())
+
+
+def get_day_start_sec() -> int:
+    """Return the start of the current day in milliseconds since
+       epoche. This matches the behaviour of the FusionSolarClient.
+
+    :return: The start of the day ("00:00:00")
+    :rtype: int
+    """
+    start_today = time.strftime("%Y-%m-%d 00:00:00", time.gmtime())
+    struct_time = time.strptime(start_today, "%Y-%m-%d %H:%M:%S")
+
+    return round(time.mktime(struct_time) * 1000)
+
+
+def get_query_time(day: date) -> int:
+    """Return the start of a past day in milliseconds since epoche as
+       expected by get_plant_stats.
+
+    :param day: The day
+    :type day: date
+    :return: The start of the day ("00:00:00")
+    :rtype: int
+    """
+    return round(time.mktime(day.timetuple()) * 1000)
+
+
+def extract_last_plant_data(plant_data: dict) -> dict:
+    """Extracts the last measurements from the plant data
+
+    :param plant_data: The plant's stats data returned by get_plant_stats
+    :type plant_data: dict
+    :return: The last value of every measurement
+    :rtype: dict
+    """
+    # make sure the object is valid
+    if "xAxis" not in plant_data:
+        raise FusionSolarException("Invalid plant_data object passed.")
+
+    measurement_times = plant_data["xAxis"]
+    extracted_data = {}
+
+    for key_name, key_value in plant_data.items():
+        if key_name in IGNORED_PLANT_FIELDS:
+            continue
+
+        try:
+            if isinstance(key_value, list):
+                extracted_data[key_name] = _get_last_value(key_value, measurement_times)
+            # Missing data
+            elif key_value == "--":
+                extracted_data[key_name] = None
+            # Boolean
+            elif key_name.startswith("exist"):
+                extracted_data[key_name] = bool(key_value)
+            # should be numeric
+            else:
+                extracted_data[key_name] = float(key_value)
+        # if anything goes wrong, simply store "None" as value
+        except (TypeError, ValueError):
+            _LOGGER.debug(f"Failed to parse {key_name} = {key_value}")
+            extracted_data[key_name] = None
+
+    return extracted_data
+
+
+def _get_last_value(values: list, measurement_times: list) -> dict:
+    """Get the last valid value from a values array where
+       missing values are stored as '--'
+
+    :param values: The list of values
+    :type values: list
+    :param measurement_times: The list of matching timepoints
+    :type measurement_times: list
+    :return: A dict with a "value" and "time"
+    :rtype: dict
+    """
+    for index in range(len(values) - 1, -1, -1):
+        if values[index] != "--":
+            return {"time": measurement_times[index], "value": float(values[index])}
+
+    # If nothing is found return "None" for the current time
+    return {"time": datetime.now().strftime("%Y-%m-%d %H:%M"), "value": None}
+
+
+def deduplicated(func):
+    """Decorator merging identical calls that are issued while
+       the same call is still in flight.
+    """
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+
+        if (task := self._in_flight.get(key)) is None:
+            task = asyncio.create_task(func(self, *args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done_task: self._request_done(key, done_task))
+        else:
+            self.merged_requests += 1
+            _LOGGER.debug(f"Merging {func.__name__}{args} with the request in flight")
+
+        # a cancelled caller must not cancel the request of the others
+        return await asyncio.shield(task)
+
+    return wrapper
+
+
+def cached(func):
+    """Decorator serving the responses from the client's response cache.
+       The cache policy is looked up by the function's name. Calls with
+       refresh=True bypass the cache.
+    """
+    policy = CACHE_POLICIES[func.__name__]
+
+    @wraps(func)
+    async def wrapper(self, *args, refresh: bool = False, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+
+        return await self.cache.async_get(
+            key, policy, lambda: func(self, *args, **kwargs), refresh
+        )
+
+    return wrapper
+
+
+class FusionSolarAsyncClient:
+    """asyncio based client to the FusionSolar API.
+
+    Mirrors the parts of fusion_solar_py's FusionSolarClient used by the
+    integration. In contrast to the FusionSolarClient, creating the object
+    does not log in. The login is performed through `login` or lazily
+    by the first request.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        huawei_subdomain: str = "region01eu5",
+        base_url: str | None = None,
+        cache_size: int = DEFAULT_MAX_SIZE,
+        rate_limit: float = DEFAULT_RATE_LIMIT,
+        rate_limit_burst: int = DEFAULT_RATE_LIMIT_BURST,
+    ) -> None:
+        """Create a new FusionSolarAsyncClient
+
+        :param session: The aiohttp session to use. Must not be shared with other clients.
+        :type session: aiohttp.ClientSession
+        :param username: The username for the system
+        :type username: str
+        :param password: The password
+        :type password: str
+        :param huawei_subdomain: The FusionSolar API subdomain
+        :type huawei_subdomain: str
+        :param base_url: If set, all requests are sent to this URL instead of the Huawei servers.
+        :type base_url: str, optional
+        :param cache_size: Maximum number of cached responses. 0 disables the cache.
+        :type cache_size: int
+        :param rate_limit: Maximum number of requests per minute. 0 disables the limit.
+        :type rate_limit: float
+        :param rate_limit_burst: Number of requests that may be sent at once
+        :type rate_limit_burst: int
+        """
+        self._session = session
+        self._user = username
+        self._password = password
+        self._huawei_subdomain = huawei_subdomain
+
+        if self._huawei_subdomain.startswith("region"):
+            login_subdomain = self._huawei_subdomain[8:]
+        elif self._huawei_subdomain.startswith("uni"):
+            login_subdomain = self._huawei_subdomain[6:]
+        else:
+            login_subdomain = self._huawei_subdomain
+
+        self._base_url = base_url or f"https://{self._huawei_subdomain}.fusionsolar.huawei.com"
+        self._login_url = base_url or f"https://{login_subdomain}.fusionsolar.huawei.com"
+
+        self._headers = {"User-Agent": USER_AGENT}
+        self._company_id = None
+        self._logged_in = False
+        self._login_lock = asyncio.Lock()
+        self._session_listeners: list[Callable[[dict], None]] = []
+
+        # identical requests in flight are merged
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self.merged_requests = 0
+
+        # calls, errors and latencies by endpoint
+        self.metrics = RequestMetrics()
+
+        # responses are reused by the coordinators, services and diagnostics of the account
+        self.cache = ResponseCache(cache_size)
+
+        # all requests of the account - including the logins - share the limit
+        self.rate_limiter = RateLimiter(rate_limit / 60, rate_limit_burst)
+
+        # if set, every request and its response is recorded
+        self.traffic_recorder: TrafficRecorder | None = None
+
+    @property
+    def logged_in(self) -> bool:
+        """Whether the client currently holds a session"""
+        return self._logged_in
+
+    async def login(self) -> None:
+        """Log into the FusionSolar API. Raises an AuthenticationException if
+           the login fails.
+        """
+        async with self._login_lock:
+            await self._login()
+
+    async def _login(self) -> None:
+        """Perform the login. The login lock must be held."""
+        # all other requests wait for the login
+        with request_priority(PRIORITY_HIGH):
+            await self._send_login()
+
+    async def _send_login(self) -> None:
+        """Send the requests of the login"""
+        _LOGGER.debug("Logging into Huawei Fusion Solar API")
+
+        self._logged_in = False
+        self._headers.pop("roarand", None)
+
+        params = {
+            "decision": 1,
+            "service": f"{self._base_url}/unisess/v1/auth?service=/netecowebext/home/index.html#/LOGIN",
+        }
+
+        # adapt the parameters for the new login procedure
+        if self._huawei_subdomain.startswith("uni"):
+            params = {"timeStamp": 1705091707212, "nonce": "5e9adbab77567a2d5b684b61bad8b3"}
+
+        login_response = await self._send(
+            "POST",
+            f"{self._login_url}/unisso/v2/validateUser.action",
+            params=params,
+            json_data={
+                "organizationName": "",
+                "username": self._user,
+                "password": self._password,
+            },
+        )
+
+        # detect the new login procedure
+        if login_response.get("errorCode") == "470":
+            _LOGGER.debug("Detected new login procedure, sending additional request...")
+            await self._send_raw(
+                "GET", f"{self._login_url}{login_response['respMultiRegionName'][1]}"
+            )
+
+        if login_response.get("errorMsg"):
+            raise AuthenticationException(
+                f"Failed to login into FusionSolarAPI: { login_response['errorMsg'] }"
+            )
+
+        # get the main id - this also detects an incorrect subdomain
+        response_text = await self._send_raw(
+            "GET",
+            f"{self._base_url}/rest/neteco/web/organization/v2/company/current",
+            params={"_": round(time.time() * 1000)},
+        )
+
+        if not response_text.strip().startswith('{"data":'):
+            raise AuthenticationException(
+                "Invalid response received. Please check the correct Huawei subdomain."
+            )
+
+        self._company_id = json.loads(response_text)["data"]["moDn"]
+
+        # get the roarand, which is needed for non-GET requests
+        try:
+            session_data = await self._send(
+                "GET", f"{self._base_url}/unisess/v1/auth/session"
+            )
+            self._headers["roarand"] = session_data["csrfToken"]
+        except (json.JSONDecodeError, KeyError):
+            # this currently does not work in the new login procedure
+            pass
+
+        self._logged_in = True
+        self.metrics.record_login()
+
+        for session_listener in self._session_listeners:
+            session_listener(self.export_session())
+
+    def add_session_listener(self, listener: Callable[[dict], None]) -> Callable[[], None]:
+        """Register a function that is called with the exported session
+           after every successful login
+
+        :param listener: The function to call
+        :type listener: Callable[[dict], None]
+        :return: A function removing the listener again
+        :rtype: Callable[[], None]
+        """
+        self._session_listeners.append(listener)
+
+        return lambda: self._session_listeners.remove(listener)
+
+    def _request_done(self, key: tuple, task: asyncio.Task) -> None:
+        """Remove a finished request from the requests in flight"""
+        self._in_flight.pop(key, None)
+
+        # retrieve the exception in case all callers were cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def export_session(self) -> dict:
+        """Export the current login state so that it can be restored later
+
+        :return: The cookies and tokens of the session
+        :rtype: dict
+        """
+        return {
+            "cookies": [
+                {
+                    "name": morsel.key,
+                    "value": morsel.value,
+                    "domain": morsel["domain"],
+                    "path": morsel["path"],
+                }
+                for morsel in self._session.cookie_jar
+            ],
+            "roarand": self._headers.get("roarand"),
+            "company_id": self._company_id,
+        }
+
+    def restore_session(self, session_data: dict) -> None:
+        """Restore a previously exported login state. The session is
+           only checked by the next request, which logs in again if
+           the session was rejected.
+
+        :param session_data: The session as returned by export_session
+        :type session_data: dict
+        """
+        for cookie in session_data["cookies"]:
+            morsel = SimpleCookie()
+            morsel[cookie["name"]] = cookie["value"]
+            morsel[cookie["name"]]["domain"] = cookie["domain"]
+            morsel[cookie["name"]]["path"] = cookie["path"]
+
+            response_url = URL(self._base_url)
+            if cookie["domain"]:
+                response_url = response_url.with_host(cookie["domain"].lstrip("."))
+
+            self._session.cookie_jar.update_cookies(morsel, response_url)
+
+        if session_data.get("roarand"):
+            self._headers["roarand"] = session_data["roarand"]
+
+        self._company_id = session_data.get("company_id")
+        self._logged_in = True
+
+    async def log_out(self) -> None:
+        """Log out from the FusionSolarAPI"""
+        async with self._login_lock:
+            if not self._logged_in:
+                return
+
+            self._logged_in = False
+
+            try:
+                await self._send_raw(
+                    "GET",
+                    f"{self._base_url}/unisess/v1/logout",
+                    params={"service": self._base_url},
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                _LOGGER.debug(f"Failed to log out: {error}")
+
+            self._session.cookie_jar.clear()
+
+    async def close(self) -> None:
+        """Close the client's session. The session is not logged out, so it can
+           be restored by the next client of the account.
+        """
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def _send_raw(
+        self,
+        method: str,
+        url: str,
+        params: dict | None = None,
+        json_data: dict | None = None,
+    ) -> str:
+        """Send a request and return the response's body
+
+        :raises aiohttp.ClientResponseError: For error status codes
+        """
+        # the endpoint is identified by the last part of the path
+        endpoint = URL(url).path.rsplit("/", 1)[-1]
+
+        await self.rate_limiter.acquire()
+
+        start = time.monotonic()
+
+        try:
+            async with self._session.request(
+                method,
+                url,
+                params=params,
+                json=json_data,
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                response.raise_for_status()
+                response_text = await response.text()
+        except asyncio.TimeoutError:
+            self.metrics.record_request(endpoint, time.monotonic() - start, timeout=True)
+            self._record_traffic(method, url, params, json_data, start, error="timeout")
+            raise
+        except aiohttp.ClientError as error:
+            self.metrics.record_request(endpoint, time.monotonic() - start, error=True)
+            self._record_traffic(
+                method,
+                url,
+                params,
+                json_data,
+                start,
+                error=getattr(error, "status", None) or "error",
+            )
+            raise
+
+        self.metrics.record_request(endpoint, time.monotonic() - start)
+        self._record_traffic(method, url, params, json_data, start, response=response_text)
+
+        return response_text
+
+    def _record_traffic(
+        self,
+        method: str,
+        url: str,
+        params: dict | None,
+        json_data: dict | None,
+        start: float,
+        response: str | None = None,
+        error: int | str | None = None,
+    ) -> None:
+        """Pass a finished request to the traffic recorder, if capturing"""
+        if self.traffic_recorder:
+            self.traffic_recorder.record(
+                method, url, params, json_data, time.monotonic() - start, response, error
+            )
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        params: dict | None = None,
+        json_data: dict | None = None,
+    ) -> Any:
+        """Send a request and decode the JSON response
+
+        :raises json.JSONDecodeError: If the response is not valid JSON. This
+                                      usually means that the session expired.
+        """
+        response_text = await self._send_raw(method, url, params, json_data)
+
+        # the day series of a plant are too large to be decoded on the event loop
+        if len(response_text) > EXECUTOR_DECODE_SIZE:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, json.loads, response_text
+            )
+
+        return json.loads(response_text)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        json_data: dict | None = None,
+    ) -> Any:
+        """Send an authenticated request to the API. Logs in again
+           once if the session is no longer valid.
+
+        :param method: The HTTP method
+        :type method: str
+        :param path: The path of the endpoint
+        :type path: str
+        :return: The decoded JSON response
+        """
+        if not self._logged_in:
+            await self._ensure_login()
+
+        try:
+            return await self._send(method, f"{self._base_url}{path}", params, json_data)
+        except aiohttp.ClientResponseError as error:
+            # only a rejected session is fixed by a new login - not server errors or rate limits
+            if error.status not in (401, 403):
+                raise
+
+            _LOGGER.info("Session no longer valid. Logging in")
+            self._logged_in = False
+            await self._ensure_login()
+
+            return await self._send(method, f"{self._base_url}{path}", params, json_data)
+        except json.JSONDecodeError:
+            # an expired session is redirected to the HTML login page
+            _LOGGER.info("Session no longer valid. Logging in")
+            self._logged_in = False
+            await self._ensure_login()
+
+            return await self._send(method, f"{self._base_url}{path}", params, json_data)
+
+    async def _ensure_login(self) -> None:
+        """Log in unless another request already did so"""
+        async with self._login_lock:
+            if not self._logged_in:
+                await self._login()
+
+    @cached
+    @deduplicated
+    async def get_power_status(self) -> PowerStatus:
+        """Retrieve the current power status. This is the complete
+           summary accross all stations.
+
+        :return: The current status as a PowerStatus object
+        :rtype: PowerStatus
+        """
+        power_obj = await self._request(
+            "GET",
+            "/rest/pvms/web/station/v1/station/total-real-kpi",
+            params={
+                "queryTime": round(time.time() * 1000),
+                "timeZone": 1,
+                "_": round(time.time() * 1000),
+            },
+        )
+
+        return PowerStatus(
+            current_power_kw=float(power_obj["data"]["currentPower"]),
+            energy_today_kwh=float(power_obj["data"]["dailyEnergy"]),
+            energy_kwh=float(power_obj["data"]["cumulativeEnergy"]),
+        )
+
+    @cached
+    @deduplicated
+    async def get_station_list(self) -> list:
+        """Get the list of available PV stations. All pages of the
+           list are fetched.
+
+        :return: The stations as returned by the API
+        :rtype: list
+        """
+        stations = []
+        page = 1
+
+        while True:
+            obj_tree = await self._request(
+                "POST",
+                "/rest/pvms/web/station/v1/station/station-list",
+                json_data={
+                    "curPage": page,
+                    "pageSize": STATION_PAGE_SIZE,
+                    "gridConnectedTime": "",
+                    "queryTime": get_day_start_sec(),
+                    "timeZone": 2,
+                    "sortId": "createTime",
+                    "sortDir": "DESC",
+                    "locale": "en_US",
+                },
+            )
+
+            if not obj_tree["success"]:
+                raise FusionSolarException("Failed to retrieve station list")
+
+            page_stations = obj_tree["data"]["list"]
+            stations.extend(page_stations)
+
+            # an empty page also ends the list, in case the total is missing or wrong
+            if not page_stations or len(stations) >= obj_tree["data"].get("total", 0):
+                return stations
+
+            page += 1
+
+    @deduplicated
+    async def get_plant_ids(self) -> list:
+        """Get the ids of all available stations linked
+           to this account
+
+        :return: A list of plant ids (strings)
+        :rtype: list
+        """
+        return [obj["dn"] for obj in await self.get_station_list()]
+
+    @cached
+    @deduplicated
+    async def get_plant_stats(self, plant_id: str, query_time: int = None) -> dict:
+        """Retrieves the complete plant usage statistics for a day.
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param query_time: If set, must be set to 00:00:00 of the day the data should
+                           be fetched for. If not set, retrieves the data for the
+                           current day.
+        :type query_time: int
+        :return: The plant's stats
+        :rtype: dict
+        """
+        if not query_time:
+            query_time = get_day_start_sec()
+
+        plant_data = await self._request(
+            "GET",
+            "/rest/pvms/web/station/v1/overview/energy-balance",
+            params={
+                "stationDn": plant_id,
+                "timeDim": 2,
+                "queryTime": query_time,
+                "timeZone": 2,  # 1 in no daylight
+                "timeZoneStr": "Europe/Vienna",
+                "_": round(time.time() * 1000),
+            },
+        )
+
+        if not plant_data["success"] or "data" not in plant_data:
+            raise FusionSolarException(f"Failed to retrieve plant status for {plant_id}")
+
+        return plant_data["data"]
+
+    def get_last_plant_data(self, plant_data: dict) -> dict:
+        """Extracts the last measurements from the plant data
+
+        :param plant_data: The plant's stats data returned by get_plant_stats
+        :type plant_data: dict
+        :return: The last value of every measurement
+        :rtype: dict
+        """
+        return extract_last_plant_data(plant_data)
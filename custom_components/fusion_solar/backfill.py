@@ -0,0 +1,301 @@
+"""Backfill of the plant history that was missed during outages"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import get_query_time
+from .circuit_breaker import STATE_CLOSED
+from .const import DOMAIN
+from .rate_limiter import PRIORITY_LOW, request_priority
+from .statistics_import import FusionSolarStatisticsImporter
+from .update_coordinator import FusionSolarCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# the checkpoint is written at most once within this time (in seconds)
+STORAGE_SAVE_DELAY = 10
+
+# number of days that are fetched in parallel
+BACKFILL_CONCURRENCY = 2
+# a day that failed this often is dropped from the backfill
+MAX_ATTEMPTS = 3
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """The store of an entry's backfill checkpoint"""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.backfill")
+
+
+async def async_remove_checkpoint(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the backfill checkpoint of a config entry
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :param entry_id: The config entry's id
+    :type entry_id: str
+    """
+    await _get_store(hass, entry_id).async_remove()
+
+
+class FusionSolarBackfill:
+    """Fetches the series of past days and imports them into the statistics.
+
+    Days are queued per plant, either if the statistics importer detected a
+    gap or through the backfill service. The queue is stored as checkpoint,
+    so an interrupted backfill continues after a restart. The backfill
+    pauses while the account's circuit breaker is not closed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        coordinator: FusionSolarCoordinator,
+        importer: FusionSolarStatisticsImporter,
+        max_days: int,
+    ) -> None:
+        """Create a new FusionSolarBackfill
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        :param coordinator: The account's coordinator
+        :type coordinator: FusionSolarCoordinator
+        :param importer: The importer writing the statistics
+        :type importer: FusionSolarStatisticsImporter
+        :param max_days: Only days within this number of days are backfilled automatically
+        :type max_days: int
+        """
+        self._hass = hass
+        self._coordinator = coordinator
+        self._importer = importer
+        self._max_days = max_days
+        self._store = _get_store(hass, entry_id)
+
+        # failed attempts of the pending days by plant
+        self._pending: dict[str, dict[date, int]] = {}
+        self._task: asyncio.Task | None = None
+
+        self.completed_days = 0
+        self.failed_days = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether a backfill is in progress"""
+        return self._task is not None
+
+    @property
+    def pending_days(self) -> int:
+        """Number of days that still have to be fetched"""
+        return sum(len(days) for days in self._pending.values())
+
+    async def async_load(self) -> None:
+        """Load the checkpoint of an interrupted backfill"""
+        stored_data = await self._store.async_load() or {}
+
+        self._pending = {
+            plant_id: {
+                date.fromisoformat(day): attempts for day, attempts in days.items()
+            }
+            for plant_id, days in stored_data.get("pending", {}).items()
+        }
+
+        if self._pending:
+            _LOGGER.info(f"Resuming the backfill of {self.pending_days} days")
+
+    @callback
+    def async_handle_gap(self, plant_id: str, days: list[date]) -> None:
+        """Queue the days of a gap that was detected by the statistics importer
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param days: The days that were missed
+        :type days: list[date]
+        """
+        first_day = dt_util.now().date() - timedelta(days=self._max_days)
+        days = [day for day in days if day >= first_day]
+
+        if not days:
+            return
+
+        _LOGGER.info(f"Missed {len(days)} days of plant {plant_id}, starting backfill")
+
+        self.async_schedule({plant_id: days})
+
+    @callback
+    def async_request_days(self, days: int) -> None:
+        """Queue the given number of past days of all plants. Used by the service.
+
+        :param days: Number of past days, the current day is not included
+        :type days: int
+        """
+        today = dt_util.now().date()
+
+        self.async_schedule(
+            {
+                plant_id: [today - timedelta(days=offset) for offset in range(days, 0, -1)]
+                for plant_id in self._coordinator.plant_ids or []
+            }
+        )
+
+    @callback
+    def async_schedule(self, days_by_plant: dict[str, list[date]]) -> None:
+        """Add days to the checkpoint and start the backfill
+
+        :param days_by_plant: The days to fetch by plant id
+        :type days_by_plant: dict[str, list[date]]
+        """
+        for plant_id, days in days_by_plant.items():
+            pending_days = self._pending.setdefault(plant_id, {})
+
+            for day in days:
+                pending_days.setdefault(day, 0)
+
+        self._save()
+        self.async_resume()
+
+    @callback
+    def async_resume(self) -> None:
+        """Start the backfill if days are pending and the API is reachable"""
+        if (
+            self._task
+            or not self._pending
+            or self._coordinator.breaker.state != STATE_CLOSED
+        ):
+            return
+
+        self._task = self._coordinator.config_entry.async_create_background_task(
+            self._hass, self._async_run(), f"{DOMAIN} backfill"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop a running backfill and write the checkpoint"""
+        if self._task:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        await self._store.async_save(self._get_store_data())
+
+    async def _async_run(self) -> None:
+        """Fetch all pending days. Days added while running are fetched as well."""
+        semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+        attempted: set[tuple[str, date]] = set()
+
+        try:
+            while jobs := [
+                (plant_id, day)
+                for plant_id, days in self._pending.items()
+                for day in sorted(days)
+                if (plant_id, day) not in attempted
+            ]:
+                attempted.update(jobs)
+
+                await asyncio.gather(
+                    *[
+                        self._async_backfill_day(semaphore, plant_id, day)
+                        for plant_id, day in jobs
+                    ]
+                )
+        finally:
+            self._task = None
+
+        _LOGGER.debug(
+            f"Backfill finished. {self.completed_days} days imported, "
+            f"{self.pending_days} days pending"
+        )
+
+    async def _async_backfill_day(
+        self, semaphore: asyncio.Semaphore, plant_id: str, day: date
+    ) -> None:
+        """Fetch and import a single day of a plant. Failed days stay in the checkpoint.
+
+        :param semaphore: Limits the number of parallel requests
+        :type semaphore: asyncio.Semaphore
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param day: The day
+        :type day: date
+        """
+        async with semaphore:
+            # removed plants are not fetched anymore
+            if plant_id not in (self._coordinator.plant_ids or []):
+                self._remove(plant_id, day)
+                return
+
+            # the backfill is resumed once the API is reachable again
+            if self._coordinator.breaker.state != STATE_CLOSED:
+                return
+
+            try:
+                # the updates are sent before the backfill
+                with request_priority(PRIORITY_LOW):
+                    plant_data = await self._coordinator.my_api.get_plant_stats(
+                        plant_id, get_query_time(day)
+                    )
+                await self._importer.async_import(plant_id, plant_data, backfill=True)
+            except Exception as err:
+                attempts = self._pending[plant_id][day] + 1
+
+                if attempts >= MAX_ATTEMPTS:
+                    _LOGGER.warning(
+                        f"Failed to backfill {day} of plant {plant_id}, giving up: {err}"
+                    )
+                    self.failed_days += 1
+                    self._remove(plant_id, day)
+                else:
+                    _LOGGER.debug(f"Failed to backfill {day} of plant {plant_id}: {err}")
+                    self._pending[plant_id][day] = attempts
+                    self._save()
+
+                return
+
+        _LOGGER.debug(f"Backfilled {day} of plant {plant_id}")
+
+        self.completed_days += 1
+        self._remove(plant_id, day)
+
+    def _remove(self, plant_id: str, day: date) -> None:
+        """Remove a day from the checkpoint"""
+        days = self._pending.get(plant_id, {})
+        days.pop(day, None)
+
+        if not days:
+            self._pending.pop(plant_id, None)
+
+        self._save()
+
+    def _save(self) -> None:
+        """Write the checkpoint delayed"""
+        self._store.async_delay_save(self._get_store_data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _get_store_data(self) -> dict:
+        """The pending days as serializable dict"""
+        return {
+            "pending": {
+                plant_id: {day.isoformat(): attempts for day, attempts in days.items()}
+                for plant_id, days in self._pending.items()
+            }
+        }
+
+    def as_dict(self) -> dict:
+        """Return the backfill's state as a serializable dict"""
+        return {
+            "running": self.running,
+            "pending_days": self.pending_days,
+            "completed_days": self.completed_days,
+            "failed_days": self.failed_days,
+        }
@@ -0,0 +1,203 @@
+"""Circuit breaker protecting the FusionSolar API from repeated failing requests"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import json
+import logging
+import random
+import time
+
+import aiohttp
+from fusion_solar_py.exceptions import AuthenticationException
+
+_LOGGER = logging.getLogger(__name__)
+
+# error kinds
+ERROR_TRANSIENT = "transient"
+ERROR_AUTH = "auth"
+ERROR_RATE_LIMIT = "rate_limit"
+ERROR_PARSE = "parse"
+
+# breaker states
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# rate limits are backed off more aggressively
+RATE_LIMIT_FACTOR = 4
+
+
+def classify_error(error: BaseException) -> str:
+    """Sort an error of an update into one of the error kinds
+
+    :param error: The error
+    :type error: BaseException
+    :return: The error kind
+    :rtype: str
+    """
+    if isinstance(error, AuthenticationException):
+        return ERROR_AUTH
+
+    if isinstance(error, aiohttp.ClientResponseError):
+        if error.status == 429:
+            return ERROR_RATE_LIMIT
+
+        if error.status in (401, 403):
+            return ERROR_AUTH
+
+        return ERROR_TRANSIENT
+
+    if isinstance(error, (json.JSONDecodeError, KeyError, TypeError, ValueError)):
+        return ERROR_PARSE
+
+    # timeouts, connection errors and failed API calls
+    return ERROR_TRANSIENT
+
+
+def get_retry_after(error: BaseException) -> float | None:
+    """The delay requested by the server through a Retry-After header
+
+    :param error: The error
+    :type error: BaseException
+    :return: The delay in seconds or None if no delay was requested
+    :rtype: float, optional
+    """
+    if not isinstance(error, aiohttp.ClientResponseError) or not error.headers:
+        return None
+
+    try:
+        return float(error.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Stops sending requests after a failure and backs off exponentially with jitter.
+
+    After a failure the breaker opens. Once the backoff expired it becomes
+    half-open and lets a single probe through. A successful probe closes
+    the breaker, a failing probe opens it again with a longer backoff.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_delay: timedelta,
+        max_delay: timedelta,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Create a new, closed CircuitBreaker
+
+        :param name: Name used for logging
+        :type name: str
+        :param base_delay: Backoff after the first failure
+        :type base_delay: timedelta
+        :param max_delay: Longest backoff
+        :type max_delay: timedelta
+        :param rng: Random generator used for the jitter
+        :type rng: random.Random, optional
+        """
+        self.name = name
+        self._base_delay = base_delay.total_seconds()
+        self._max_delay = max_delay.total_seconds()
+        self._random = rng or random.Random()
+
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.last_error_kind: str | None = None
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def retry_in(self) -> timedelta:
+        """Time until the breaker lets the next probe through"""
+        if self.state != STATE_OPEN:
+            return timedelta(0)
+
+        return timedelta(seconds=max(self._open_until - time.monotonic(), 0))
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent. While half-open, only a single
+           probe is allowed until its result was recorded.
+
+        :return: True if the request may be sent
+        :rtype: bool
+        """
+        if self.state == STATE_OPEN and time.monotonic() >= self._open_until:
+            _LOGGER.debug(f"{self.name}: Backoff expired, sending a probe")
+            self.state = STATE_HALF_OPEN
+
+        if self.state == STATE_HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+
+            self._probe_in_flight = True
+            return True
+
+        return self.state == STATE_CLOSED
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request"""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info(f"{self.name}: Requests succeed again, closing the circuit breaker")
+
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Let the next request probe again if the probe ended without a
+           result, for example because it was cancelled
+        """
+        self._probe_in_flight = False
+
+    def record_failure(self, error_kind: str, retry_after: float | None = None) -> timedelta:
+        """Open the breaker after a failed request
+
+        :param error_kind: The kind of the error as returned by classify_error
+        :type error_kind: str
+        :param retry_after: Delay requested by the server (in seconds)
+        :type retry_after: float, optional
+        :return: The backoff until the next probe
+        :rtype: timedelta
+        """
+        self.failures += 1
+        self.last_error_kind = error_kind
+        self._probe_in_flight = False
+
+        if self.state != STATE_OPEN:
+            self.trips += 1
+
+        base_delay = self._base_delay
+
+        if error_kind == ERROR_RATE_LIMIT:
+            base_delay *= RATE_LIMIT_FACTOR
+
+        # exponential backoff with jitter, so several entries do not retry in sync
+        delay = min(base_delay * 2 ** (self.failures - 1), self._max_delay)
+        delay = self._random.uniform(delay / 2, delay)
+
+        if retry_after:
+            delay = max(delay, retry_after)
+
+        self.state = STATE_OPEN
+        self._open_until = time.monotonic() + delay
+
+        _LOGGER.warning(
+            f"{self.name}: {error_kind} error ({self.failures} in a row). "
+            f"Next attempt in {timedelta(seconds=round(delay))}"
+        )
+
+        return timedelta(seconds=delay)
+
+    def as_dict(self) -> dict:
+        """Return the breaker's state as a serializable dict"""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "last_error_kind": self.last_error_kind,
+            "retry_in_seconds": self.retry_in.total_seconds(),
+        }
@@ -0,0 +1,194 @@
+"""Registry sharing FusionSolar clients per account"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .api import FusionSolarAsyncClient
+from .const import CLIENT_REGISTRY, DOMAIN
+from .rate_limiter import get_strictest_limits
+
+_LOGGER = logging.getLogger(__name__)
+
+# a client registered by the config flow is closed if no entry picked it up within this time (in seconds)
+HANDOVER_TIMEOUT = 300
+
+
+@callback
+def async_get_client_registry(hass: HomeAssistant) -> FusionSolarClientRegistry:
+    """Get the client registry of this Home Assistant instance
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :return: The registry
+    :rtype: FusionSolarClientRegistry
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+
+    if CLIENT_REGISTRY not in domain_data:
+        registry = FusionSolarClientRegistry(hass)
+        domain_data[CLIENT_REGISTRY] = registry
+
+        # the sessions of the clients are not closed by Home Assistant
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, registry.async_close)
+
+    return domain_data[CLIENT_REGISTRY]
+
+
+class FusionSolarClientRegistry:
+    """Keeps one client per (subdomain, username).
+
+    As the config flow only allows one entry per username, a client is shared
+    by the config flow and the entry it creates: the entry's setup picks up
+    the session the flow just authenticated. Within an entry, the account's
+    coordinator, the plant coordinators and the backfill use the same client,
+    so their identical requests are merged. A shared client applies the
+    strictest rate limit of the entries holding it.
+
+    Clients are reference counted. Once the last reference was released, the
+    client's session is closed and the client is dropped. The reference of
+    the config flow expires, so its client is also closed if the entry's
+    setup never picks it up.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Create a new, empty registry
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        """
+        self.hass = hass
+        self._clients: dict[tuple[str, str], FusionSolarAsyncClient] = {}
+        self._references: dict[tuple[str, str], int] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        # rate limits of the entries holding a client, by entry id
+        self._limits: dict[tuple[str, str], dict[str, tuple[float, int]]] = {}
+        # cancels the delayed releases (see async_release)
+        self._pending_releases: list[Callable[[], None]] = []
+
+    @staticmethod
+    def _get_key(subdomain: str, username: str) -> tuple[str, str]:
+        """Key of an account within the registry"""
+        return (subdomain.lower(), username)
+
+    async def async_acquire(
+        self,
+        subdomain: str,
+        username: str,
+        client_factory: Callable[[], Awaitable[FusionSolarAsyncClient]],
+    ) -> FusionSolarAsyncClient:
+        """Get the client of an account. The client is only created if the
+           account does not have a client yet.
+
+        :param subdomain: The FusionSolar subdomain
+        :type subdomain: str
+        :param username: The username
+        :type username: str
+        :param client_factory: Creates a new client
+        :type client_factory: Callable[[], Awaitable[FusionSolarAsyncClient]]
+        :return: The shared client
+        :rtype: FusionSolarAsyncClient
+        """
+        key = self._get_key(subdomain, username)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        # the client is only created once, even if requested in parallel
+        async with lock:
+            if key not in self._clients:
+                self._clients[key] = await client_factory()
+                self._references[key] = 0
+            else:
+                _LOGGER.debug(f"Sharing the FusionSolar client of {username}")
+
+            self._references[key] += 1
+
+            return self._clients[key]
+
+    @callback
+    def async_set_limits(
+        self, client: FusionSolarAsyncClient, entry_id: str, rate: float, burst: int
+    ) -> None:
+        """Set an entry's rate limit of a client. The client applies the
+           strictest limit of the entries holding it.
+
+        :param client: The client acquired by the entry
+        :type client: FusionSolarAsyncClient
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        :param rate: Sustained rate (in requests per second). 0 does not limit the rate.
+        :type rate: float
+        :param burst: Number of requests that may be sent at once
+        :type burst: int
+        """
+        key = self._get_key(client._huawei_subdomain, client._user)
+        self._limits.setdefault(key, {})[entry_id] = (rate, burst)
+        self._apply_limits(key)
+
+    def _apply_limits(self, key: tuple[str, str]) -> None:
+        """Apply the strictest limit of the entries holding a client"""
+        if (client := self._clients.get(key)) and (limits := self._limits.get(key)):
+            client.rate_limiter.set_limits(*get_strictest_limits(limits.values()))
+
+    @callback
+    def async_release(
+        self, client: FusionSolarAsyncClient, delay: float = 0, entry_id: str | None = None
+    ) -> None:
+        """Release a client acquired through async_acquire
+
+        :param client: The client to release
+        :type client: FusionSolarAsyncClient
+        :param delay: Keep the reference for this time (in seconds), so another
+                      user can pick up the client's session. Defaults to releasing it right away.
+        :type delay: float
+        :param entry_id: The id of the releasing entry, whose rate limit no longer applies
+        :type entry_id: str, optional
+        """
+        if delay:
+
+            @callback
+            def async_expire(_now) -> None:
+                self._pending_releases.remove(cancel_expiry)
+                self.async_release(client, entry_id=entry_id)
+
+            cancel_expiry = async_call_later(self.hass, delay, async_expire)
+            self._pending_releases.append(cancel_expiry)
+            return
+
+        key = self._get_key(client._huawei_subdomain, client._user)
+
+        if self._clients.get(key) is not client:
+            return
+
+        self._references[key] -= 1
+
+        if entry_id is not None:
+            self._limits.get(key, {}).pop(entry_id, None)
+
+        if self._references[key] <= 0:
+            del self._clients[key]
+            del self._references[key]
+            self._limits.pop(key, None)
+
+            self.hass.async_create_task(client.close())
+        else:
+            # the limits of the remaining entries apply
+            self._apply_limits(key)
+
+    async def async_close(self, _event: Event | None = None) -> None:
+        """Close the sessions of all clients"""
+        for cancel_expiry in self._pending_releases:
+            cancel_expiry()
+
+        self._pending_releases.clear()
+        clients = list(self._clients.values())
+        self._clients.clear()
+        self._references.clear()
+        self._limits.clear()
+
+        await asyncio.gather(*[client.close() for client in clients])
@@ -1,19 +1,76 @@
 """Config flow for FusionSolar integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
-from fusion_solar_py.client import FusionSolarClient
+import aiohttp
 from fusion_solar_py.exceptions import AuthenticationException, FusionSolarException
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .api import FusionSolarAsyncClient, create_client_session
+from .client_registry import HANDOVER_TIMEOUT, async_get_client_registry
+from .const import (
+    CONF_BACKFILL_DAYS,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_DETECT_LOOP_BLOCKING,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_EXPORT_TARGET,
+    CONF_EXPORT_TOKEN,
+    CONF_EXPORT_TOPIC,
+    CONF_EXPORT_URL,
+    CONF_IMPORT_STATISTICS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_PLANT_STALENESS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_PLANT_DISCOVERY_INTERVAL,
+    CONF_PLANT_TIMEOUT,
+    CONF_POLLING_MODE,
+    CONF_RATE_LIMIT,
+    CONF_RATE_LIMIT_BURST,
+    CONF_REDUCE_RECORDER_WRITES,
+    CONF_SHARDED_POLLING,
+    CONF_SLOT_PUBLICATION_DELAY,
+    CONF_SLOW_POLL_INTERVAL,
+    DEFAULT_BACKFILL_DAYS,
+    DEFAULT_CAPTURE_TRAFFIC,
+    DEFAULT_DETECT_LOOP_BLOCKING,
+    DEFAULT_DIAGNOSTIC_SENSORS,
+    DEFAULT_EXPORT_TARGET,
+    DEFAULT_EXPORT_TOKEN,
+    DEFAULT_EXPORT_TOPIC,
+    DEFAULT_EXPORT_URL,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_PLANT_STALENESS,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_PLANT_DISCOVERY_INTERVAL,
+    DEFAULT_PLANT_TIMEOUT,
+    DEFAULT_POLLING_MODE,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_RATE_LIMIT_BURST,
+    DEFAULT_REDUCE_RECORDER_WRITES,
+    DEFAULT_SHARDED_POLLING,
+    DEFAULT_SLOT_PUBLICATION_DELAY,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    DOMAIN,
+    EXPORT_TARGET_INFLUXDB,
+    EXPORT_TARGET_MQTT,
+    EXPORT_TARGET_NONE,
+    MAX_BACKFILL_DAYS,
+    MAX_CONCURRENT_REQUESTS,
+    POLLING_MODE_ADAPTIVE,
+    POLLING_MODE_FIXED,
+)
+from .rate_limiter import PRIORITY_HIGH, request_priority
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,34 +82,92 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
-
-class FusionSolar:
-    """Integration of the FusionSolarAPI"""
-
-    def __init__(self) -> None:
-        """Initialize."""
-        self.client = None
-
-    async def authenticate(self, username: str, password: str, subdomain: str) -> bool:
-        """Test if we can authenticate with the host."""
-
-        try:
-            if self.client:
-                self.client.log_out()
-
-            self.client = FusionSolarClient(username, password, huawei_subdomain=subdomain)
-        except AuthenticationException as error:
-            _LOGGER.warning(
-                "Wrong username or password for the FusionSolar API: %s", str(error)
-            )
-            return False
-        except FusionSolarException as error:
-            _LOGGER.error(
-                "Failed to authenticate with the FusionSolar API: %s", str(error)
-            )
-            raise error
-
-        return True
+# key, default value and validator of the options by menu step. The general
+# options come first, the tuning of the polling and the requests is kept apart.
+OPTION_GROUPS = {
+    "general": [
+        (
+            CONF_POLLING_MODE,
+            DEFAULT_POLLING_MODE,
+            vol.In([POLLING_MODE_FIXED, POLLING_MODE_ADAPTIVE]),
+        ),
+        (
+            CONF_SLOW_POLL_INTERVAL,
+            DEFAULT_SLOW_POLL_INTERVAL,
+            vol.All(vol.Coerce(int), vol.Range(min=0, max=60)),
+        ),
+        (CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS, bool),
+        (
+            CONF_BACKFILL_DAYS,
+            DEFAULT_BACKFILL_DAYS,
+            vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_BACKFILL_DAYS)),
+        ),
+        (CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS, bool),
+    ],
+    "tuning": [
+        (
+            CONF_MAX_CONCURRENT_REQUESTS,
+            DEFAULT_MAX_CONCURRENT_REQUESTS,
+            vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENT_REQUESTS)),
+        ),
+        (
+            CONF_MIN_POLL_INTERVAL,
+            DEFAULT_MIN_POLL_INTERVAL,
+            vol.All(vol.Coerce(int), vol.Range(min=1, max=15)),
+        ),
+        (
+            CONF_MAX_POLL_INTERVAL,
+            DEFAULT_MAX_POLL_INTERVAL,
+            vol.All(vol.Coerce(int), vol.Range(min=5, max=240)),
+        ),
+        (
+            CONF_SLOT_PUBLICATION_DELAY,
+            DEFAULT_SLOT_PUBLICATION_DELAY,
+            vol.All(vol.Coerce(int), vol.Range(min=0, max=299)),
+        ),
+        (CONF_SHARDED_POLLING, DEFAULT_SHARDED_POLLING, bool),
+        (
+            CONF_PLANT_TIMEOUT,
+            DEFAULT_PLANT_TIMEOUT,
+            vol.All(vol.Coerce(int), vol.Range(min=5, max=120)),
+        ),
+        (
+            CONF_MAX_PLANT_STALENESS,
+            DEFAULT_MAX_PLANT_STALENESS,
+            vol.All(vol.Coerce(int), vol.Range(min=0, max=1440)),
+        ),
+        (
+            CONF_PLANT_DISCOVERY_INTERVAL,
+            DEFAULT_PLANT_DISCOVERY_INTERVAL,
+            vol.All(vol.Coerce(int), vol.Range(min=5, max=1440)),
+        ),
+        (
+            CONF_RATE_LIMIT,
+            DEFAULT_RATE_LIMIT,
+            vol.All(vol.Coerce(int), vol.Range(min=0, max=6000)),
+        ),
+        (
+            CONF_RATE_LIMIT_BURST,
+            DEFAULT_RATE_LIMIT_BURST,
+            vol.All(vol.Coerce(int), vol.Range(min=1, max=500)),
+        ),
+        (CONF_REDUCE_RECORDER_WRITES, DEFAULT_REDUCE_RECORDER_WRITES, bool),
+    ],
+    "export": [
+        (
+            CONF_EXPORT_TARGET,
+            DEFAULT_EXPORT_TARGET,
+            vol.In([EXPORT_TARGET_NONE, EXPORT_TARGET_INFLUXDB, EXPORT_TARGET_MQTT]),
+        ),
+        (CONF_EXPORT_URL, DEFAULT_EXPORT_URL, str),
+        (CONF_EXPORT_TOKEN, DEFAULT_EXPORT_TOKEN, str),
+        (CONF_EXPORT_TOPIC, DEFAULT_EXPORT_TOPIC, str),
+    ],
+    "debug": [
+        (CONF_DETECT_LOOP_BLOCKING, DEFAULT_DETECT_LOOP_BLOCKING, bool),
+        (CONF_CAPTURE_TRAFFIC, DEFAULT_CAPTURE_TRAFFIC, bool),
+    ],
+}
 
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
@@ -60,15 +175,31 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    try:
-        # only creating the client already attempts a login
-        await hass.async_add_executor_job(
-            FusionSolarClient, data["username"], data["password"], data["subdomain"]
+    client_registry = async_get_client_registry(hass)
+
+    async def async_create_client() -> FusionSolarAsyncClient:
+        """Create a new client for the account"""
+        return FusionSolarAsyncClient(
+            create_client_session(hass), data["username"], data["password"], data["subdomain"]
         )
+
+    # the login goes through the account's client, so it counts against the account's rate limit
+    client = await client_registry.async_acquire(
+        data["subdomain"], data["username"], async_create_client
+    )
+
+    # the user waits for the validation
+    try:
+        with request_priority(PRIORITY_HIGH):
+            await client.login()
     except AuthenticationException as error:
         raise InvalidAuth from error
-    except FusionSolarException as error:
+    except (aiohttp.ClientError, asyncio.TimeoutError, FusionSolarException) as error:
         raise CannotConnect from error
+    finally:
+        # an authenticated client is handed over to the entry's setup. The flow's
+        # reference expires, so the client is closed if no entry picks it up.
+        client_registry.async_release(client, HANDOVER_TIMEOUT if client.logged_in else 0)
 
     # Return info that you want to store in the config entry.
     return {"title": "FusionSolar"}
@@ -80,6 +211,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     MINOR_VERSION = 2
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Create the options flow."""
+        return OptionsFlowHandler()
+
     async def _async_do_task(self, task):
         await task  # A task that take some time to complete.
 
@@ -124,6 +263,61 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a FusionSolar config entry.
+
+    The options are grouped into menu steps. Every step only changes the
+    options of its group.
+    """
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show the groups of options."""
+        return self.async_show_menu(step_id="init", menu_options=list(OPTION_GROUPS))
+
+    async def async_step_general(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the general options."""
+        return self._async_step_group("general", user_input)
+
+    async def async_step_tuning(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the tuning of the polling and the requests."""
+        return self._async_step_group("tuning", user_input)
+
+    async def async_step_export(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the export to a time-series database."""
+        return self._async_step_group("export", user_input)
+
+    async def async_step_debug(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the debug options."""
+        return self._async_step_group("debug", user_input)
+
+    @callback
+    def _async_step_group(self, group: str, user_input: dict[str, Any] | None) -> FlowResult:
+        """Show or store the options of a group. The other options are kept."""
+        options = self.config_entry.options
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data={**options, **user_input})
+
+        options_schema = vol.Schema(
+            {
+                vol.Optional(key, default=options.get(key, default)): validator
+                for key, default, validator in OPTION_GROUPS[group]
+            }
+        )
+
+        return self.async_show_form(step_id=group, data_schema=options_schema)
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -2,6 +2,111 @@
 
 DOMAIN = "fusion_solar"
 COORDINATOR = "fusion_update_coordinator"
+PLANT_COORDINATORS = "fusion_plant_coordinators"
+SENSOR_STORE = "fusion_sensor_store"
+SESSION_STORE = "fusion_session_store"
+SNAPSHOT_STORE = "fusion_snapshot_store"
+CLIENT_REGISTRY = "client_registry"
+BACKFILL = "fusion_backfill"
+EXPORTER = "fusion_exporter"
+
+SERVICE_BACKFILL = "backfill"
 
 CURRENT_POWER = "-cur"
 DAILY_ENERGY = "-day"
+
+# options
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# upper limit of parallel plant requests to not overload the API
+MAX_CONCURRENT_REQUESTS = 8
+
+CONF_POLLING_MODE = "polling_mode"
+POLLING_MODE_FIXED = "fixed"
+POLLING_MODE_ADAPTIVE = "adaptive"
+DEFAULT_POLLING_MODE = POLLING_MODE_FIXED
+
+# bounds of the adaptive polling (in minutes)
+CONF_MIN_POLL_INTERVAL = "min_poll_interval"
+DEFAULT_MIN_POLL_INTERVAL = 2
+CONF_MAX_POLL_INTERVAL = "max_poll_interval"
+DEFAULT_MAX_POLL_INTERVAL = 60
+
+# expected delay between the end of a 5 minute slot and its publication (in seconds)
+CONF_SLOT_PUBLICATION_DELAY = "slot_publication_delay"
+DEFAULT_SLOT_PUBLICATION_DELAY = 90
+
+# poll every plant with its own coordinator
+CONF_SHARDED_POLLING = "sharded_polling"
+DEFAULT_SHARDED_POLLING = False
+# timeout of a single plant's update with sharded polling (in seconds)
+CONF_PLANT_TIMEOUT = "plant_timeout"
+DEFAULT_PLANT_TIMEOUT = 30
+# the last good values of a plant whose fetch failed are kept for this time (in minutes)
+CONF_MAX_PLANT_STALENESS = "max_plant_staleness"
+DEFAULT_MAX_PLANT_STALENESS = 30
+
+# polling tiers of the sensors. Fast data is fetched with every update, slow data
+# at the slow poll interval and static data (the plant ids) with the plant discovery.
+# The account's power status is fast data. The plant stats (daily totals, ratios and
+# the day series) are slow data, so they do not cost a request with every update.
+TIER_FAST = "fast"
+TIER_SLOW = "slow"
+TIER_STATIC = "static"
+
+# interval of the slow polling tier (in minutes, 0 fetches slow data with every update)
+CONF_SLOW_POLL_INTERVAL = "slow_poll_interval"
+DEFAULT_SLOW_POLL_INTERVAL = 15
+
+# time until the list of plants is checked for new or removed plants (in minutes)
+CONF_PLANT_DISCOVERY_INTERVAL = "plant_discovery_interval"
+DEFAULT_PLANT_DISCOVERY_INTERVAL = 60
+
+# sensors reporting the integration's own metrics
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+DEFAULT_DIAGNOSTIC_SENSORS = False
+
+# limit the state writes of the sensors to reduce the rows written by the recorder
+CONF_REDUCE_RECORDER_WRITES = "reduce_recorder_writes"
+DEFAULT_REDUCE_RECORDER_WRITES = False
+
+# limit of the requests of an account (sustained rate in requests per minute, 0
+# disables the limit) and the number of requests that may be sent at once
+CONF_RATE_LIMIT = "rate_limit"
+DEFAULT_RATE_LIMIT = 300
+CONF_RATE_LIMIT_BURST = "rate_limit_burst"
+DEFAULT_RATE_LIMIT_BURST = 30
+
+# time the work done on the event loop and log slow sections (for debugging)
+CONF_DETECT_LOOP_BLOCKING = "detect_loop_blocking"
+DEFAULT_DETECT_LOOP_BLOCKING = False
+
+# record the API traffic to a compressed file in the config directory, so it can be
+# replayed offline (for debugging and benchmarks)
+CONF_CAPTURE_TRAFFIC = "capture_traffic"
+DEFAULT_CAPTURE_TRAFFIC = False
+
+# import the 5 minute series of the plants into the long-term statistics (as hourly energy)
+CONF_IMPORT_STATISTICS = "import_statistics"
+DEFAULT_IMPORT_STATISTICS = False
+
+# days that are backfilled automatically after an outage (0 disables the backfill)
+CONF_BACKFILL_DAYS = "backfill_days"
+DEFAULT_BACKFILL_DAYS = 7
+# longest backfill that may be requested through the service (in days)
+MAX_BACKFILL_DAYS = 90
+
+# export the data of every update to a time-series database
+CONF_EXPORT_TARGET = "export_target"
+EXPORT_TARGET_NONE = "none"
+EXPORT_TARGET_INFLUXDB = "influxdb"
+EXPORT_TARGET_MQTT = "mqtt"
+DEFAULT_EXPORT_TARGET = EXPORT_TARGET_NONE
+# write URL and API token of the InfluxDB export
+CONF_EXPORT_URL = "export_url"
+DEFAULT_EXPORT_URL = ""
+CONF_EXPORT_TOKEN = "export_token"
+DEFAULT_EXPORT_TOKEN = ""
+# topic of the MQTT export
+CONF_EXPORT_TOPIC = "export_topic"
+DEFAULT_EXPORT_TOPIC = "fusion_solar/points"
@@ -0,0 +1,198 @@
+"""Validation of the daily energy counters reported by the FusionSolar API"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime
+import logging
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# number of accepted readings per counter the rules are scaled with
+WINDOW_SIZE = 24
+# a decrease to below this share of the window's peak is a reset of the daily counter
+RESET_RATIO = 0.1
+# decreases to below this value are always resets (in kWh) - relevant for small plants
+MIN_RESET_THRESHOLD = 1.5
+# a decrease that is reported this many times in a row is accepted as a correction
+CONFIRM_READINGS = 3
+
+# key of the account's totals in the validated data
+TOTAL = None
+
+
+class CounterState:
+    """Accepted readings and last reset of a single counter"""
+
+    def __init__(self, last_reset: datetime | None = None) -> None:
+        """Create a new CounterState
+
+        :param last_reset: The counter's last known reset
+        :type last_reset: datetime, optional
+        """
+        self.last_reset = last_reset
+        self.value: float | None = None
+        self.window: deque[float] = deque(maxlen=WINDOW_SIZE)
+        # decreased readings that were not accepted yet
+        self.pending = 0
+        # number of entities reading the counter
+        self.readers = 0
+
+    def validate(self, reading: float) -> tuple[float, str | None]:
+        """Validate a new reading of the counter
+
+        :param reading: The reported value
+        :type reading: float
+        :return: The validated value and the rule that applied (reset, glitch,
+                 correction) or None if the reading was accepted as is
+        :rtype: tuple[float, str | None]
+        """
+        rule = None
+
+        if self.value is not None and reading < self.value:
+            # the thresholds scale with the size of the plant
+            if reading < max(MIN_RESET_THRESHOLD, RESET_RATIO * max(self.window)):
+                rule = "reset"
+                self.last_reset = dt_util.now()
+                self.window.clear()
+            elif self.pending + 1 < CONFIRM_READINGS:
+                self.pending += 1
+                return self.value, "glitch"
+            else:
+                rule = "correction"
+
+        self.value = reading
+        self.pending = 0
+        self.window.append(reading)
+
+        return reading, rule
+
+
+class CounterValidator:
+    """Validates the daily counters of all plants of a config entry in one
+    pass per update cycle.
+
+    FusionSolar sometimes reports a daily counter a bit lower than before and
+    corrects it with the next update. Decreases close to zero are resets of
+    the counter. Glitches are replaced by the last accepted value, so the
+    entities only render the validated values and the reset times.
+    """
+
+    def __init__(self) -> None:
+        """Create a new CounterValidator"""
+        # the counters' states by plant id (TOTAL for the account's totals) and data path
+        self._counters: dict[str | None, dict[tuple, CounterState]] = {}
+        # the validated data by plant id - unchanged objects were not fetched again
+        self._validated: dict[str | None, object] = {}
+
+        self.resets = 0
+        self.glitches = 0
+        self.corrections = 0
+
+    @callback
+    def async_add_counter(
+        self, data_path: tuple, last_reset: datetime | None = None
+    ) -> Callable[[], None]:
+        """Register a counter that is validated with every update
+
+        :param data_path: The keys leading to the counter within the coordinator's data
+        :type data_path: tuple
+        :param last_reset: The counter's last known reset
+        :type last_reset: datetime, optional
+        :return: Function removing the counter again
+        :rtype: Callable[[], None]
+        """
+        counters = self._counters.setdefault(_get_plant_id(data_path), {})
+        state = counters.setdefault(data_path, CounterState(last_reset))
+        state.readers += 1
+
+        @callback
+        def remove_counter() -> None:
+            state.readers -= 1
+
+            if not state.readers:
+                counters.pop(data_path, None)
+
+        return remove_counter
+
+    def get_last_reset(self, data_path: tuple) -> datetime | None:
+        """The last reset of a counter
+
+        :param data_path: The keys leading to the counter
+        :type data_path: tuple
+        :return: The last reset or None if the counter is unknown
+        :rtype: datetime, optional
+        """
+        state = self._counters.get(_get_plant_id(data_path), {}).get(data_path)
+
+        return state.last_reset if state else None
+
+    def validate(self, data: dict) -> None:
+        """Validate the counters of all plants whose data was fetched again.
+        Glitches are replaced within the data.
+
+        :param data: The data of a coordinator's update
+        :type data: dict
+        """
+        sections: dict[str | None, dict] = dict(data.get("plants", {}))
+
+        if "total" in data:
+            sections[TOTAL] = data["total"]
+
+        for plant_id, section in sections.items():
+            if section is self._validated.get(plant_id):
+                continue
+
+            self._validated[plant_id] = section
+
+            for data_path, state in self._counters.get(plant_id, {}).items():
+                self._validate_counter(section, data_path, state)
+
+    def _validate_counter(self, section: dict, data_path: tuple, state: CounterState) -> None:
+        """Validate a single counter of a plant's or the account's data"""
+        # the path within the plant's or the account's data
+        keys = data_path[2:] if _is_plant_path(data_path) else data_path[1:]
+        parent = section
+
+        for key in keys[:-1]:
+            parent = parent.get(key) if isinstance(parent, dict) else None
+
+        if not isinstance(parent, dict) or not isinstance(parent.get(keys[-1]), (int, float)):
+            return
+
+        reading = parent[keys[-1]]
+        value, rule = state.validate(reading)
+
+        if rule == "glitch":
+            self.glitches += 1
+            parent[keys[-1]] = value
+            _LOGGER.debug(f"Ignoring invalid update of {data_path}: {reading} < {value}")
+        elif rule == "reset":
+            self.resets += 1
+            _LOGGER.debug(f"New last reset of {data_path}: {state.last_reset}")
+        elif rule == "correction":
+            self.corrections += 1
+            _LOGGER.debug(f"Accepting corrected value of {data_path}: {reading}")
+
+    def as_dict(self) -> dict:
+        """Return the validator's state as a serializable dict"""
+        return {
+            "counters": sum(len(counters) for counters in self._counters.values()),
+            "resets": self.resets,
+            "glitches": self.glitches,
+            "corrections": self.corrections,
+        }
+
+
+def _is_plant_path(data_path: tuple) -> bool:
+    """Whether the data path leads to a plant's value"""
+    return len(data_path) > 2 and data_path[0] == "plants"
+
+
+def _get_plant_id(data_path: tuple) -> str | None:
+    """The plant id of a data path or TOTAL for the account's totals"""
+    return data_path[1] if _is_plant_path(data_path) else TOTAL
@@ -0,0 +1,145 @@
+"""Metrics derived from the day series of the plants"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# length of a slot of the day series (in hours)
+SLOT_HOURS = 5 / 60
+
+# series required for the derived metrics
+DERIVED_SERIES = ("productPower", "usePower", "selfUsePower", "onGridPower")
+
+# the API reports missing values as "--"
+MISSING_VALUES = ("--", "", None)
+
+DERIVED_METRICS = (
+    "peak_power_kw",
+    "integrated_energy_kwh",
+    "self_consumption_ratio",
+    "autarky_ratio",
+    "export_ratio",
+)
+
+
+def _to_float(value) -> float:
+    """Convert a single value. Invalid values become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_matrix(series: list, width: int) -> np.ndarray:
+    """Stack the series of all plants into one float array with a row per plant.
+    Missing values ("--") and the padding of shorter series become NaN.
+
+    :param series: The series of every plant. Anything but a list counts as an empty series.
+    :type series: list
+    :param width: The number of columns (slots)
+    :type width: int
+    :return: The array of shape (plants, width)
+    :rtype: np.ndarray
+    """
+    series = [values if isinstance(values, list) else [] for values in series]
+    lengths = np.array([len(values) for values in series])
+
+    # all values are converted at once
+    flat = np.array([value for values in series for value in values], dtype=object)
+    flat[np.isin(flat, MISSING_VALUES)] = np.nan
+
+    try:
+        flat = flat.astype(float)
+    except (TypeError, ValueError):
+        # invalid values are treated as missing
+        flat = np.vectorize(_to_float, otypes=[float])(flat)
+
+    matrix = np.full((len(series), width), np.nan)
+    # the values fill every row from its start, in the order they were flattened
+    matrix[np.arange(width) < lengths[:, np.newaxis]] = flat
+
+    return matrix
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Row-wise ratios in percent. NaN if the denominator is not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator * 100, np.nan)
+
+
+def _to_value(value: float) -> float | None:
+    """A metric as stored in the coordinator's data. NaN becomes None."""
+    return None if np.isnan(value) else float(value)
+
+
+def compute_derived_metrics(plants_data: dict[str, dict]) -> dict[str, dict[str, float | None]]:
+    """Compute the derived metrics of all plants from their day series.
+
+    The series of all plants are stacked into one array per series, so
+    the metrics of all plants are computed at once. The ratios cover the
+    whole day. This function should be run in the executor.
+
+    :param plants_data: The stats of every plant as returned by get_plant_stats
+    :type plants_data: dict[str, dict]
+    :return: The derived metrics of every plant. Metrics that cannot be computed are None.
+    :rtype: dict[str, dict[str, float | None]]
+    """
+    if not plants_data:
+        return {}
+
+    width = max(
+        (
+            len(plant_data.get(series))
+            for plant_data in plants_data.values()
+            for series in DERIVED_SERIES
+            if isinstance(plant_data.get(series), list)
+        ),
+        default=0,
+    )
+
+    product, use, self_use, on_grid = (
+        _to_matrix([plant_data.get(series) for plant_data in plants_data.values()], width)
+        for series in DERIVED_SERIES
+    )
+
+    # plants without any production have no derived metrics
+    has_production = ~np.isnan(product).all(axis=1)
+    produced = np.nansum(product, axis=1)
+
+    # the ratios only compare the slots in which both series have a value
+    self_used = ~np.isnan(self_use)
+    product_slots = self_used & ~np.isnan(product)
+    use_slots = self_used & ~np.isnan(use)
+
+    metrics = np.stack(
+        [
+            # fmax skips the missing values
+            np.fmax.reduce(product, axis=1, initial=-np.inf),
+            # the power series is integrated over the 5 minute slots
+            produced * SLOT_HOURS,
+            # share of the production that was used directly
+            _ratio(
+                np.sum(self_use, axis=1, where=product_slots),
+                np.sum(product, axis=1, where=product_slots),
+            ),
+            # share of the consumption that was covered by the production
+            _ratio(
+                np.sum(self_use, axis=1, where=use_slots),
+                np.sum(use, axis=1, where=use_slots),
+            ),
+            np.where(
+                ~np.isnan(on_grid).all(axis=1),
+                _ratio(np.nansum(on_grid, axis=1), produced),
+                np.nan,
+            ),
+        ],
+        axis=1,
+    )
+    metrics[~has_production] = np.nan
+
+    return {
+        plant_id: {
+            metric: _to_value(value) for metric, value in zip(DERIVED_METRICS, plant_metrics)
+        }
+        for plant_id, plant_metrics in zip(plants_data, metrics)
+    }
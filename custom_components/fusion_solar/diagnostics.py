@@ -0,0 +1,82 @@
+"""Diagnostics support for the FusionSolar integration"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    BACKFILL,
+    CONF_EXPORT_TOKEN,
+    COORDINATOR,
+    DOMAIN,
+    EXPORTER,
+    PLANT_COORDINATORS,
+)
+from .update_coordinator import DEFAULT_SOURCE_TIERS, FusionSolarBaseCoordinator
+
+TO_REDACT = {"username", "password", CONF_EXPORT_TOKEN}
+
+
+def _get_coordinator_diagnostics(coordinator: FusionSolarBaseCoordinator) -> dict[str, Any]:
+    """Update state and metrics of a coordinator"""
+    return {
+        "last_update_success": coordinator.last_update_success,
+        "update_interval_seconds": coordinator.update_interval.total_seconds()
+        if coordinator.update_interval
+        else None,
+        "stale": coordinator.stale,
+        "stale_plants": (coordinator.data or {}).get("stale_plants", {}),
+        "failed_plant_fetches": coordinator.failed_plant_fetches,
+        "delivered_updates": coordinator.delivered_updates,
+        "skipped_updates": coordinator.skipped_updates,
+        "updates": coordinator.metrics.as_dict(),
+        "circuit_breaker": coordinator.breaker.as_dict(),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return the diagnostics of a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data[COORDINATOR]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": async_redact_data(entry.options, TO_REDACT),
+        },
+        "coordinator": {
+            **_get_coordinator_diagnostics(coordinator),
+            "plant_count": len(coordinator.plant_ids or []),
+            "stale_total": (coordinator.data or {}).get("stale_total"),
+            "failed_total_fetches": coordinator.failed_total_fetches,
+            "last_update_duration": coordinator.last_update_duration,
+            "plant_latencies": coordinator.plant_latencies,
+            "poll_decision": coordinator.poll_decision.as_dict()
+            if coordinator.poll_decision
+            else None,
+            "loop_blocking": coordinator.loop_monitor.as_dict(),
+            "counter_validation": coordinator.counter_validator.as_dict(),
+            "source_intervals_seconds": {
+                source: coordinator.get_source_interval(source).total_seconds()
+                for source in DEFAULT_SOURCE_TIERS
+            },
+        },
+        "plant_coordinators": {
+            plant_id: _get_coordinator_diagnostics(plant_coordinator)
+            for plant_id, plant_coordinator in entry_data[PLANT_COORDINATORS].items()
+        },
+        "requests": {
+            **coordinator.my_api.metrics.as_dict(),
+            "merged_requests": coordinator.my_api.merged_requests,
+            "cache": coordinator.my_api.cache.as_dict(),
+            "rate_limiter": coordinator.my_api.rate_limiter.as_dict(),
+        },
+        "backfill": entry_data[BACKFILL].as_dict() if entry_data[BACKFILL] else None,
+        "exporter": entry_data[EXPORTER].as_dict() if entry_data[EXPORTER] else None,
+    }
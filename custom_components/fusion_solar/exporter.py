@@ -0,0 +1,439 @@
+"""Export of the coordinators' data to a time-series database"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, tzinfo
+import logging
+import math
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .update_coordinator import FusionSolarBaseCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# the spool is written at most once within this time (in seconds)
+STORAGE_SAVE_DELAY = 10
+
+# points are collected for this time, so the updates of all plant coordinators
+# share a batch (in seconds)
+BATCH_DELAY = 5
+# maximum number of points per write
+MAX_BATCH_SIZE = 5000
+# maximum number of queued points. The oldest points are dropped first.
+MAX_QUEUE_SIZE = 50000
+
+# attempts of a single write and the delay before the first retry (in seconds)
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 2
+# timeout of a single write (in seconds)
+WRITE_TIMEOUT = 10
+
+MEASUREMENT_TOTAL = "fusion_solar_total"
+MEASUREMENT_PLANT = "fusion_solar_plant"
+
+
+def _get_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """The store of an entry's export spool"""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.export_spool")
+
+
+async def async_remove_spool(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the export spool of a config entry
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :param entry_id: The config entry's id
+    :type entry_id: str
+    """
+    await _get_store(hass, entry_id).async_remove()
+
+
+def _escape(value: str) -> str:
+    """Escape a measurement, tag or field key of the line protocol"""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace("=", "\\=")
+        .replace(" ", "\\ ")
+    )
+
+
+def create_line(measurement: str, tags: dict[str, str], values: dict, timestamp: int) -> str | None:
+    """Create a point in InfluxDB's line protocol
+
+    Series values are exported with their last value. Values that are not
+    numeric are left out.
+
+    :param measurement: The measurement's name
+    :type measurement: str
+    :param tags: The point's tags
+    :type tags: dict[str, str]
+    :param values: The values as stored in the coordinator's data
+    :type values: dict
+    :param timestamp: The point's time (in nanoseconds since epoch)
+    :type timestamp: int
+    :return: The point or None if it has no numeric value
+    :rtype: str, optional
+    """
+    fields = []
+
+    for key, value in values.items():
+        if isinstance(value, dict):
+            value = value.get("value")
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+
+        if not math.isfinite(value):
+            continue
+
+        fields.append(f"{_escape(key)}={float(value)!r}")
+
+    if not fields:
+        return None
+
+    tag_set = "".join(f",{_escape(key)}={_escape(value)}" for key, value in tags.items())
+
+    return f"{_escape(measurement)}{tag_set} {','.join(fields)} {timestamp}"
+
+
+def _to_timestamp(measurement_time: str | None, time_zone: tzinfo) -> int | None:
+    """Convert the time of a slot ("%Y-%m-%d %H:%M", local) or of the power
+    status (ISO format) to nanoseconds since epoch
+
+    :return: The timestamp or None if the time cannot be parsed
+    :rtype: int, optional
+    """
+    try:
+        parsed = datetime.strptime(measurement_time, "%Y-%m-%d %H:%M").replace(tzinfo=time_zone)
+    except (TypeError, ValueError):
+        parsed = dt_util.parse_datetime(measurement_time or "")
+
+    if parsed is None:
+        return None
+
+    return round(parsed.timestamp()) * 1_000_000_000
+
+
+def create_plant_lines(plant_id: str, plant_data: dict, time_zone: tzinfo) -> list[str]:
+    """Create the points of a plant at the times of its measurements
+
+    Series values are exported at the time of their last slot. The plant's
+    other values (daily totals, ratios, derived metrics) are exported with
+    the latest slot.
+
+    :param plant_id: The plant's id
+    :type plant_id: str
+    :param plant_data: The plant's values as stored in the coordinator's data
+    :type plant_data: dict
+    :param time_zone: The time zone of the slot times
+    :type time_zone: tzinfo
+    :return: The points. Empty if no value has a measurement time.
+    :rtype: list[str]
+    """
+    values_by_time: dict[str | None, dict] = {}
+
+    for key, value in plant_data.items():
+        slot_time = value.get("time") if isinstance(value, dict) else None
+        values_by_time.setdefault(slot_time, {})[key] = value
+
+    other_values = values_by_time.pop(None, {})
+
+    # the slot times sort chronologically
+    if not values_by_time:
+        return []
+
+    values_by_time[max(values_by_time)].update(other_values)
+
+    lines = []
+
+    for slot_time, values in values_by_time.items():
+        if (timestamp := _to_timestamp(slot_time, time_zone)) is None:
+            continue
+
+        if line := create_line(MEASUREMENT_PLANT, {"plant": plant_id}, values, timestamp):
+            lines.append(line)
+
+    return lines
+
+
+class InfluxDBSink:
+    """Writes the points to InfluxDB's HTTP write API"""
+
+    def __init__(self, session: aiohttp.ClientSession, url: str, token: str = "") -> None:
+        """Create a new InfluxDBSink
+
+        :param session: The aiohttp session to use
+        :type session: aiohttp.ClientSession
+        :param url: The write URL including the bucket (and org), e.g.
+                    http://localhost:8086/api/v2/write?org=home&bucket=solar
+        :type url: str
+        :param token: The API token, if required
+        :type token: str
+        """
+        self._session = session
+        self._url = url
+        self._headers = {"Content-Type": "text/plain; charset=utf-8"}
+
+        if token:
+            self._headers["Authorization"] = f"Token {token}"
+
+    async def async_write(self, lines: list[str]) -> None:
+        """Write a batch of points
+
+        :raises aiohttp.ClientError: If the points were not accepted
+        """
+        async with self._session.post(
+            self._url,
+            data="\n".join(lines).encode(),
+            params={"precision": "ns"},
+            headers=self._headers,
+            timeout=aiohttp.ClientTimeout(total=WRITE_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+
+
+class MqttSink:
+    """Publishes the points in line protocol through Home Assistant's MQTT integration"""
+
+    def __init__(self, hass: HomeAssistant, topic: str) -> None:
+        """Create a new MqttSink
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param topic: The topic the batches are published to
+        :type topic: str
+        """
+        self._hass = hass
+        self._topic = topic
+
+    async def async_write(self, lines: list[str]) -> None:
+        """Publish a batch of points as a single message
+
+        :raises HomeAssistantError: If the MQTT integration is not available
+        """
+        # the MQTT integration is only loaded if it is the export's target
+        from homeassistant.components import mqtt  # pylint: disable=import-outside-toplevel
+
+        await mqtt.async_publish(self._hass, self._topic, "\n".join(lines), qos=1)
+
+
+class FusionSolarExporter:
+    """Exports the data of every successful update to a time-series database.
+
+    The points of all plants are queued and written in batches. Failed
+    writes are retried. Points that could not be written stay queued and
+    are stored in a spool, so they are written once the sink is reachable
+    again - also after a restart. Only plants whose data was fetched again
+    are exported.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, sink: InfluxDBSink | MqttSink) -> None:
+        """Create a new FusionSolarExporter
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        :param sink: Writes the batches
+        :type sink: InfluxDBSink | MqttSink
+        """
+        self._hass = hass
+        self._sink = sink
+        self._store = _get_store(hass, entry_id)
+
+        self._queue: deque[str] = deque()
+        self._task: asyncio.Task | None = None
+        self._unsub_flush: Callable[[], None] | None = None
+        self._unsub_coordinators: dict[FusionSolarBaseCoordinator, Callable[[], None]] = {}
+
+        # the exported values by plant id - unchanged objects were not fetched again
+        self._exported: dict[str, object] = {}
+
+        self.exported_points = 0
+        self.dropped_points = 0
+        self.failed_writes = 0
+
+    async def async_load(self) -> None:
+        """Load the points that could not be written before the last shutdown"""
+        stored_data = await self._store.async_load() or {}
+
+        self._queue.extend(stored_data.get("lines", []))
+
+        if self._queue:
+            _LOGGER.info(f"Loaded {len(self._queue)} spooled points")
+
+    @callback
+    def async_add_coordinator(self, coordinator: FusionSolarBaseCoordinator) -> None:
+        """Export the data of every successful update of the coordinator
+
+        :param coordinator: The account's or a plant's coordinator
+        :type coordinator: FusionSolarBaseCoordinator
+        """
+        self._unsub_coordinators[coordinator] = coordinator.async_add_listener(
+            lambda: self._async_collect(coordinator)
+        )
+
+    @callback
+    def async_remove_coordinator(self, coordinator: FusionSolarBaseCoordinator) -> None:
+        """Stop exporting the data of a coordinator
+
+        :param coordinator: The coordinator
+        :type coordinator: FusionSolarBaseCoordinator
+        """
+        if unsub := self._unsub_coordinators.pop(coordinator, None):
+            unsub()
+
+    @callback
+    def _async_collect(self, coordinator: FusionSolarBaseCoordinator) -> None:
+        """Queue the points of a coordinator's update and schedule the batch"""
+        if not coordinator.last_update_success or coordinator.stale or not coordinator.data:
+            return
+
+        with coordinator.loop_monitor.section("export points", coordinator.name):
+            self._queue_points(coordinator.data)
+
+        if self._queue and not self._unsub_flush and not self._task:
+            self._unsub_flush = async_call_later(self._hass, BATCH_DELAY, self._async_start_flush)
+
+    def _queue_points(self, data: dict) -> None:
+        """Queue the points of all plants whose data was fetched again. The
+        points carry the time of their measurement, so spooled and retried
+        points keep their time.
+        """
+        lines = []
+
+        if (total := data.get("total")) is not self._exported.get("total") and total:
+            if (timestamp := _to_timestamp(total.get("time"), dt_util.UTC)) is not None:
+                lines.append(create_line(MEASUREMENT_TOTAL, {}, total, timestamp))
+
+            self._exported["total"] = total
+
+        for plant_id, plant_data in data.get("plants", {}).items():
+            if plant_data is self._exported.get(plant_id):
+                continue
+
+            lines.extend(create_plant_lines(plant_id, plant_data, dt_util.DEFAULT_TIME_ZONE))
+            self._exported[plant_id] = plant_data
+
+        self._queue.extend(line for line in lines if line)
+        self._trim_queue()
+
+    @callback
+    def _async_start_flush(self, _now=None) -> None:
+        """Start writing the queued points in the background"""
+        self._unsub_flush = None
+
+        if self._task:
+            return
+
+        self._task = self._hass.async_create_background_task(
+            self.async_flush(), f"{DOMAIN} export"
+        )
+
+    def _trim_queue(self) -> None:
+        """Drop the oldest points if the queue is full"""
+        while len(self._queue) > MAX_QUEUE_SIZE:
+            self._queue.popleft()
+            self.dropped_points += 1
+
+    async def async_flush(self) -> None:
+        """Write all queued points. Stops at the first batch that cannot be written."""
+        try:
+            while self._queue:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(MAX_BATCH_SIZE, len(self._queue)))
+                ]
+
+                try:
+                    written = await self._async_write(batch)
+                except asyncio.CancelledError:
+                    self._queue.extendleft(reversed(batch))
+                    raise
+
+                if not written:
+                    # the batch stays queued and is spooled until the next update
+                    self._queue.extendleft(reversed(batch))
+                    self._trim_queue()
+                    break
+
+                self.exported_points += len(batch)
+        finally:
+            self._task = None
+            self._save()
+
+    async def _async_write(self, batch: list[str]) -> bool:
+        """Write a batch and retry failed writes with an increasing delay
+
+        :return: Whether the batch was written
+        :rtype: bool
+        """
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                await self._sink.async_write(batch)
+                return True
+            except Exception as err:
+                self.failed_writes += 1
+
+                if attempt + 1 == MAX_ATTEMPTS:
+                    _LOGGER.warning(
+                        f"Failed to export {len(batch)} points, {len(self._queue) + len(batch)} "
+                        f"points are spooled: {err}"
+                    )
+                    return False
+
+                _LOGGER.debug(f"Failed to export {len(batch)} points, retrying: {err}")
+                await asyncio.sleep(RETRY_DELAY * 2**attempt)
+
+        return False
+
+    async def async_stop(self) -> None:
+        """Stop the export and spool the points that were not written yet"""
+        for unsub in self._unsub_coordinators.values():
+            unsub()
+
+        self._unsub_coordinators.clear()
+
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        if self._task:
+            self._task.cancel()
+
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+        await self._store.async_save(self._get_store_data())
+
+    def _save(self) -> None:
+        """Write the spool delayed"""
+        self._store.async_delay_save(self._get_store_data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _get_store_data(self) -> dict:
+        """The queued points as serializable dict"""
+        return {"lines": list(self._queue)}
+
+    def as_dict(self) -> dict:
+        """Return the exporter's state as a serializable dict"""
+        return {
+            "queued_points": len(self._queue),
+            "exported_points": self.exported_points,
+            "dropped_points": self.dropped_points,
+            "failed_writes": self.failed_writes,
+        }
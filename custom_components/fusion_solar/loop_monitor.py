@@ -0,0 +1,94 @@
+"""Detection of code blocking the event loop"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# sections running longer than this are reported (in seconds)
+DEFAULT_THRESHOLD = 0.02
+
+
+class SectionStats:
+    """Durations of a single section"""
+
+    def __init__(self) -> None:
+        """Create new, empty SectionStats"""
+        self.count = 0
+        self.slow_count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def as_dict(self) -> dict:
+        """Return the stats as a serializable dict"""
+        return {
+            "count": self.count,
+            "slow_count": self.slow_count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+        }
+
+
+class LoopBlockingDetector:
+    """Times the sections of the integration that run on the event loop.
+
+    A section must not await anything, so its duration is the time the loop
+    was blocked. Sections slower than the threshold are logged. If disabled,
+    the sections are not timed.
+    """
+
+    def __init__(self, enabled: bool = False, threshold: float = DEFAULT_THRESHOLD) -> None:
+        """Create a new LoopBlockingDetector
+
+        :param enabled: Whether the sections are timed
+        :type enabled: bool
+        :param threshold: Sections running longer are reported (in seconds)
+        :type threshold: float
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.sections: dict[str, SectionStats] = {}
+
+    @contextmanager
+    def section(self, name: str, detail: str | None = None) -> Iterator[None]:
+        """Time a section of code running on the event loop
+
+        :param name: Name of the section. The stats are aggregated by name.
+        :type name: str
+        :param detail: Added to the log message, e.g. the entity's id
+        :type detail: str, optional
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+
+            stats = self.sections.setdefault(name, SectionStats())
+            stats.count += 1
+            stats.total += duration
+            stats.max = max(stats.max, duration)
+
+            if duration > self.threshold:
+                stats.slow_count += 1
+                _LOGGER.warning(
+                    f"{name}{f' ({detail})' if detail else ''} blocked the event loop "
+                    f"for {duration * 1000:.1f} ms"
+                )
+
+    def as_dict(self) -> dict:
+        """Return the detector's state as a serializable dict"""
+        return {
+            "enabled": self.enabled,
+            "threshold_seconds": self.threshold,
+            "sections": {name: stats.as_dict() for name, stats in self.sections.items()},
+        }
@@ -0,0 +1,214 @@
+"""Request and update metrics of the FusionSolar integration"""
+
+from __future__ import annotations
+
+from collections import deque
+import statistics
+
+# upper bounds of the latency histogram's buckets (in seconds)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# number of update cycles kept for the statistics
+CYCLE_HISTORY = 100
+
+
+class LatencyHistogram:
+    """Counts latencies in fixed buckets"""
+
+    def __init__(self) -> None:
+        """Create a new, empty LatencyHistogram"""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency: float) -> None:
+        """Add a measurement
+
+        :param latency: The latency (in seconds)
+        :type latency: float
+        """
+        bucket = 0
+
+        while bucket < len(LATENCY_BUCKETS) and latency > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+
+        self.counts[bucket] += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def as_dict(self) -> dict:
+        """Return the histogram as a serializable dict"""
+        count = sum(self.counts)
+
+        return {
+            "buckets": {
+                **{
+                    f"le_{bound}": bucket_count
+                    for bound, bucket_count in zip(LATENCY_BUCKETS, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+            "mean": self.total / count if count else None,
+            "max": self.max,
+        }
+
+
+class EndpointMetrics:
+    """Calls, errors and latencies of a single endpoint"""
+
+    def __init__(self) -> None:
+        """Create new, empty EndpointMetrics"""
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latency = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a serializable dict"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency": self.latency.as_dict(),
+        }
+
+
+class RequestMetrics:
+    """Metrics of the requests sent by a client"""
+
+    def __init__(self) -> None:
+        """Create new, empty RequestMetrics"""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.logins = 0
+
+    def record_request(
+        self, endpoint: str, latency: float, error: bool = False, timeout: bool = False
+    ) -> None:
+        """Record a finished request
+
+        :param endpoint: Name of the endpoint
+        :type endpoint: str
+        :param latency: Duration of the request (in seconds)
+        :type latency: float
+        :param error: Whether the request failed
+        :type error: bool
+        :param timeout: Whether the request timed out
+        :type timeout: bool
+        """
+        metrics = self.endpoints.setdefault(endpoint, EndpointMetrics())
+        metrics.calls += 1
+        metrics.latency.add(latency)
+
+        if error:
+            metrics.errors += 1
+
+        if timeout:
+            metrics.timeouts += 1
+
+    def record_login(self) -> None:
+        """Record a successful login"""
+        self.logins += 1
+
+    @property
+    def calls(self) -> int:
+        """Number of requests across all endpoints"""
+        return sum(metrics.calls for metrics in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        """Number of failed requests across all endpoints"""
+        return sum(
+            metrics.errors + metrics.timeouts for metrics in self.endpoints.values()
+        )
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Mean latency across all endpoints (in seconds)"""
+        if not self.calls:
+            return None
+
+        return (
+            sum(metrics.latency.total for metrics in self.endpoints.values()) / self.calls
+        )
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a serializable dict"""
+        return {
+            "logins": self.logins,
+            # the first login is not a re-login
+            "relogins": max(self.logins - 1, 0),
+            "endpoints": {
+                endpoint: metrics.as_dict()
+                for endpoint, metrics in self.endpoints.items()
+            },
+        }
+
+
+class UpdateMetrics:
+    """Metrics of the update cycles of a coordinator"""
+
+    def __init__(self) -> None:
+        """Create new, empty UpdateMetrics"""
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.timeouts = 0
+        self.durations: deque[float] = deque(maxlen=CYCLE_HISTORY)
+
+        # state writes of the entities per update cycle
+        self.writes: deque[int] = deque(maxlen=CYCLE_HISTORY)
+        self.deferred_writes = 0
+        self._cycle_writes = 0
+
+    def record_cycle(self, duration: float, success: bool, timeout: bool = False) -> None:
+        """Record a finished update cycle
+
+        :param duration: Duration of the cycle (in seconds)
+        :type duration: float
+        :param success: Whether the cycle succeeded
+        :type success: bool
+        :param timeout: Whether the cycle timed out
+        :type timeout: bool
+        """
+        self.cycles += 1
+        self.durations.append(duration)
+
+        if not success:
+            self.failed_cycles += 1
+
+        if timeout:
+            self.timeouts += 1
+
+    def record_write(self, deferred: bool = False) -> None:
+        """Record a state write of an entity
+
+        :param deferred: Whether the write was deferred instead
+        :type deferred: bool
+        """
+        if deferred:
+            self.deferred_writes += 1
+        else:
+            self._cycle_writes += 1
+
+    def end_write_cycle(self) -> None:
+        """Store the writes since the last update cycle. Deferred writes count
+        towards the cycle they are written in.
+        """
+        self.writes.append(self._cycle_writes)
+        self._cycle_writes = 0
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a serializable dict"""
+        return {
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "timeouts": self.timeouts,
+            "duration": {
+                "last": self.durations[-1] if self.durations else None,
+                "mean": statistics.fmean(self.durations) if self.durations else None,
+                "max": max(self.durations, default=None),
+            },
+            "state_writes_per_cycle": {
+                "last": self.writes[-1] if self.writes else None,
+                "mean": statistics.fmean(self.writes) if self.writes else None,
+            },
+            "deferred_writes": self.deferred_writes,
+        }
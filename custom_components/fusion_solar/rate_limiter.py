@@ -0,0 +1,210 @@
+"""Rate limiter for the requests to the FusionSolar API"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import itertools
+import logging
+import time
+
+from .metrics import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# priorities of the requests - lower values are sent first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+# priority of the requests sent by the current task
+_request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Send the requests within the block with the given priority
+
+    :param priority: One of the PRIORITY_* constants
+    :type priority: int
+    """
+    token = _request_priority.set(priority)
+
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def get_strictest_limits(limits: Iterable[tuple[float, int]]) -> tuple[float, int]:
+    """The strictest of several limits, e.g. of the entries sharing a client
+
+    :param limits: Pairs of rate (in requests per second) and burst. Must not be empty.
+    :type limits: Iterable[tuple[float, int]]
+    :return: The lowest rate and the lowest burst
+    :rtype: tuple[float, int]
+    """
+    limits = list(limits)
+    rates = [rate for rate, _ in limits if rate]
+
+    return min(rates, default=0), min(burst for _, burst in limits)
+
+
+class RateLimiter:
+    """Token bucket limiting the rate of requests.
+
+    Up to burst requests are sent at once. After that, the requests are
+    delayed to the sustained rate. Waiting requests are released by
+    priority and in the order they arrived.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Create a new RateLimiter
+
+        :param rate: Sustained rate (in requests per second). 0 disables the limit.
+        :type rate: float
+        :param burst: Number of requests that may be sent at once
+        :type burst: int
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+        # queueing delays by priority
+        self.delays: dict[int, LatencyHistogram] = {}
+        self.delayed_requests = 0
+
+    def set_limits(self, rate: float, burst: int) -> None:
+        """Change the limits. Used if the entries sharing a client change.
+
+        :param rate: Sustained rate (in requests per second). 0 disables the limit.
+        :type rate: float
+        :param burst: Number of requests that may be sent at once
+        :type burst: int
+        """
+        # the tokens up to now are added at the old rate
+        self._refill()
+
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = min(self._tokens, self.burst)
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self.rate:
+            # without a rate, the waiting requests are sent right away
+            while self._waiters:
+                _, _, future = heapq.heappop(self._waiters)
+
+                if not future.done():
+                    future.set_result(None)
+            return
+
+        self._schedule_release()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent. The priority is taken from the
+        current context (see request_priority).
+        """
+        priority = _request_priority.get()
+
+        if not self.rate:
+            self._record(priority, 0.0)
+            return
+
+        self._refill()
+
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(priority, 0.0)
+            return
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._schedule_release()
+
+        # a cancelled waiter is skipped by the release
+        await future
+
+        self.delayed_requests += 1
+        self._record(priority, time.monotonic() - start)
+
+    def _refill(self) -> None:
+        """Add the tokens of the time passed since the last refill"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _schedule_release(self) -> None:
+        """Release the next waiter once a token is available"""
+        if self._timer or not self._waiters:
+            return
+
+        self._timer = asyncio.get_running_loop().call_later(
+            max(0.0, (1 - self._tokens) / self.rate), self._release
+        )
+
+    def _release(self) -> None:
+        """Release as many waiters as there are tokens"""
+        self._timer = None
+        self._refill()
+
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+
+            if future.done():
+                continue
+
+            self._tokens -= 1
+            future.set_result(None)
+
+        # drop cancelled waiters, so no timer is scheduled for them
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        self._schedule_release()
+
+    def _record(self, priority: int, delay: float) -> None:
+        """Record the queueing delay of a request"""
+        self.delays.setdefault(priority, LatencyHistogram()).add(delay)
+
+    @property
+    def waiting(self) -> int:
+        """Number of requests waiting"""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @property
+    def mean_delay(self) -> float | None:
+        """Mean queueing delay across all priorities (in seconds)"""
+        count = sum(sum(histogram.counts) for histogram in self.delays.values())
+
+        if not count:
+            return None
+
+        return sum(histogram.total for histogram in self.delays.values()) / count
+
+    def as_dict(self) -> dict:
+        """Return the limiter's state as a serializable dict"""
+        return {
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "waiting": self.waiting,
+            "delayed_requests": self.delayed_requests,
+            "delays": {
+                PRIORITY_NAMES[priority]: histogram.as_dict()
+                for priority, histogram in sorted(self.delays.items())
+            },
+        }
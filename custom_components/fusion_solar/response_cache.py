@@ -0,0 +1,190 @@
+"""Cache of the FusionSolar API's responses"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+from .const import DEFAULT_SLOT_PUBLICATION_DELAY
+from .rate_limiter import PRIORITY_LOW, request_priority
+from .scheduler import SLOT_LENGTH
+
+_LOGGER = logging.getLogger(__name__)
+
+# maximum number of cached responses
+DEFAULT_MAX_SIZE = 1000
+
+
+def seconds_until_next_slot(now: float | None = None) -> float:
+    """Time until the expected publication of the next data slot
+
+    :param now: The current time (seconds since epoch), defaults to now
+    :type now: float, optional
+    :return: The time until the next publication (in seconds)
+    :rtype: float
+    """
+    if now is None:
+        now = time.time()
+
+    slot_seconds = SLOT_LENGTH.total_seconds()
+
+    return slot_seconds - (now - DEFAULT_SLOT_PUBLICATION_DELAY) % slot_seconds
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long the responses of an endpoint are cached"""
+
+    # time the response is served without sending a request (in seconds)
+    ttl: float
+    # time after the ttl the response is still served while it is refreshed (in seconds)
+    stale_ttl: float = 0.0
+    # expire with the publication of the next data slot - but at most after ttl
+    slot_aligned: bool = False
+
+    def get_ttl(self) -> float:
+        """The ttl of a response received now"""
+        if self.slot_aligned:
+            return min(self.ttl, seconds_until_next_slot())
+
+        return self.ttl
+
+
+@dataclass
+class CacheEntry:
+    """A cached response"""
+
+    value: Any
+    # end of the ttl and of the stale period (time.monotonic)
+    fresh_until: float
+    stale_until: float
+
+
+class ResponseCache:
+    """Least recently used cache of responses with stale-while-revalidate.
+
+    Fresh responses are served from the cache. Stale responses are served
+    while a single refresh runs in the background. Expired responses are
+    fetched again.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE) -> None:
+        """Create a new, empty ResponseCache
+
+        :param max_size: Maximum number of cached responses
+        :type max_size: int
+        """
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self._refreshes: dict[tuple, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    async def async_get(
+        self,
+        key: tuple,
+        policy: CachePolicy,
+        fetch: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ) -> Any:
+        """Return the cached response or fetch it
+
+        :param key: Identifies the request, e.g. the endpoint and the plant
+        :type key: tuple
+        :param policy: The endpoint's cache policy
+        :type policy: CachePolicy
+        :param fetch: Sends the request
+        :type fetch: Callable[[], Awaitable[Any]]
+        :param refresh: If set, the request is always sent and the response is cached
+        :type refresh: bool
+        :return: The response
+        """
+        now = time.monotonic()
+
+        if not refresh and (entry := self._entries.get(key)) is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+
+                if key not in self._refreshes:
+                    task = asyncio.create_task(self._async_refresh(key, policy, fetch))
+                    self._refreshes[key] = task
+                    task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+
+                return entry.value
+
+        self.misses += 1
+        value = await fetch()
+        self._set(key, policy, value)
+
+        return value
+
+    async def _async_refresh(
+        self, key: tuple, policy: CachePolicy, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Refresh a stale response. Failures keep the stale response."""
+        try:
+            # nobody waits for the refresh
+            with request_priority(PRIORITY_LOW):
+                self._set(key, policy, await fetch())
+        except Exception as err:
+            self.refresh_errors += 1
+            _LOGGER.debug(f"Failed to refresh the cached response of {key[0]}: {err}")
+
+    def _set(self, key: tuple, policy: CachePolicy, value: Any) -> None:
+        """Store a response and evict the least recently used ones"""
+        if self._max_size <= 0:
+            return
+
+        ttl = policy.get_ttl()
+        now = time.monotonic()
+
+        self._entries[key] = CacheEntry(
+            value=value, fresh_until=now + ttl, stale_until=now + ttl + policy.stale_ttl
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float | None:
+        """Share of the requests served from the cache (0 - 1)"""
+        requests = self.hits + self.stale_hits + self.misses
+
+        if not requests:
+            return None
+
+        return (self.hits + self.stale_hits) / requests
+
+    def as_dict(self) -> dict:
+        """Return the cache's state as a serializable dict"""
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+        }
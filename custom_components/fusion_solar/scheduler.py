@@ -0,0 +1,127 @@
+"""Adaptive polling schedule for the FusionSolar integration"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.const import SUN_EVENT_SUNRISE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.sun import get_astral_event_next, is_up
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# FusionSolar aggregates the data in 5 minute slots
+SLOT_LENGTH = timedelta(minutes=5)
+# number of slots to skip during the day if nothing is produced
+IDLE_SLOT_COUNT = 3
+
+
+@dataclass
+class PollDecision:
+    """The scheduler's decision about the next poll"""
+
+    interval: timedelta
+    next_poll: datetime
+    reason: str
+
+    def as_dict(self) -> dict:
+        """Return the decision as a serializable dict"""
+        return {
+            "interval_seconds": self.interval.total_seconds(),
+            "next_poll": self.next_poll.isoformat(),
+            "reason": self.reason,
+        }
+
+
+class AdaptivePollScheduler:
+    """Schedules the polls just after the expected publication of FusionSolar's
+    data slots during the day and slows down between sunset and sunrise.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        publication_delay: timedelta,
+    ) -> None:
+        """Create a new AdaptivePollScheduler
+
+        :param hass: The HomeAssistant object (used for the sun's position)
+        :type hass: HomeAssistant
+        :param min_interval: Shortest allowed time between two polls
+        :type min_interval: timedelta
+        :param max_interval: Longest allowed time between two polls
+        :type max_interval: timedelta
+        :param publication_delay: Expected delay between the end of a slot and the
+                                  availability of its data
+        :type publication_delay: timedelta
+        """
+        self._hass = hass
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._publication_delay = publication_delay
+
+    def _next_slot_publication(self, now: datetime, slot_count: int = 1) -> datetime:
+        """Expected publication time of a following slot that is at least
+           min_interval away
+
+        :param now: The reference time
+        :type now: datetime
+        :param slot_count: Number of slots to advance at least
+        :type slot_count: int
+        """
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        slots_passed = (now - day_start) // SLOT_LENGTH
+        publication = day_start + slots_passed * SLOT_LENGTH + self._publication_delay
+
+        # the publication of the current slot may still be ahead
+        if publication > now:
+            slot_count -= 1
+
+        publication += slot_count * SLOT_LENGTH
+
+        while publication - now < self._min_interval:
+            publication += SLOT_LENGTH
+
+        return publication
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        """Limit the interval to the configured bounds"""
+        return min(max(interval, self._min_interval), self._max_interval)
+
+    def next_poll(self, producing: bool, now: datetime | None = None) -> PollDecision:
+        """Decide when the next poll should happen
+
+        :param producing: Whether the plants currently produce power
+        :type producing: bool
+        :param now: The current time, defaults to now
+        :type now: datetime, optional
+        :return: The decision
+        :rtype: PollDecision
+        """
+        if now is None:
+            now = dt_util.utcnow()
+
+        if is_up(self._hass, now):
+            if producing:
+                publication = self._next_slot_publication(now)
+                reason = "production, aligned to next slot"
+            else:
+                publication = self._next_slot_publication(now, IDLE_SLOT_COUNT)
+                reason = f"no production, aligned to slot +{IDLE_SLOT_COUNT}"
+
+            interval = self._clamp(publication - now)
+        else:
+            next_sunrise = get_astral_event_next(self._hass, SUN_EVENT_SUNRISE, now)
+
+            # sleep until the first slot after sunrise, but at most max_interval
+            interval = self._clamp(
+                self._next_slot_publication(next_sunrise) - now
+            )
+            reason = f"night (sunrise at {dt_util.as_local(next_sunrise):%H:%M})"
+
+        return PollDecision(interval=interval, next_poll=now + interval, reason=reason)
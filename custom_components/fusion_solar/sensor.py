@@ -4,8 +4,7 @@ from collections.abc import Callable
 from dataclasses import dataclass
 import datetime
 import logging
-import pathlib
-import pickle
+import time
 
 from homeassistant.components.sensor import (
     SensorStateClass,
@@ -14,83 +13,203 @@ from homeassistant.components.sensor import (
     SensorDeviceClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ENERGY_KILO_WATT_HOUR, POWER_KILO_WATT, PERCENTAGE
+from homeassistant.const import (
+    ENERGY_KILO_WATT_HOUR,
+    POWER_KILO_WATT,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, callback
 
-from .const import COORDINATOR, DOMAIN
-from .update_coordinator import FusionSolarCoordinator
+from .const import (
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_REDUCE_RECORDER_WRITES,
+    COORDINATOR,
+    DEFAULT_DIAGNOSTIC_SENSORS,
+    DEFAULT_REDUCE_RECORDER_WRITES,
+    DOMAIN,
+    PLANT_COORDINATORS,
+    SENSOR_STORE,
+    TIER_FAST,
+    TIER_SLOW,
+)
+from .store import FusionSolarSensorStore
+from .update_coordinator import (
+    FusionSolarBaseCoordinator,
+    FusionSolarCoordinator,
+    get_data_value,
+    get_stale_since,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _get_cache_path(hass: HomeAssistant, sensor_type: str, unique_id: str = "") -> str:
-    """Create the path for the cache file of the given sensor   
+def _get_store_key(sensor_type: str, plant_id: str = "") -> str:
+    """Create the key of the given sensor within the sensor store
 
-    :param hass: The HomeAssistant object
-    :type hass: HomeAssistant
-    :param sensor_type: Sensor type as a string (used for the unique path)
+    :param sensor_type: Sensor type as a string
     :type sensor_type: str
-    :param unique_id: If set, this unique id is added (for multiple sensors of the same type)
-    :type unique_id: str, optional
-    :return: Path to the cache file
+    :param plant_id: If set, the plant id is added (for multiple sensors of the same type)
+    :type plant_id: str, optional
+    :return: The key within the store
     :rtype: str
     """
-    cache_path = hass.config.path(DOMAIN + "_" + sensor_type + unique_id + "_cache.pkl")
+    return sensor_type + plant_id
+
+
+def _get_data_path(description: "FusionSolarEntityDescription", plant_id: str = None) -> tuple:
+    """Resolve the keys of the sensor's value within the coordinator's data
+
+    :param description: The sensor's description
+    :type description: FusionSolarEntityDescription
+    :param plant_id: The plant's id. Only relevant for actual plants
+    :type plant_id: str, optional
+    :return: The keys leading to the value
+    :rtype: tuple
+    """
+    if description.plant_type == "total":
+        return tuple(description.key.split("-"))
+
+    if description.plant_type == "plant_value":
+        return ("plants", plant_id, description.key)
+
+    return ("plants", plant_id, description.key, "value")
+
+
+TOTAL_SENSOR_TYPES = ["total-current_power_kw", "total-power_today_kwh"]
+
+PLANT_SENSOR_TYPES = [
+    "power_kwh",
+    "usage_kwh",
+    "total_usage_kwh",
+    "relative_grid_usage",
+    "relative_pv_usage",
+    "total_grid_power",
+    "total_used_solar_power",
+    "total_grid_return",
+    "grid_return",
+    "grid_usage",
+]
+
+# metrics computed from the plant's day series
+DERIVED_SENSOR_TYPES = [
+    "peak_power",
+    "integrated_energy",
+    "self_consumption_ratio",
+    "autarky_ratio",
+    "export_ratio",
+]
 
-    return cache_path
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up the FRITZ!SmartHome light from ConfigEntry."""
-    entities: list[FusionSolarSensor] = []
     coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    plant_coordinators = hass.data[DOMAIN][entry.entry_id][PLANT_COORDINATORS]
+    store = hass.data[DOMAIN][entry.entry_id][SENSOR_STORE]
+    reduce_writes = entry.options.get(CONF_REDUCE_RECORDER_WRITES, DEFAULT_REDUCE_RECORDER_WRITES)
+
+    # sensor types and plant ids of all sensors
+    sensors: list[tuple[str, str | None]] = []
 
     if "total" in coordinator.data:
-        entities.append(
-            FusionSolarSensor(coordinator, SENSOR_TYPES["total-current_power_kw"], cache_path=_get_cache_path(hass, "total-current_power_kw"))
-        )
-        entities.append(
-            FusionSolarSensor(coordinator, SENSOR_TYPES["total-power_today_kwh"], cache_path=_get_cache_path(hass, "total-power_today_kwh"))
-        )
+        sensors += [(sensor_type, None) for sensor_type in TOTAL_SENSOR_TYPES]
 
     if "plants" in coordinator.data:
-        for plant_id in coordinator.data["plants"].keys():
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["power_kwh"], plant_id, cache_path=_get_cache_path(hass, "power_kwh", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["usage_kwh"], plant_id, cache_path=_get_cache_path(hass, "usage_kwh", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["total_usage_kwh"], plant_id, cache_path=_get_cache_path(hass, "total_usage_kwh", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["relative_grid_usage"], plant_id, cache_path=_get_cache_path(hass, "relative_grid_usage", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["relative_pv_usage"], plant_id, cache_path=_get_cache_path(hass, "relative_grid_usage", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["total_grid_power"], plant_id, cache_path=_get_cache_path(hass, "total_grid_power", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["total_used_solar_power"], plant_id, cache_path=_get_cache_path(hass, "total_used_solar_power", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["total_grid_return"], plant_id, cache_path=_get_cache_path(hass, "total_grid_return", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["grid_return"], plant_id, cache_path=_get_cache_path(hass, "grid_return", plant_id))
-            )
-            entities.append(
-                FusionSolarSensor(coordinator, SENSOR_TYPES["grid_usage"], plant_id, cache_path=_get_cache_path(hass, "grid_usage", plant_id))
+        for plant_id in coordinator.plant_ids:
+            sensors += [
+                (sensor_type, plant_id)
+                for sensor_type in PLANT_SENSOR_TYPES + DERIVED_SENSOR_TYPES
+            ]
+
+    # load the stored states of all sensors at once
+    await store.async_load(
+        [_get_store_key(sensor_type, plant_id or "") for sensor_type, plant_id in sensors]
+    )
+
+    # the entities of every plant - used to retire the entities of removed plants
+    plant_entities: dict[str | None, list[FusionSolarSensor]] = {}
+
+    @callback
+    def async_add_sensors(sensors: list[tuple[str, str | None]]) -> None:
+        """Create and add the passed sensors"""
+        with coordinator.loop_monitor.section("create entities"):
+            entities = [
+                FusionSolarSensor(
+                    # with sharded polling, the plant's sensors use the plant's coordinator
+                    plant_coordinators.get(plant_id, coordinator),
+                    SENSOR_TYPES[sensor_type],
+                    plant_id,
+                    store=store,
+                    store_key=_get_store_key(sensor_type, plant_id or ""),
+                    reduce_writes=reduce_writes,
+                )
+                for sensor_type, plant_id in sensors
+            ]
+
+        for entity in entities:
+            plant_entities.setdefault(entity.plant_id, []).append(entity)
+
+        async_add_entities(entities)
+
+    @callback
+    def async_update_plants(added: list[str], removed: list[str]) -> None:
+        """Add the sensors of new plants and remove the ones of removed plants.
+        The entities of all other plants are not touched.
+        """
+        for plant_id in removed:
+            for entity in plant_entities.pop(plant_id, []):
+                hass.async_create_task(entity.async_remove())
+
+        if added:
+            async_add_sensors(
+                [
+                    (sensor_type, plant_id)
+                    for plant_id in added
+                    for sensor_type in PLANT_SENSOR_TYPES + DERIVED_SENSOR_TYPES
+                ]
             )
 
+    async_add_sensors(sensors)
 
-    async_add_entities(entities)
+    entry.async_on_unload(coordinator.async_add_plant_listener(async_update_plants))
+
+    # sensors reporting the integration's own metrics
+    if entry.options.get(CONF_DIAGNOSTIC_SENSORS, DEFAULT_DIAGNOSTIC_SENSORS):
+        async_add_entities(
+            [
+                FusionSolarDiagnosticSensor(coordinator, description)
+                for description in DIAGNOSTIC_SENSOR_TYPES
+            ]
+        )
+
+
+@dataclass
+class WritePolicy:
+    """Limits the state writes of a sensor if the recorder writes are reduced.
+    Deferred changes are written once the interval passed.
+    """
+
+    # changes larger than the deadband are written once the last write is this old (in seconds)
+    min_interval: float = 0
+    # smaller changes are written once the last write is this old (in seconds)
+    max_interval: float = 0
+    # absolute change (in the sensor's unit)
+    deadband: float = 0
+
+
+# ratios rarely change by more than a few percent points
+RATIO_WRITE_POLICY = WritePolicy(max_interval=3600, deadband=1.0)
+# instantaneous values are written at most every 10 minutes
+POWER_WRITE_POLICY = WritePolicy(min_interval=600, max_interval=600)
+# energy totals are written at most once per 5 minute statistics period. A deferred
+# value is written before a reset, and the reset is written right away.
+ENERGY_WRITE_POLICY = WritePolicy(min_interval=300, max_interval=300)
 
 
 @dataclass
@@ -99,6 +218,17 @@ class FusionSolarEntityDescription(SensorEntityDescription):
 
     plant_type: str = None
     last_reset_fn: Callable = None
+    # the polling tier of the sensor's data (TIER_*)
+    tier: str = TIER_FAST
+    # applied if the recorder writes are reduced
+    write_policy: WritePolicy = None
+
+
+@dataclass
+class FusionSolarDiagnosticEntityDescription(SensorEntityDescription):
+    """Entity description of the sensors reporting the integration's metrics"""
+
+    value_fn: Callable[[FusionSolarCoordinator], float | int | None] = None
 
 
 # URL to image: "https://eu5.fusionsolar.huawei.com/pvmswebsite/images/sm/login-logo.png"
@@ -111,47 +241,57 @@ class FusionSolarSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(
         self,
-        coordinator: FusionSolarCoordinator,
+        coordinator: FusionSolarBaseCoordinator,
         description: FusionSolarEntityDescription,
         plant_id: str = None,
-        cache_path: str = None
+        *,
+        store: FusionSolarSensorStore,
+        store_key: str,
+        reduce_writes: bool = False,
     ) -> None:
         """Initialize a new FusionSolarSensor
 
         :param coordinator: The coordinator to use for updates
-        :type coordinator: FusionSolarCoordinator
+        :type coordinator: FusionSolarBaseCoordinator
         :param description: The description object for this sensor.
         :type: FusionSolarEntityDescription
         :param plant_id: The plant's id. Only relevant for actual plants, defaults to None
         :type plant_id: str, optional
-        :param cache_path: Path to the cache file to use.
-        :type cache_path: str, optional
+        :param store: The store holding the persistent state of the sensor
+        :type store: FusionSolarSensorStore
+        :param store_key: The sensor's key within the store
+        :type store_key: str
+        :param reduce_writes: Apply the description's write policy
+        :type reduce_writes: bool
         """
+        # the path to the value is resolved once. It is passed as context, so
+        # the coordinator only notifies the sensor if the value changed.
+        self._data_path = _get_data_path(description, plant_id)
+
         # pass the coordinator to the base class
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=self._data_path)
 
         self.entity_description = description
         self.plant_id = plant_id
 
         self._attr_native_value = self._get_data()
 
-        # initialize a last reset with midnight of today
-        self._last_value = self._attr_native_value
-        
-        # load the cache
-        self._cache_file = cache_path
-
-        if pathlib.Path(self._cache_file).exists():
-            _LOGGER.debug(f"Loading cache from { self._cache_file }...")
-            with open(self._cache_file, "rb") as reader:
-                self._cache = pickle.load(reader)
-        else:
-            _LOGGER.debug("No cache available.")
-            self._cache = {}
-
-        # load last reset from cache
-        if "last_reset" in self._cache:
-            self._last_reset = self._cache["last_reset"]
+        # the state last written and when it was written (time.monotonic)
+        self._write_policy = description.write_policy if reduce_writes else None
+        self._written_value = None
+        self._written_available = None
+        self._written_last_reset = None
+        self._written_at = 0.0
+        self._unsub_deferred_write = None
+
+        # the store was already loaded before the entity was created
+        self._store = store
+        self._store_key = store_key
+        stored_values = self._store.get(self._store_key)
+
+        # load last reset from the store
+        if stored_values.get("last_reset"):
+            self._last_reset = stored_values["last_reset"]
         else:
             # if no last reset is known, use the 
             current_date = datetime.datetime.now()
@@ -164,89 +304,201 @@ class FusionSolarSensor(CoordinatorEntity, SensorEntity):
                 minute=0,
             )
 
-    def _save_cache(self) -> None:
-        """Save the current cache to file
+    async def async_added_to_hass(self) -> None:
+        """Register the sensor's tier, so its data is fetched at the tier's interval.
+        Daily counters are validated by the coordinator.
         """
-        with open(self._cache_file, "wb") as writer:
-            pickle.dump(self._cache, writer)
-    
+        await super().async_added_to_hass()
+
+        self.async_on_remove(
+            self.coordinator.async_add_tier_reader(
+                self._data_path[0], self.entity_description.tier
+            )
+        )
+
+        if self.entity_description.state_class == SensorStateClass.TOTAL:
+            self.async_on_remove(
+                self.coordinator.counter_validator.async_add_counter(
+                    self._data_path, self._last_reset
+                )
+            )
+
+        self.async_on_remove(self._cancel_deferred_write)
+
     def _get_data(self) -> float:
         """Retrieve the current sensor value from the coordinator
 
         :return: The current value
         :rtype: float
         """
-        if self.entity_description.plant_type == "total":
-            value_keys = self.entity_description.key.split("-")
-            value = self.coordinator.data[value_keys[0]][value_keys[1]]
-        elif self.entity_description.plant_type == "plant_value":
-            value = self.coordinator.data["plants"][self.plant_id][
-                self.entity_description.key
-            ]
-        else:
-            value = self.coordinator.data["plants"][self.plant_id][
-                self.entity_description.key
-            ]["value"]
+        return get_data_value(self.coordinator.data, self._data_path)
 
-        return value
+    def _update_last_reset(self) -> None:
+        """Take the last reset detected by the coordinator's counter validation"""
+        last_reset = self.coordinator.counter_validator.get_last_reset(self._data_path)
 
-    def _update_last_reset(self, new_value: float) -> None:
-        """Test whether the last reset time needs to be updated
-
-        :param new_value: The new value passed by the update function
-        :type new_value: float
-        """
-        # ignore any invalid readings
-        if new_value is None or self._last_value is None:
+        if not last_reset or last_reset == self._last_reset:
             return
 
-        # total counters can only increase
-        # Note: Due to a bug, the values sometimes only decrease by f.e. 1 kWh
-        #       a reset should normally always go close to 0 (< 1 for sure)
-        if new_value < self._last_value and new_value < 1.5:
-            self._last_reset = datetime.datetime.now()
-            _LOGGER.debug(f"New last reset for { self.entity_description.name }: { self._last_reset }")
+        self._last_reset = last_reset
+        _LOGGER.debug(f"New last reset for { self.entity_description.name }: { self._last_reset }")
 
-            # update the cache
-            self._cache["last_reset"] = self._last_reset
-            self._save_cache()
+        # update the store - this is written delayed
+        self._store.async_set(self._store_key, last_reset=self._last_reset)
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
+        with self.coordinator.loop_monitor.section("entity update", self.entity_id):
+            self._update_value()
+
+    def _update_value(self) -> None:
+        """Take the new value from the coordinator and write the state.
+        The daily counters were already validated by the coordinator.
+        """
         new_value = self._get_data()
 
-        # if the new value is lower than the previous one,
-        # expect that there might have been a reset
         _LOGGER.debug(
             "Updating value for %s: %s -> %s",
             str(self.entity_description.name),
-            str(self._last_value),
+            str(self._attr_native_value),
             str(new_value),
         )
 
-        # for the total counters, a bug causes a decrease in usage
-        # sometimes during the reset period, these values
-        # must be ignored
-        if self.entity_description.state_class == SensorStateClass.TOTAL and new_value is not None:
-            # invalid updates show a decrease to a still high number
-            if new_value < self._last_value and new_value > 3:
-                _LOGGER.debug(f"Ignoring invalid update for {self.entity_description.name}")
-                return
+        # a deferred value is written before a reset, so the last value of the period is not lost
+        if self._unsub_deferred_write and self._is_reset(new_value):
+            self._cancel_deferred_write()
+            self._write_now()
 
         # update the last reset - if necessary
         if self.entity_description.last_reset_fn:
-            self._update_last_reset(new_value)
+            self._update_last_reset()
 
         self._attr_native_value = new_value
 
-        # this is used in order to only save proper readings
-        if new_value is not None:
-            self._last_value = new_value
-
         # tell HA that the value changed
+        self._write_state()
+
+    def _is_reset(self, new_value: float | None) -> bool:
+        """Whether the new value starts a new period of a counter
+
+        :param new_value: The value that is about to replace the current one
+        :type new_value: float, optional
+        :return: True if the counter was reset
+        :rtype: bool
+        """
+        if self.entity_description.state_class not in (
+            SensorStateClass.TOTAL,
+            SensorStateClass.TOTAL_INCREASING,
+        ):
+            return False
+
+        last_reset = self.coordinator.counter_validator.get_last_reset(self._data_path)
+
+        if self.entity_description.last_reset_fn and last_reset and last_reset != self._last_reset:
+            return True
+
+        return (
+            new_value is not None
+            and self._attr_native_value is not None
+            and new_value < self._attr_native_value
+        )
+
+    def _get_write_delay(self) -> float:
+        """Time until the state may be written according to the write policy (in seconds)"""
+        policy = self._write_policy
+        value = self._attr_native_value
+
+        # availability changes, missing values and resets are written right away
+        if (
+            not policy
+            or self.available != self._written_available
+            or value is None
+            or self._written_value is None
+            or self.last_reset != self._written_last_reset
+            or (
+                value < self._written_value
+                and self.entity_description.state_class
+                in (SensorStateClass.TOTAL, SensorStateClass.TOTAL_INCREASING)
+            )
+        ):
+            return 0
+
+        interval = (
+            policy.min_interval
+            if abs(value - self._written_value) > policy.deadband
+            else policy.max_interval
+        )
+
+        return interval - (time.monotonic() - self._written_at)
+
+    def _write_state(self) -> None:
+        """Write the state now or defer it according to the write policy"""
+        delay = self._get_write_delay()
+
+        if delay > 0:
+            if not self._unsub_deferred_write:
+                self.coordinator.metrics.record_write(deferred=True)
+                self._unsub_deferred_write = async_call_later(
+                    self.hass, delay, self._async_write_deferred
+                )
+            return
+
+        self._cancel_deferred_write()
+        self._write_now()
+
+    def _write_now(self) -> None:
+        """Write the current state and remember it for the write policy"""
+        self.coordinator.metrics.record_write()
+
+        self._written_value = self._attr_native_value
+        self._written_available = self.available
+        self._written_last_reset = self.last_reset
+        self._written_at = time.monotonic()
+
         self.async_write_ha_state()
 
+    @callback
+    def _async_write_deferred(self, _now=None) -> None:
+        """Write a deferred state"""
+        self._unsub_deferred_write = None
+        self._write_state()
+
+    @callback
+    def _cancel_deferred_write(self) -> None:
+        """Cancel a deferred write"""
+        if self._unsub_deferred_write:
+            self._unsub_deferred_write()
+            self._unsub_deferred_write = None
+
+    @property
+    def available(self) -> bool:
+        """Values restored from the snapshot stay available until the first
+        update succeeded - even if the API cannot be reached. Plants and totals
+        without current or kept values are unavailable.
+        """
+        if self.coordinator.stale and self._attr_native_value is not None:
+            return True
+
+        # the plant's or the account's part of the data
+        section = ("plants", self.plant_id) if self.plant_id else self._data_path[:1]
+
+        if get_data_value(self.coordinator.data, section) is None:
+            return False
+
+        return super().available
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Mark values that were restored from the snapshot or kept after a failed fetch"""
+        if self.coordinator.stale:
+            return {"stale": True}
+
+        if stale_since := get_stale_since(self.coordinator.data, self._data_path):
+            return {"stale": True, "last_updated": stale_since}
+
+        return None
+
     @property
     def last_reset(self) -> datetime:
         """Last reset as defined by the last_reset_fn"""
@@ -256,6 +508,39 @@ class FusionSolarSensor(CoordinatorEntity, SensorEntity):
         return None
 
 
+class FusionSolarDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Reports a metric of the requests and updates of a config entry"""
+
+    entity_description: FusionSolarDiagnosticEntityDescription
+
+    def __init__(
+        self,
+        coordinator: FusionSolarCoordinator,
+        description: FusionSolarDiagnosticEntityDescription,
+    ) -> None:
+        """Initialize a new FusionSolarDiagnosticSensor
+
+        :param coordinator: The account's coordinator
+        :type coordinator: FusionSolarCoordinator
+        :param description: The description object for this sensor.
+        :type: FusionSolarDiagnosticEntityDescription
+        """
+        # without a context, the sensor is updated after every update cycle
+        super().__init__(coordinator)
+
+        self.entity_description = description
+
+    @property
+    def available(self) -> bool:
+        """The metrics are also available if the updates fail"""
+        return True
+
+    @property
+    def native_value(self) -> float | int | None:
+        """The current value of the metric"""
+        return self.entity_description.value_fn(self.coordinator)
+
+
 def last_reset_data(sensor_object: FusionSolarSensor) -> datetime:
     """Returns the last reset date based on the received data
 
@@ -286,16 +571,19 @@ SENSOR_TYPES = {
     "total-current_power_kw": FusionSolarEntityDescription(
         key="total-current_power_kw",
         plant_type="total",
+        tier=TIER_FAST,
         name="Total Power - Now",
         icon="mdi:solar-panel",
         entity_category="diagnostic",
         native_unit_of_measurement=POWER_KILO_WATT,
         device_class=SensorDeviceClass.POWER,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=POWER_WRITE_POLICY,
     ),
     "total-power_today_kwh": FusionSolarEntityDescription(
         key="total-power_today_kwh",
         plant_type="total",
+        tier=TIER_FAST,
         name="Total Energy - Today",
         icon="mdi:solar-panel",
         entity_category="diagnostic",
@@ -303,99 +591,256 @@ SENSOR_TYPES = {
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL,
         last_reset_fn=last_reset_self,
+        write_policy=ENERGY_WRITE_POLICY,
     ),
     "power_kwh": FusionSolarEntityDescription(
         key="productPower",
         plant_type="plant",
+        tier=TIER_SLOW,
         name="Power",
         icon="mdi:solar-panel",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=POWER_WRITE_POLICY,
     ),
     "usage_kwh": FusionSolarEntityDescription(
         key="usePower",
         plant_type="plant",
+        tier=TIER_SLOW,
         name="Power Usage",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=POWER_WRITE_POLICY,
     ),
     "total_usage_kwh": FusionSolarEntityDescription(
         key="totalUsePower",
         plant_type="plant_value",
+        tier=TIER_SLOW,
         name="Total Power Usage - Today",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL,
         last_reset_fn=last_reset_self,
+        write_policy=ENERGY_WRITE_POLICY,
     ),
     "relative_grid_usage": FusionSolarEntityDescription(
         key="buyPowerRatio",
         plant_type="plant_value",
+        tier=TIER_SLOW,
         name="Bought Power Ratio - Today",
         icon="mdi:meter-electric",
         native_unit_of_measurement=PERCENTAGE,
         device_class=SensorDeviceClass.POWER_FACTOR,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=RATIO_WRITE_POLICY,
     ),
     "relative_pv_usage": FusionSolarEntityDescription(
         key="selfUsePowerRatioByProduct",
         plant_type="plant_value",
+        tier=TIER_SLOW,
         name="Used PV Power Ratio - Today",
         icon="mdi:meter-electric",
         native_unit_of_measurement=PERCENTAGE,
         device_class=SensorDeviceClass.POWER_FACTOR,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=RATIO_WRITE_POLICY,
     ),
     "total_grid_power": FusionSolarEntityDescription(
         key="totalBuyPower",
         plant_type="plant_value",
+        tier=TIER_SLOW,
         name="Total Bought Power - Today",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL,
         last_reset_fn=last_reset_self,
+        write_policy=ENERGY_WRITE_POLICY,
     ),
     "total_used_solar_power": FusionSolarEntityDescription(
         key="totalSelfUsePower",
         plant_type="plant_value",
+        tier=TIER_SLOW,
         name="Total Used Solar Power - Today",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL,
         last_reset_fn=last_reset_self,
+        write_policy=ENERGY_WRITE_POLICY,
     ),
     "total_grid_return": FusionSolarEntityDescription(
         key="totalOnGridPower",
         plant_type="plant_value",
+        tier=TIER_SLOW,
         name="Total Returned Power - Today",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.TOTAL,
         last_reset_fn=last_reset_self,
+        write_policy=ENERGY_WRITE_POLICY,
     ),
     "grid_return": FusionSolarEntityDescription(
         key="onGridPower",
         plant_type="plant",
+        tier=TIER_SLOW,
         name="Grid Return",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=POWER_WRITE_POLICY,
     ),
     "grid_usage": FusionSolarEntityDescription(
         key="disGridPower",
         plant_type="plant",
+        tier=TIER_SLOW,
         name="Grid Usage",
         icon="mdi:meter-electric",
         native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
         device_class=SensorDeviceClass.ENERGY,
         state_class=SensorStateClass.MEASUREMENT,
+        write_policy=POWER_WRITE_POLICY,
+    ),
+    "peak_power": FusionSolarEntityDescription(
+        key="peak_power_kw",
+        plant_type="plant_value",
+        tier=TIER_SLOW,
+        name="Peak Power - Today",
+        icon="mdi:solar-power-variant",
+        native_unit_of_measurement=POWER_KILO_WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        write_policy=POWER_WRITE_POLICY,
+    ),
+    "integrated_energy": FusionSolarEntityDescription(
+        key="integrated_energy_kwh",
+        plant_type="plant_value",
+        tier=TIER_SLOW,
+        name="Integrated Energy - Today",
+        icon="mdi:sigma",
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+        last_reset_fn=last_reset_self,
+        write_policy=ENERGY_WRITE_POLICY,
+    ),
+    "self_consumption_ratio": FusionSolarEntityDescription(
+        key="self_consumption_ratio",
+        plant_type="plant_value",
+        tier=TIER_SLOW,
+        name="Self-Consumption Ratio - Today",
+        icon="mdi:home-lightning-bolt",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        write_policy=RATIO_WRITE_POLICY,
+    ),
+    "autarky_ratio": FusionSolarEntityDescription(
+        key="autarky_ratio",
+        plant_type="plant_value",
+        tier=TIER_SLOW,
+        name="Autarky Ratio - Today",
+        icon="mdi:home-battery",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        write_policy=RATIO_WRITE_POLICY,
+    ),
+    "export_ratio": FusionSolarEntityDescription(
+        key="export_ratio",
+        plant_type="plant_value",
+        tier=TIER_SLOW,
+        name="Export Ratio - Today",
+        icon="mdi:transmission-tower-export",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        write_policy=RATIO_WRITE_POLICY,
     ),
 }
+
+DIAGNOSTIC_SENSOR_TYPES = [
+    FusionSolarDiagnosticEntityDescription(
+        key="update_duration",
+        name="Update Duration",
+        icon="mdi:timer-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: coordinator.last_update_duration,
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="failed_updates",
+        name="Failed Updates",
+        icon="mdi:alert-circle-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.failed_cycles,
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="api_requests",
+        name="API Requests",
+        icon="mdi:cloud-download-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.my_api.metrics.calls,
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="api_errors",
+        name="API Errors",
+        icon="mdi:cloud-alert",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.my_api.metrics.errors,
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="api_latency",
+        name="API Latency - Mean",
+        icon="mdi:timer-sand",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: coordinator.my_api.metrics.mean_latency,
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="relogins",
+        name="Re-Logins",
+        icon="mdi:login",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: max(coordinator.my_api.metrics.logins - 1, 0),
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="rate_limit_delay",
+        name="Rate Limit Delay - Mean",
+        icon="mdi:timer-pause-outline",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: coordinator.my_api.rate_limiter.mean_delay,
+    ),
+    FusionSolarDiagnosticEntityDescription(
+        key="cache_hit_rate",
+        name="Cache Hit Rate",
+        icon="mdi:cached",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: coordinator.my_api.cache.hit_rate * 100
+        if coordinator.my_api.cache.hit_rate is not None
+        else None,
+    ),
+]
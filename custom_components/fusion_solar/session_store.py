@@ -0,0 +1,69 @@
+"""Persistence of the FusionSolar login session"""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+
+class FusionSolarSessionStore:
+    """Stores the cookies and tokens of a FusionSolar login on disk.
+
+    The session is not encrypted. Like the credentials of the config entry,
+    it is stored in plain text in Home Assistant's .storage folder. The
+    session is only restored for the username it was created with.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, username: str) -> None:
+        """Create a new FusionSolarSessionStore
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        :param username: The FusionSolar username
+        :type username: str
+        """
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.session")
+        self._username = username
+
+    async def async_load(self) -> dict | None:
+        """Load the stored session
+
+        :return: The session or None if no valid session is stored
+        :rtype: dict, optional
+        """
+        stored_data = await self._store.async_load()
+
+        # sessions of older versions were stored encrypted
+        if not stored_data or not isinstance(stored_data.get("session"), dict):
+            return None
+
+        if stored_data.get("username") != self._username:
+            _LOGGER.debug("Stored session belongs to another user. Ignoring it.")
+            return None
+
+        return stored_data["session"]
+
+    @callback
+    def async_save(self, session_data: dict) -> None:
+        """Store a session
+
+        :param session_data: The session as exported by the client
+        :type session_data: dict
+        """
+        self._store.async_delay_save(
+            lambda: {"username": self._username, "session": session_data}, 1
+        )
+
+    async def async_remove(self) -> None:
+        """Remove the stored session"""
+        await self._store.async_remove()
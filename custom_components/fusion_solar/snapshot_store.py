@@ -0,0 +1,130 @@
+"""Persistence of the last good data of a FusionSolar config entry"""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# snapshots are written at most once within this time (in seconds)
+STORAGE_SAVE_DELAY = 60
+
+
+class FusionSolarSnapshotStore:
+    """Keeps the last good coordinator data and the plant ids of a config entry.
+
+    The snapshot is used to create the entities on startup before the first
+    update finished. The account's totals and every plant are updated
+    independently, so the plant coordinators of sharded polling can store
+    their data in the same snapshot.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Create a new FusionSolarSnapshotStore
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        """
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+        self._snapshot: dict[str, Any] = {"plant_ids": [], "data": {"plants": {}}}
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Load the stored snapshot
+
+        :return: The snapshot with the keys plant_ids, data and updated. None
+                 if no snapshot was stored yet.
+        :rtype: dict, optional
+        """
+        stored_data = await self._store.async_load()
+
+        if not stored_data or "total" not in stored_data.get("data", {}):
+            return None
+
+        self._snapshot = stored_data
+
+        return stored_data
+
+    @callback
+    def async_update(self, data: dict, plant_ids: list[str] | None = None) -> None:
+        """Update the snapshot with the sections fetched by an update. The
+           snapshot is written delayed.
+
+        :param data: The totals and plants that were fetched. Kept values must
+                     be left out, as the time of every section is stored.
+        :type data: dict
+        :param plant_ids: The current plant ids, defaults to keeping the known ones
+        :type plant_ids: list[str], optional
+        """
+        if plant_ids is not None:
+            self._snapshot["plant_ids"] = list(plant_ids)
+
+        now = dt_util.utcnow().isoformat()
+        snapshot_data = self._snapshot["data"]
+
+        if data.get("total") is not None:
+            snapshot_data["total"] = data["total"]
+            self._snapshot["total_updated"] = now
+
+        plants_updated = {
+            **self._snapshot.get("plants_updated", {}),
+            **{plant_id: now for plant_id in data.get("plants", {})},
+        }
+
+        snapshot_data["plants"] = {
+            plant_id: plant_data
+            for plant_id, plant_data in {
+                **snapshot_data.get("plants", {}),
+                **data.get("plants", {}),
+            }.items()
+            if plant_id in self._snapshot["plant_ids"]
+        }
+        self._snapshot["plants_updated"] = {
+            plant_id: updated
+            for plant_id, updated in plants_updated.items()
+            if plant_id in snapshot_data["plants"]
+        }
+
+        # the time of the last update only moves if anything was fetched
+        if data.get("total") is not None or data.get("plants"):
+            self._snapshot["updated"] = now
+
+        self._store.async_delay_save(lambda: self._snapshot, STORAGE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Immediately write the snapshot"""
+        if "total" in self._snapshot["data"]:
+            await self._store.async_save(self._snapshot)
+
+    async def async_remove(self) -> None:
+        """Remove the stored snapshot"""
+        await self._store.async_remove()
+
+
+def get_snapshot_updated(snapshot: dict, plant_id: str | None = None) -> datetime | None:
+    """The time the totals or a plant of a snapshot were fetched
+
+    :param snapshot: The snapshot as loaded by the FusionSolarSnapshotStore
+    :type snapshot: dict
+    :param plant_id: The plant's id, defaults to the account's totals
+    :type plant_id: str, optional
+    :return: The time or None if it is unknown
+    :rtype: datetime, optional
+    """
+    if plant_id:
+        updated = snapshot.get("plants_updated", {}).get(plant_id)
+    else:
+        updated = snapshot.get("total_updated")
+
+    # older snapshots only store the time of the last update
+    return dt_util.parse_datetime(updated or snapshot.get("updated") or "")
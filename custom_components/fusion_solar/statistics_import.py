@@ -0,0 +1,396 @@
+"""Import of the intraday plant series into Home Assistant's long-term statistics"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, tzinfo
+import logging
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, MAX_BACKFILL_DAYS
+from .derived import SLOT_HOURS
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# watermarks are written at most once within this time (in seconds)
+STORAGE_SAVE_DELAY = 60
+
+# power series of the plant stats that are imported as energy and their names
+IMPORTED_SERIES = {
+    "productPower": "Produced Energy",
+    "usePower": "Used Energy",
+    "onGridPower": "Returned Energy",
+    "disGridPower": "Grid Energy",
+}
+
+# an hour is imported once this time passed after its end, so all of its slots are published
+HOUR_COMPLETION_DELAY = timedelta(minutes=10)
+# an hour without any value may still be published within this time after its end
+MISSING_HOUR_TIMEOUT = timedelta(hours=3)
+
+# replaced hours continue the sum of the last statistic within this time before them
+SUM_LOOKBACK = timedelta(days=MAX_BACKFILL_DAYS + 1)
+
+
+def get_statistic_id(plant_id: str, series: str) -> str:
+    """Id of the external statistic of a plant's series
+
+    :param plant_id: The plant's id
+    :type plant_id: str
+    :param series: The series' key within the plant stats
+    :type series: str
+    :return: The statistic id
+    :rtype: str
+    """
+    return f"{DOMAIN}:{slugify(plant_id)}_{slugify(series)}_energy"
+
+
+def aggregate_hours(
+    plant_data: dict,
+    watermark: datetime | None,
+    now: datetime,
+    time_zone: tzinfo,
+) -> tuple[dict[str, list[tuple[datetime, float]]], datetime | None]:
+    """Integrate the 5 minute power slots of all complete hours after the
+    watermark to the energy of every hour (in kWh). Missing slots count as 0.
+
+    An hour whose slots are all missing may still be published. It ends the
+    import until it has values or MISSING_HOUR_TIMEOUT passed.
+
+    This function parses the complete day series and should be run in the executor.
+
+    :param plant_data: The plant's stats as returned by get_plant_stats
+    :type plant_data: dict
+    :param watermark: Start of the last imported hour (UTC). None if nothing was imported yet.
+    :type watermark: datetime, optional
+    :param now: The current time
+    :type now: datetime
+    :param time_zone: The time zone of the measurement times
+    :type time_zone: tzinfo
+    :return: The start and energy of every hour by series and the start of the last
+             complete hour. The new watermark is None if no complete hour is newer
+             than the watermark.
+    :rtype: tuple[dict[str, list[tuple[datetime, float]]], datetime | None]
+    """
+    hours: dict[datetime, dict[str, list[float]]] = {}
+
+    for index, measurement_time in enumerate(plant_data.get("xAxis", [])):
+        slot_start = datetime.strptime(measurement_time, "%Y-%m-%d %H:%M").replace(
+            tzinfo=time_zone
+        )
+        hour_start = dt_util.as_utc(slot_start.replace(minute=0))
+
+        # only complete hours after the watermark are imported
+        if watermark and hour_start <= watermark:
+            continue
+
+        if hour_start + timedelta(hours=1) + HOUR_COMPLETION_DELAY > now:
+            continue
+
+        hour_values = hours.setdefault(hour_start, {})
+
+        for series in IMPORTED_SERIES:
+            values = plant_data.get(series)
+
+            if not isinstance(values, list) or index >= len(values):
+                continue
+
+            try:
+                hour_values.setdefault(series, []).append(float(values[index]))
+            except (TypeError, ValueError):
+                # missing values are reported as "--"
+                continue
+
+    energies: dict[str, list[tuple[datetime, float]]] = {series: [] for series in IMPORTED_SERIES}
+    last_hour = None
+
+    for hour_start in sorted(hours):
+        # the watermark does not move past an hour that may still be published
+        if not any(hours[hour_start].values()) and (
+            hour_start + timedelta(hours=1) + MISSING_HOUR_TIMEOUT > now
+        ):
+            break
+
+        for series, values in hours[hour_start].items():
+            if values:
+                energies[series].append((hour_start, sum(values) * SLOT_HOURS))
+
+        last_hour = hour_start
+
+    return energies, last_hour
+
+
+def _get_start(row: dict) -> datetime:
+    """The start of a statistics row. Newer recorders return a timestamp."""
+    start = row["start"]
+
+    return dt_util.utc_from_timestamp(start) if isinstance(start, (int, float)) else start
+
+
+def get_previous_sums(
+    hass: HomeAssistant, statistic_id: str, first_start: datetime, last_start: datetime
+) -> tuple[float, float, bool]:
+    """Look up the sums that hours to import have to continue.
+
+    This function queries the database and must be run in the recorder's executor.
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :param statistic_id: The statistic's id
+    :type statistic_id: str
+    :param first_start: Start of the first hour to import
+    :type first_start: datetime
+    :param last_start: Start of the last hour to import
+    :type last_start: datetime
+    :return: The sum before the first hour, the sum of the last hour that is replaced
+             and whether hours after the imported ones exist already
+    :rtype: tuple[float, float, bool]
+    """
+    last_rows = get_last_statistics(hass, 1, statistic_id, False, {"sum"}).get(statistic_id)
+
+    # new hours are appended to the last sum
+    if not last_rows or _get_start(last_rows[0]) < first_start:
+        last_sum = (last_rows[0]["sum"] or 0.0) if last_rows else 0.0
+        return last_sum, last_sum, False
+
+    # imported hours replace existing ones
+    rows = statistics_during_period(
+        hass,
+        first_start - SUM_LOOKBACK,
+        last_start + timedelta(hours=1),
+        {statistic_id},
+        "hour",
+        None,
+        {"sum"},
+    ).get(statistic_id, [])
+
+    previous_sum = 0.0
+    replaced_sum = None
+
+    for row in rows:
+        if row.get("sum") is None:
+            continue
+
+        if _get_start(row) < first_start:
+            previous_sum = row["sum"]
+
+        replaced_sum = row["sum"]
+
+    return (
+        previous_sum,
+        previous_sum if replaced_sum is None else replaced_sum,
+        _get_start(last_rows[0]) > last_start,
+    )
+
+
+class FusionSolarStatisticsImporter:
+    """Imports the 5 minute power series of the plants as hourly energy statistics.
+
+    Home Assistant's long-term statistics have an hourly resolution. The slots
+    of complete hours are integrated to the hour's energy and imported as
+    external statistics with a growing sum, so they can be used by the energy
+    dashboard. A watermark per plant makes sure every hour is only imported
+    once. The day series is only parsed once a new hour may be complete.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Create a new FusionSolarStatisticsImporter
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        """
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.statistics")
+        self._watermarks: dict[str, datetime] = {}
+        # the series of a plant are not parsed before this time
+        self._next_import: dict[str, datetime] = {}
+        # the sums of a plant's hours are computed one import at a time
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._gap_listeners: list[Callable[[str, list[date]], None]] = []
+
+    async def async_load(self) -> None:
+        """Load the watermarks of all plants"""
+        stored_data = await self._store.async_load() or {}
+
+        self._watermarks = {
+            plant_id: dt_util.parse_datetime(watermark)
+            for plant_id, watermark in stored_data.get("watermarks", {}).items()
+        }
+
+    @callback
+    def async_add_gap_listener(
+        self, listener: Callable[[str, list[date]], None]
+    ) -> Callable[[], None]:
+        """Register a callback that is called if hours of past days were not imported
+
+        :param listener: Called with the plant id and the (local) days that are missing
+        :type listener: Callable[[str, list[date]], None]
+        :return: Function removing the listener again
+        :rtype: Callable[[], None]
+        """
+        self._gap_listeners.append(listener)
+
+        return lambda: self._gap_listeners.remove(listener)
+
+    async def async_import(
+        self, plant_id: str, plant_data: dict, backfill: bool = False
+    ) -> None:
+        """Import all new complete hours of a plant
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param plant_data: The plant's stats as returned by get_plant_stats
+        :type plant_data: dict
+        :param backfill: If set, the hours before the watermark are imported as
+                         well. Already imported hours are overwritten.
+        :type backfill: bool
+        """
+        now = dt_util.utcnow()
+
+        # the series are parsed once per hour - until then no new hour can be complete
+        if not backfill and now < self._next_import.get(plant_id, now):
+            return
+
+        energies, watermark = await self._hass.async_add_executor_job(
+            aggregate_hours,
+            plant_data,
+            None if backfill else self._watermarks.get(plant_id),
+            now,
+            dt_util.DEFAULT_TIME_ZONE,
+        )
+
+        if not backfill:
+            self._next_import[plant_id] = (
+                dt_util.as_local(now).replace(minute=0, second=0, microsecond=0)
+                + timedelta(hours=1)
+                + HOUR_COMPLETION_DELAY
+            )
+
+        if watermark is None:
+            return
+
+        async with self._locks.setdefault(plant_id, asyncio.Lock()):
+            recorder = get_instance(self._hass)
+
+            # the sums of earlier imports must be written before they are continued
+            await recorder.async_block_till_done()
+
+            for series, hours in energies.items():
+                if hours:
+                    await self._async_import_series(plant_id, series, hours, backfill)
+
+        _LOGGER.debug(
+            f"Imported {sum(len(hours) for hours in energies.values())} hourly "
+            f"statistics of plant {plant_id} up to {watermark.isoformat()}"
+        )
+
+        # only the current day is polled. Hours between the watermark and the
+        # first imported hour of a later day were missed, e.g. during an outage.
+        previous_watermark = self._watermarks.get(plant_id)
+        imported_starts = [hours[0][0] for hours in energies.values() if hours]
+
+        if not backfill and previous_watermark and imported_starts:
+            first_missing_day = dt_util.as_local(previous_watermark + timedelta(hours=1)).date()
+            first_imported_day = dt_util.as_local(min(imported_starts)).date()
+
+            if first_missing_day < first_imported_day:
+                missing_days = [
+                    first_missing_day + timedelta(days=offset)
+                    for offset in range((first_imported_day - first_missing_day).days)
+                ]
+
+                for listener in list(self._gap_listeners):
+                    listener(plant_id, missing_days)
+
+        # a backfill of older days does not move the watermark back
+        if plant_id not in self._watermarks or watermark > self._watermarks[plant_id]:
+            self._watermarks[plant_id] = watermark
+            self._store.async_delay_save(self._get_store_data, STORAGE_SAVE_DELAY)
+
+    async def _async_import_series(
+        self,
+        plant_id: str,
+        series: str,
+        hours: list[tuple[datetime, float]],
+        backfill: bool,
+    ) -> None:
+        """Import the hours of a series with sums continuing the existing statistics
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param series: The series' key within the plant stats
+        :type series: str
+        :param hours: The start and energy of every hour, sorted by start
+        :type hours: list[tuple[datetime, float]]
+        :param backfill: Whether the hours may replace existing ones
+        :type backfill: bool
+        """
+        recorder = get_instance(self._hass)
+        statistic_id = get_statistic_id(plant_id, series)
+
+        previous_sum, replaced_sum, has_later_hours = await recorder.async_add_executor_job(
+            get_previous_sums, self._hass, statistic_id, hours[0][0], hours[-1][0]
+        )
+
+        statistics = []
+        energy_sum = previous_sum
+
+        for hour_start, energy in hours:
+            energy_sum += energy
+            statistics.append(StatisticData(start=hour_start, state=energy_sum, sum=energy_sum))
+
+        async_add_external_statistics(
+            self._hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"{IMPORTED_SERIES[series]} {plant_id}",
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            ),
+            statistics,
+        )
+
+        # the hours after replaced ones continue the old sum. They are shifted, so
+        # the sum keeps growing.
+        if backfill and has_later_hours and energy_sum != replaced_sum:
+            recorder.async_adjust_statistics(
+                statistic_id,
+                hours[-1][0] + timedelta(hours=1),
+                energy_sum - replaced_sum,
+                UnitOfEnergy.KILO_WATT_HOUR,
+            )
+
+    @callback
+    def _get_store_data(self) -> dict:
+        """The watermarks as serializable dict"""
+        return {
+            "watermarks": {
+                plant_id: watermark.isoformat()
+                for plant_id, watermark in self._watermarks.items()
+            }
+        }
+
+    async def async_flush(self) -> None:
+        """Immediately write the watermarks"""
+        await self._store.async_save(self._get_store_data())
+
+    async def async_remove(self) -> None:
+        """Remove the stored watermarks"""
+        await self._store.async_remove()
@@ -0,0 +1,149 @@
+"""Persistent storage of the sensor states of a FusionSolar config entry"""
+
+from __future__ import annotations
+
+import logging
+import pathlib
+import pickle
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# changes are collected and written at most once within this time (in seconds)
+STORAGE_SAVE_DELAY = 30
+
+
+def get_legacy_cache_path(hass: HomeAssistant, store_key: str) -> pathlib.Path:
+    """Path of the pickle file a sensor used before the store was introduced
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :param store_key: The sensor's key within the store
+    :type store_key: str
+    :return: Path to the legacy cache file
+    :rtype: pathlib.Path
+    """
+    return pathlib.Path(hass.config.path(DOMAIN + "_" + store_key + "_cache.pkl"))
+
+
+def _load_legacy_caches(paths: dict[str, pathlib.Path]) -> dict[str, dict]:
+    """Load and remove the legacy pickle cache files.
+
+    This function is blocking and must be run in the executor.
+
+    :param paths: The store keys and the matching legacy cache files
+    :type paths: dict[str, pathlib.Path]
+    :return: The loaded caches by store key
+    :rtype: dict[str, dict]
+    """
+    caches = {}
+
+    for store_key, path in paths.items():
+        if not path.exists():
+            continue
+
+        try:
+            with open(path, "rb") as reader:
+                caches[store_key] = pickle.load(reader)
+
+            path.unlink()
+        except (OSError, pickle.UnpicklingError, EOFError) as error:
+            _LOGGER.warning(f"Failed to migrate cache file {path}: {error}")
+
+    return caches
+
+
+class FusionSolarSensorStore:
+    """Keeps the state of all sensors of a config entry in a single store.
+
+    The data is loaded once before the entities are created. Changes are
+    collected and written by Home Assistant's Store outside of the event loop.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Create a new FusionSolarSensorStore
+
+        :param hass: The HomeAssistant object
+        :type hass: HomeAssistant
+        :param entry_id: The config entry's id
+        :type entry_id: str
+        """
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.sensors")
+        self._data: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self, store_keys: list[str]) -> None:
+        """Load the stored data. If nothing was stored yet, the legacy
+           pickle cache files of the passed sensors are migrated.
+
+        :param store_keys: Keys of all sensors of the config entry
+        :type store_keys: list[str]
+        """
+        stored_data = await self._store.async_load()
+
+        if stored_data is not None:
+            self._data = {
+                store_key: self._deserialize(values)
+                for store_key, values in stored_data.items()
+            }
+            return
+
+        legacy_caches = await self._hass.async_add_executor_job(
+            _load_legacy_caches,
+            {
+                store_key: get_legacy_cache_path(self._hass, store_key)
+                for store_key in store_keys
+            },
+        )
+
+        if legacy_caches:
+            _LOGGER.info(f"Migrated {len(legacy_caches)} legacy cache files")
+
+        self._data = legacy_caches
+
+        # write the store right away, so the migration only happens once
+        await self._store.async_save(self._data)
+
+    @staticmethod
+    def _deserialize(values: dict[str, Any]) -> dict[str, Any]:
+        """Restore the datetime objects of a sensor's stored values"""
+        if isinstance(values.get("last_reset"), str):
+            values["last_reset"] = dt_util.parse_datetime(values["last_reset"])
+
+        return values
+
+    def get(self, store_key: str) -> dict[str, Any]:
+        """Get the stored values of a sensor
+
+        :param store_key: The sensor's key
+        :type store_key: str
+        :return: The stored values. Empty if nothing is stored.
+        :rtype: dict[str, Any]
+        """
+        return self._data.get(store_key, {})
+
+    @callback
+    def async_set(self, store_key: str, **values: Any) -> None:
+        """Update the stored values of a sensor. The change is written delayed
+           together with all other changes.
+
+        :param store_key: The sensor's key
+        :type store_key: str
+        """
+        self._data.setdefault(store_key, {}).update(values)
+        self._store.async_delay_save(lambda: self._data, STORAGE_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Immediately write all pending changes"""
+        await self._store.async_save(self._data)
+
+    async def async_remove(self) -> None:
+        """Remove the stored sensor states"""
+        await self._store.async_remove()
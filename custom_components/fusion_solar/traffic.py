@@ -0,0 +1,344 @@
+"""Capture of the FusionSolar API traffic, so it can be replayed offline"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+from collections import OrderedDict
+from functools import partial
+import gzip
+import hashlib
+import json
+import logging
+import pathlib
+import time
+from typing import Any
+
+from yarl import URL
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+# recorded requests are written in batches of this size
+FLUSH_SIZE = 50
+# ids of the most recently written response bodies. Older bodies are written again when they recur.
+MAX_BODY_IDS = 1000
+
+# values of these keys are redacted in the requests and in the responses of the login
+REDACTED_KEYS = {"username", "password", "csrfToken", "roarand", "ticket", "respMultiRegionName"}
+REDACTED = "**REDACTED**"
+# responses of these paths belong to the login and are redacted
+AUTH_PATHS = ("/unisso/", "/unisess/")
+
+# parameters that change with every request. They are ignored when a replayed request is matched.
+VOLATILE_KEYS = {"_", "queryTime", "timeStamp", "nonce"}
+
+# the endpoint of the account's power status - polled once per update cycle
+POLL_PATH = "/rest/pvms/web/station/v1/station/total-real-kpi"
+
+
+def get_recording_path(hass: HomeAssistant, entry_id: str) -> pathlib.Path:
+    """The file the traffic of a config entry is recorded to
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :param entry_id: The config entry's id
+    :type entry_id: str
+    :return: Path to the recording
+    :rtype: pathlib.Path
+    """
+    return pathlib.Path(hass.config.path(f"{DOMAIN}_{entry_id}_traffic.jsonl.gz"))
+
+
+async def async_remove_recording(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the recorded traffic of a config entry
+
+    :param hass: The HomeAssistant object
+    :type hass: HomeAssistant
+    :param entry_id: The config entry's id
+    :type entry_id: str
+    """
+    await hass.async_add_executor_job(
+        partial(get_recording_path(hass, entry_id).unlink, missing_ok=True)
+    )
+
+
+def _redact(value: Any) -> Any:
+    """Replace the values of the redacted keys within decoded JSON"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in REDACTED_KEYS else _redact(item)
+            for key, item in value.items()
+        }
+
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+
+    return value
+
+
+def get_request_key(method: str, path: str, params: dict | None, json_data: dict | None) -> str:
+    """Identify a request independent of its volatile parameters
+
+    :param method: The HTTP method
+    :type method: str
+    :param path: The URL's path
+    :type path: str
+    :param params: The query parameters
+    :type params: dict, optional
+    :param json_data: The JSON body
+    :type json_data: dict, optional
+    :return: The request's key
+    :rtype: str
+    """
+    return json.dumps(
+        [
+            method,
+            path,
+            {key: value for key, value in _redact(params or {}).items() if key not in VOLATILE_KEYS},
+            {key: value for key, value in _redact(json_data or {}).items() if key not in VOLATILE_KEYS},
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def _get_body_line(
+    path: str, body: str, body_ids: OrderedDict[str, None]
+) -> tuple[str, str | None]:
+    """Identify a response body. Bodies of the login are redacted.
+
+    :param path: The request's path
+    :type path: str
+    :param body: The response's body
+    :type body: str
+    :param body_ids: The ids of the bodies written recently, updated in place
+    :type body_ids: OrderedDict[str, None]
+    :return: The body's id and the line storing the body. None if the body
+             was written recently.
+    :rtype: tuple[str, str | None]
+    """
+    if path.startswith(AUTH_PATHS):
+        try:
+            body = json.dumps(_redact(json.loads(body)))
+        except json.JSONDecodeError:
+            body = REDACTED
+
+    body_id = hashlib.sha1(body.encode()).hexdigest()[:16]
+
+    if body_id in body_ids:
+        body_ids.move_to_end(body_id)
+        return body_id, None
+
+    body_ids[body_id] = None
+
+    if len(body_ids) > MAX_BODY_IDS:
+        body_ids.popitem(last=False)
+
+    return body_id, json.dumps({"i": body_id, "body": body}, separators=(",", ":"))
+
+
+def _append_entries(
+    path: pathlib.Path, entries: list[tuple[dict, str | None]], body_ids: OrderedDict[str, None]
+) -> None:
+    """Append recorded requests to the recording. Every batch is a gzip member of its own.
+
+    This function is blocking and must be run in the executor.
+
+    :param path: The recording's file
+    :type path: pathlib.Path
+    :param entries: The recorded requests and their response bodies
+    :type entries: list[tuple[dict, str | None]]
+    :param body_ids: The ids of the bodies written recently, updated in place
+    :type body_ids: OrderedDict[str, None]
+    """
+    lines = []
+
+    for entry, body in entries:
+        if "e" not in entry:
+            entry["b"], body_line = _get_body_line(entry["p"], body or "", body_ids)
+
+            if body_line:
+                lines.append(body_line)
+
+        lines.append(json.dumps(entry, separators=(",", ":"), default=str))
+
+    with gzip.open(path, "at", encoding="utf-8") as writer:
+        writer.write("\n".join(lines) + "\n")
+
+
+class TrafficRecorder:
+    """Records every request of a client and its response.
+
+    The recording is a gzip compressed file of JSON lines. Every distinct
+    response body is only stored once, so the repeated day series of the
+    plants take little space. Credentials and the tokens of the session are
+    redacted. Requests are redacted and written in batches outside of the
+    event loop.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        """Create a new TrafficRecorder
+
+        :param path: The file the traffic is appended to
+        :type path: str | pathlib.Path
+        """
+        self.path = pathlib.Path(path)
+
+        self._entries: list[tuple[dict, str | None]] = []
+        # only accessed by the writes, which run one at a time
+        self._body_ids: OrderedDict[str, None] = OrderedDict()
+        self._flush_task: asyncio.Task | None = None
+        self._write_lock = asyncio.Lock()
+
+        self.recorded_requests = 0
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        params: dict | None,
+        json_data: dict | None,
+        duration: float,
+        response: str | None = None,
+        error: int | str | None = None,
+    ) -> None:
+        """Record a request and its response or error
+
+        :param method: The HTTP method
+        :type method: str
+        :param url: The request's URL
+        :type url: str
+        :param params: The query parameters
+        :type params: dict, optional
+        :param json_data: The JSON body
+        :type json_data: dict, optional
+        :param duration: The request's duration (in seconds)
+        :type duration: float
+        :param response: The response's body
+        :type response: str, optional
+        :param error: The status code of a failed request or "timeout"
+        :type error: int | str, optional
+        """
+        entry = {
+            "t": round(time.time(), 3),
+            "d": round(duration, 3),
+            "m": method,
+            "p": URL(url).path,
+            "q": _redact(params),
+            "j": _redact(json_data),
+        }
+
+        if error is not None:
+            entry["e"] = error
+
+        # the body is identified when it is written
+        self._entries.append((entry, response))
+        self.recorded_requests += 1
+
+        if len(self._entries) >= FLUSH_SIZE and not self._flush_task:
+            self._flush_task = asyncio.get_running_loop().create_task(self.async_flush())
+            self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        """Log failed writes"""
+        self._flush_task = None
+
+        if not task.cancelled() and (error := task.exception()):
+            _LOGGER.warning(f"Failed to write the traffic to {self.path}: {error}")
+
+    async def async_flush(self) -> None:
+        """Write the recorded requests"""
+        async with self._write_lock:
+            entries, self._entries = self._entries, []
+
+            if entries:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _append_entries, self.path, entries, self._body_ids
+                )
+
+
+class Recording:
+    """Recorded traffic, indexed to answer replayed requests"""
+
+    def __init__(self, entries: list[dict], bodies: dict[str, str]) -> None:
+        """Create a new Recording
+
+        :param entries: The recorded requests in the order they were sent
+        :type entries: list[dict]
+        :param bodies: The response bodies by id
+        :type bodies: dict[str, str]
+        """
+        self.entries = sorted(entries, key=lambda entry: entry["t"])
+        self.bodies = bodies
+        self.start = self.entries[0]["t"] if self.entries else 0.0
+
+        # times (relative to the start) and entries of every request
+        self._index: dict[str, tuple[list[float], list[dict]]] = {}
+
+        for entry in self.entries:
+            times, key_entries = self._index.setdefault(
+                get_request_key(entry["m"], entry["p"], entry["q"], entry["j"]), ([], [])
+            )
+            times.append(entry["t"] - self.start)
+            key_entries.append(entry)
+
+    @property
+    def duration(self) -> float:
+        """Time between the first and the last request (in seconds)"""
+        return self.entries[-1]["t"] - self.start if self.entries else 0.0
+
+    def get_poll_times(self) -> list[float]:
+        """The times of the recorded update cycles (relative to the start, in seconds)"""
+        return [entry["t"] - self.start for entry in self.entries if entry["p"] == POLL_PATH]
+
+    def find(self, key: str, position: float) -> dict | None:
+        """Find the response to a request at a point of the recording
+
+        :param key: The request's key (see get_request_key)
+        :type key: str
+        :param position: Time since the start of the recording (in seconds)
+        :type position: float
+        :return: The last recorded entry of the request at the position. The
+                 first entry if the request was only sent later. None if the
+                 request was never recorded.
+        :rtype: dict, optional
+        """
+        if key not in self._index:
+            return None
+
+        times, key_entries = self._index[key]
+
+        return key_entries[max(bisect.bisect_right(times, position) - 1, 0)]
+
+
+def read_recording(path: str | pathlib.Path) -> Recording:
+    """Read a recording written by the TrafficRecorder.
+
+    This function is blocking and must be run in the executor.
+
+    :param path: The recording's file
+    :type path: str | pathlib.Path
+    :return: The recording
+    :rtype: Recording
+    """
+    entries = []
+    bodies = {}
+
+    with gzip.open(path, "rt", encoding="utf-8") as reader:
+        for line in reader:
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+
+            if "body" in record:
+                bodies[record["i"]] = record["body"]
+            else:
+                entries.append(record)
+
+    return Recording(entries, bodies)
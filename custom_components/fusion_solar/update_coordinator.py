@@ -1,22 +1,283 @@
-from datetime import timedelta
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta
 import logging
+import time
 
 import async_timeout
-from fusion_solar_py.client import FusionSolarClient
+from fusion_solar_py.client import PowerStatus
 from fusion_solar_py.exceptions import AuthenticationException, FusionSolarException
 
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
+from .api import FusionSolarAsyncClient, extract_last_plant_data
+from .circuit_breaker import (
+    ERROR_AUTH,
+    ERROR_PARSE,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    classify_error,
+    get_retry_after,
+)
+from .const import (
+    CONF_DETECT_LOOP_BLOCKING,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_PLANT_STALENESS,
+    CONF_MAX_POLL_INTERVAL,
+    CONF_MIN_POLL_INTERVAL,
+    CONF_PLANT_DISCOVERY_INTERVAL,
+    CONF_POLLING_MODE,
+    CONF_PLANT_TIMEOUT,
+    CONF_SHARDED_POLLING,
+    CONF_SLOT_PUBLICATION_DELAY,
+    CONF_SLOW_POLL_INTERVAL,
+    DEFAULT_DETECT_LOOP_BLOCKING,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_PLANT_STALENESS,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_MIN_POLL_INTERVAL,
+    DEFAULT_PLANT_DISCOVERY_INTERVAL,
+    DEFAULT_PLANT_TIMEOUT,
+    DEFAULT_POLLING_MODE,
+    DEFAULT_SHARDED_POLLING,
+    DEFAULT_SLOT_PUBLICATION_DELAY,
+    DEFAULT_SLOW_POLL_INTERVAL,
+    POLLING_MODE_ADAPTIVE,
+    TIER_FAST,
+    TIER_SLOW,
+    TIER_STATIC,
+)
+from .counter_validation import CounterValidator
+from .derived import compute_derived_metrics
 from .id_generator import create_id_hash
+from .loop_monitor import LoopBlockingDetector
+from .metrics import UpdateMetrics
+from .rate_limiter import PRIORITY_LOW, request_priority
+from .scheduler import AdaptivePollScheduler, PollDecision
+from .snapshot_store import FusionSolarSnapshotStore, get_snapshot_updated
+from .statistics_import import FusionSolarStatisticsImporter
 
 _LOGGER = logging.getLogger(__name__)
 
+DEFAULT_UPDATE_INTERVAL = timedelta(minutes=4)
+# backoff of the circuit breakers after the first failure
+MIN_BACKOFF = timedelta(minutes=1)
+# longest interval between two polls of a failing account or plant
+MAX_BACKOFF = timedelta(hours=1)
 
-class FusionSolarCoordinator(DataUpdateCoordinator):
+# the parts of the coordinator's data and the tier they are fetched at without any reader
+# Note: The first update fetches all data.
+SOURCE_TOTAL = "total"
+SOURCE_PLANTS = "plants"
+DEFAULT_SOURCE_TIERS = {SOURCE_TOTAL: TIER_FAST, SOURCE_PLANTS: TIER_SLOW}
+# data that becomes due shortly after the update is already fetched by this update (in seconds)
+DUE_TOLERANCE = 10
+
+
+def get_data_value(data: dict | None, data_path: tuple):
+    """Look up a value in the coordinator's data
+
+    :param data: The coordinator's data
+    :type data: dict, optional
+    :param data_path: The keys leading to the value
+    :type data_path: tuple
+    :return: The value or None if it does not exist
+    """
+    value = data
+
+    try:
+        for key in data_path:
+            value = value[key]
+    except (KeyError, TypeError):
+        return None
+
+    return value
+
+
+def get_stale_since(data: dict | None, data_path: tuple) -> str | None:
+    """Look up whether a value belongs to the totals or a plant whose last
+    good values are kept after a failed fetch
+
+    :param data: The coordinator's data
+    :type data: dict, optional
+    :param data_path: The keys leading to the value
+    :type data_path: tuple
+    :return: The time of the last good data or None if the value is current
+    :rtype: str, optional
+    """
+    if data_path and data_path[0] == SOURCE_TOTAL:
+        return get_data_value(data, ("stale_total",))
+
+    if len(data_path) < 2 or data_path[0] != SOURCE_PLANTS:
+        return None
+
+    return get_data_value(data, ("stale_plants", data_path[1]))
+
+
+def process_plants_data(plants_stats: dict[str, dict]) -> dict[str, dict | Exception]:
+    """Extract the latest values of all plants and compute their derived metrics.
+
+    This function parses the complete day series and must be run in the executor.
+
+    :param plants_stats: The stats of every plant as returned by get_plant_stats
+    :type plants_stats: dict[str, dict]
+    :return: The latest values and the derived metrics of every plant or the
+             error of a plant whose stats are invalid
+    :rtype: dict[str, dict | Exception]
+    """
+    results = {}
+
+    for plant_id, plant_stats in plants_stats.items():
+        try:
+            results[plant_id] = extract_last_plant_data(plant_stats)
+        except FusionSolarException as err:
+            results[plant_id] = err
+
+    # the metrics of all valid plants are computed at once
+    derived_metrics = compute_derived_metrics(
+        {
+            plant_id: plants_stats[plant_id]
+            for plant_id, result in results.items()
+            if not isinstance(result, Exception)
+        }
+    )
+
+    for plant_id, metrics in derived_metrics.items():
+        results[plant_id].update(metrics)
+
+    return results
+
+
+class FusionSolarBaseCoordinator(DataUpdateCoordinator):
+    """Base class of the FusionSolar coordinators. Only notifies the
+    entities whose value changed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the coordinator."""
+        super().__init__(*args, **kwargs)
+
+        # the previous snapshot is used to only notify the entities whose value changed
+        self._previous_data = None
+        self._previous_update_success = None
+        self.delivered_updates = 0
+        self.skipped_updates = 0
+
+        # durations and failures of the update cycles
+        self.metrics = UpdateMetrics()
+
+        # times the work done on the event loop - only enabled for debugging
+        self.loop_monitor = LoopBlockingDetector()
+
+        # filters the glitches of the daily counters and detects their resets
+        self.counter_validator = CounterValidator()
+
+        # set while the data was restored from the snapshot and not updated yet
+        self.stale = False
+
+        # time of the last good data of every plant. If a plant's fetch fails, its
+        # last good values are kept until they are older than the max. staleness.
+        self.plant_updated: dict[str, datetime] = {}
+        self.max_plant_staleness = timedelta(minutes=DEFAULT_MAX_PLANT_STALENESS)
+        self.failed_plant_fetches = 0
+
+    @callback
+    def async_restore_data(self, data: dict, snapshot: dict | None = None) -> None:
+        """Use data restored from a snapshot until the first update succeeded.
+
+        The listeners are not notified. As no update happened yet, the first
+        update notifies all listeners.
+
+        :param data: The restored data
+        :type data: dict
+        :param snapshot: The snapshot holding the time every plant was fetched, defaults to unknown times
+        :type snapshot: dict, optional
+        """
+        self.data = data
+        self.stale = True
+
+        for plant_id in data.get("plants", {}):
+            if snapshot and (updated := get_snapshot_updated(snapshot, plant_id)):
+                self.plant_updated[plant_id] = updated
+
+    def _get_stale_since(self, plant_id: str) -> str | None:
+        """The time of a plant's last good data if its values may still be used
+        after a failed fetch
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :return: The time of the last good data or None if the values expired
+        :rtype: str, optional
+        """
+        updated = self.plant_updated.get(plant_id)
+
+        if (
+            not updated
+            or plant_id not in (get_data_value(self.data, (SOURCE_PLANTS,)) or {})
+            or dt_util.utcnow() - updated > self.max_plant_staleness
+        ):
+            return None
+
+        return updated.isoformat()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update only the listeners whose value changed since the last update.
+
+        Entities register with the path to their value as context. Listeners
+        without a context are always updated. All listeners are updated if the
+        availability changed.
+        """
+        notify_all = (
+            self._previous_data is None
+            or self.last_update_success != self._previous_update_success
+        )
+
+        delivered = 0
+        skipped = 0
+
+        with self.loop_monitor.section("notify entities", self.name):
+            for update_callback, data_path in list(self._listeners.values()):
+                if (
+                    notify_all
+                    or data_path is None
+                    or get_data_value(self.data, data_path)
+                    != get_data_value(self._previous_data, data_path)
+                    or get_stale_since(self.data, data_path)
+                    != get_stale_since(self._previous_data, data_path)
+                ):
+                    update_callback()
+                    delivered += 1
+                else:
+                    skipped += 1
+
+        self._previous_data = self.data
+        self._previous_update_success = self.last_update_success
+        self.metrics.end_write_cycle()
+        self.delivered_updates += delivered
+        self.skipped_updates += skipped
+
+        _LOGGER.debug(
+            f"{self.name}: Updated {delivered} entities, skipped {skipped} unchanged entities"
+        )
+
+
+class FusionSolarCoordinator(FusionSolarBaseCoordinator):
     """My custom coordinator."""
 
-    def __init__(self, hass, my_api: FusionSolarClient):
+    def __init__(
+        self,
+        hass,
+        my_api: FusionSolarAsyncClient,
+        entry: ConfigEntry,
+        snapshot_store: FusionSolarSnapshotStore,
+    ):
         """Initialize my coordinator."""
         super().__init__(
             hass,
@@ -24,21 +285,400 @@ class FusionSolarCoordinator(DataUpdateCoordinator):
             # Name of the data. For logging purposes.
             name="FusionSolarAPI",
             # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(minutes=4),
+            update_interval=DEFAULT_UPDATE_INTERVAL,
         )
+        self.config_entry = entry
         self.my_api = my_api
         self.plant_ids = None
-        self._update_failure_counter = 0
+        self.snapshot_store = snapshot_store
 
-    def _reset_client(self) -> None:
-        """Resets the FusionSolarClient
+        # time of the last good power status. Like the plants' values, the last
+        # totals are kept after a failed fetch until they are too old.
+        self.total_updated: datetime | None = None
+        self.failed_total_fetches = 0
+
+        # imports the complete day series of the plants if enabled
+        self.statistics_importer: FusionSolarStatisticsImporter | None = None
+        # the running import of every plant
+        self._import_tasks: dict[str, asyncio.Task] = {}
+
+        # the plant coordinators share the account's detector
+        self.loop_monitor.enabled = entry.options.get(
+            CONF_DETECT_LOOP_BLOCKING, DEFAULT_DETECT_LOOP_BLOCKING
+        )
+
+        # stops the polling after errors and backs off
+        self.breaker = CircuitBreaker(self.name, MIN_BACKOFF, MAX_BACKOFF)
+
+        # the plant ids are cached and rechecked in the background once they expired
+        self._plant_discovery_interval = timedelta(
+            minutes=entry.options.get(
+                CONF_PLANT_DISCOVERY_INTERVAL, DEFAULT_PLANT_DISCOVERY_INTERVAL
+            )
+        )
+        self._plant_ids_expire = 0.0
+        self._plant_discovery_task: asyncio.Task | None = None
+        self._plant_listeners: list[Callable[[list[str], list[str]], None]] = []
+
+        # every data source is fetched at the fastest tier of the entities reading it.
+        # Fast data is fetched with every update.
+        self._tier_intervals = {
+            TIER_FAST: timedelta(0),
+            TIER_SLOW: timedelta(
+                minutes=entry.options.get(CONF_SLOW_POLL_INTERVAL, DEFAULT_SLOW_POLL_INTERVAL)
+            ),
+            TIER_STATIC: self._plant_discovery_interval,
+        }
+        self._tier_readers: Counter[tuple[str, str]] = Counter()
+        # time at which a source has to be fetched again (time.monotonic)
+        self._source_due: dict[str, float] = {}
+
+        # maximum number of plant requests that may be in flight at the same time
+        # Note: The limit is shared with the plant coordinators
+        self._max_concurrent_requests = entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        self._request_semaphore = asyncio.Semaphore(self._max_concurrent_requests)
+
+        self.max_plant_staleness = timedelta(
+            minutes=entry.options.get(CONF_MAX_PLANT_STALENESS, DEFAULT_MAX_PLANT_STALENESS)
+        )
+
+        # with sharded polling, every plant is polled by its own coordinator
+        self.sharded = entry.options.get(CONF_SHARDED_POLLING, DEFAULT_SHARDED_POLLING)
+
+        # timing information of the last update cycle (in seconds)
+        self.last_update_duration: float | None = None
+        self.plant_latencies: dict[str, float] = {}
+
+        # the adaptive scheduler adapts the update interval after every update
+        self._scheduler = None
+        self.poll_decision: PollDecision | None = None
+
+        if entry.options.get(CONF_POLLING_MODE, DEFAULT_POLLING_MODE) == POLLING_MODE_ADAPTIVE:
+            self._scheduler = AdaptivePollScheduler(
+                hass,
+                min_interval=timedelta(
+                    minutes=entry.options.get(CONF_MIN_POLL_INTERVAL, DEFAULT_MIN_POLL_INTERVAL)
+                ),
+                max_interval=timedelta(
+                    minutes=entry.options.get(CONF_MAX_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL)
+                ),
+                publication_delay=timedelta(
+                    seconds=entry.options.get(
+                        CONF_SLOT_PUBLICATION_DELAY, DEFAULT_SLOT_PUBLICATION_DELAY
+                    )
+                ),
+            )
+
+    @callback
+    def async_restore_snapshot(self, snapshot: dict) -> None:
+        """Restore the plant ids and the data of the last good update
+
+        :param snapshot: The snapshot as loaded by the FusionSolarSnapshotStore
+        :type snapshot: dict
+        """
+        self.plant_ids = snapshot["plant_ids"]
+        self.async_restore_data(snapshot["data"], snapshot)
+
+        if snapshot["data"].get("total") is not None:
+            self.total_updated = get_snapshot_updated(snapshot)
+
+        _LOGGER.debug(f"Restored data of {len(self.plant_ids)} plants from {snapshot.get('updated')}")
+
+    @callback
+    def async_add_plant_listener(
+        self, listener: Callable[[list[str], list[str]], None]
+    ) -> Callable[[], None]:
+        """Register a callback that is called if plants were added or removed
+
+        :param listener: Called with the added and the removed plant ids
+        :type listener: Callable[[list[str], list[str]], None]
+        :return: Function removing the listener again
+        :rtype: Callable[[], None]
+        """
+        self._plant_listeners.append(listener)
+
+        return lambda: self._plant_listeners.remove(listener)
+
+    @callback
+    def async_add_tier_reader(self, source: str, tier: str) -> Callable[[], None]:
+        """Register an entity reading data of the given source at the given tier
+
+        :param source: The part of the coordinator's data the entity reads (SOURCE_*)
+        :type source: str
+        :param tier: The entity's polling tier (TIER_*)
+        :type tier: str
+        :return: Function removing the reader again
+        :rtype: Callable[[], None]
+        """
+        self._tier_readers[(source, tier)] += 1
+
+        @callback
+        def remove_reader() -> None:
+            self._tier_readers[(source, tier)] -= 1
+
+            if not self._tier_readers[(source, tier)]:
+                del self._tier_readers[(source, tier)]
+
+        return remove_reader
+
+    def get_source_interval(self, source: str) -> timedelta:
+        """The interval at which a data source is fetched
+
+        :param source: The part of the coordinator's data (SOURCE_*)
+        :type source: str
+        :return: The interval of the fastest tier reading from the source
+        :rtype: timedelta
         """
-        new_client = FusionSolarClient(self.my_api._user, self.my_api._password, huawei_subdomain=self.my_api._huawei_subdomain)
+        tiers = [
+            tier for reader_source, tier in self._tier_readers if reader_source == source
+        ] or [DEFAULT_SOURCE_TIERS[source]]
 
-        # remove the current one
-        self.my_api.log_out()
+        return min(self._tier_intervals[tier] for tier in tiers)
 
-        self.my_api = new_client
+    def _is_due(self, source: str) -> bool:
+        """Whether the data of the source has to be fetched by this update"""
+        return time.monotonic() + DUE_TOLERANCE >= self._source_due.get(source, 0.0)
+
+    def _set_fetched(self, source: str) -> None:
+        """Schedule the next fetch of a source that was just fetched"""
+        self._source_due[source] = (
+            time.monotonic() + self.get_source_interval(source).total_seconds()
+        )
+
+    async def _async_update_plant_ids(self) -> None:
+        """Fetch the plant ids and inform the plant listeners about changes"""
+        plant_ids = await self.my_api.get_plant_ids()
+        self._plant_ids_expire = (
+            time.monotonic() + self._plant_discovery_interval.total_seconds()
+        )
+
+        if self.plant_ids is None:
+            self.plant_ids = plant_ids
+            return
+
+        added = [plant_id for plant_id in plant_ids if plant_id not in self.plant_ids]
+        removed = [plant_id for plant_id in self.plant_ids if plant_id not in plant_ids]
+
+        if not added and not removed:
+            return
+
+        _LOGGER.info(f"Plants changed. Added: {added}, removed: {removed}")
+
+        self.plant_ids = plant_ids
+
+        for listener in list(self._plant_listeners):
+            listener(added, removed)
+
+        # get the data of the new plants right away
+        if added and not self.sharded:
+            self._source_due.pop(SOURCE_PLANTS, None)
+            await self.async_request_refresh()
+
+    async def _async_discover_plants(self) -> None:
+        """Recheck the plant ids. Failures keep the known plants."""
+        try:
+            with request_priority(PRIORITY_LOW):
+                await self._async_update_plant_ids()
+        except Exception as err:
+            _LOGGER.warning(f"Failed to check for new plants: {err}")
+        finally:
+            self._plant_discovery_task = None
+
+    async def async_fetch_plant_stats(self, plant_id: str) -> dict:
+        """Fetch the stats of a single plant and import them into the statistics
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :return: The plant's stats as returned by get_plant_stats
+        :rtype: dict
+        """
+        async with self._request_semaphore:
+            start = time.monotonic()
+            plant_status = await self.my_api.get_plant_stats(plant_id)
+            self.plant_latencies[plant_id] = time.monotonic() - start
+
+        # the import waits for the recorder, so it runs in the background and
+        # neither delays nor fails the update
+        if self.statistics_importer and plant_id not in self._import_tasks:
+            self._import_tasks[plant_id] = self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_import_statistics(plant_id, plant_status),
+                f"{self.name} statistics import {plant_id}",
+            )
+
+        return plant_status
+
+    async def _async_import_statistics(self, plant_id: str, plant_status: dict) -> None:
+        """Import the plant's stats into the statistics. Failures are only logged.
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :param plant_status: The plant's stats as returned by get_plant_stats
+        :type plant_status: dict
+        """
+        try:
+            # the series are only parsed for the import once a new hour is complete
+            await self.statistics_importer.async_import(plant_id, plant_status)
+        except Exception as err:
+            _LOGGER.warning(f"Failed to import the statistics of plant {plant_id}: {err}")
+        finally:
+            self._import_tasks.pop(plant_id, None)
+
+    async def async_fetch_plant_data(self, plant_id: str) -> dict:
+        """Fetch the stats of a single plant and extract the latest values
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :return: The latest values of the plant
+        :rtype: dict
+        """
+        plant_status = await self.async_fetch_plant_stats(plant_id)
+
+        # the parsing of the complete day series is kept off the event loop
+        # Note: With sharded polling, every plant has its own schedule, so its series are parsed on their own.
+        results = await self.hass.async_add_executor_job(
+            process_plants_data, {plant_id: plant_status}
+        )
+
+        if isinstance(results[plant_id], Exception):
+            raise results[plant_id]
+
+        return results[plant_id]
+
+    async def _async_try_fetch_plant_stats(self, plant_id: str) -> dict | Exception:
+        """Fetch the stats of a plant. A failure only affects this plant,
+        so the error is returned instead of raised.
+
+        :param plant_id: The plant's id
+        :type plant_id: str
+        :return: The plant's stats or the error
+        :rtype: dict | Exception
+        """
+        try:
+            return await self.async_fetch_plant_stats(plant_id)
+        except Exception as err:
+            return err
+
+    async def _async_try_fetch_power_status(self) -> PowerStatus | Exception:
+        """Fetch the account's power status. A failure keeps the last totals,
+        so the error is returned instead of raised.
+
+        :return: The power status or the error
+        :rtype: PowerStatus | Exception
+        """
+        try:
+            return await self.my_api.get_power_status()
+        except Exception as err:
+            return err
+
+    def _get_total_stale_since(self) -> str | None:
+        """The time of the last good totals if they may still be used after a failed fetch"""
+        if (
+            not self.total_updated
+            or get_data_value(self.data, (SOURCE_TOTAL,)) is None
+            or dt_util.utcnow() - self.total_updated > self.max_plant_staleness
+        ):
+            return None
+
+        return self.total_updated.isoformat()
+
+    def _merge_plant_results(
+        self, plant_ids: list[str], results: list[dict | Exception]
+    ) -> tuple[dict, dict]:
+        """Merge the fetched plants with the last good values of the failed plants
+
+        :param plant_ids: The ids of the fetched plants
+        :type plant_ids: list[str]
+        :param results: The values or the error of every plant, in the order of plant_ids
+        :type results: list[dict | Exception]
+        :return: The plants' values and the time of the last good data of every stale plant
+        :rtype: tuple[dict, dict]
+        """
+        now = dt_util.utcnow()
+        plants = {}
+        stale_plants = {}
+
+        for plant_id, result in zip(plant_ids, results):
+            if not isinstance(result, Exception):
+                plants[plant_id] = result
+                self.plant_updated[plant_id] = now
+                continue
+
+            self.failed_plant_fetches += 1
+
+            # plants without good values are left out and become unavailable
+            if stale_since := self._get_stale_since(plant_id):
+                plants[plant_id] = self.data[SOURCE_PLANTS][plant_id]
+                stale_plants[plant_id] = stale_since
+                _LOGGER.debug(f"Failed to fetch plant {plant_id}, keeping values of {stale_since}: {result}")
+            else:
+                _LOGGER.warning(f"Failed to fetch plant {plant_id}: {result}")
+
+        return plants, stale_plants
+
+    def _get_kept_data(self) -> dict | None:
+        """The last good values that did not expire yet, tagged as stale. Used
+        while no requests are sent.
+
+        :return: The kept data or None if all values expired
+        :rtype: dict, optional
+        """
+        stale_total = self._get_total_stale_since()
+        stale_plants = {
+            plant_id: stale_since
+            for plant_id in self.plant_ids or []
+            if (stale_since := self._get_stale_since(plant_id))
+        }
+
+        if not stale_total and not stale_plants:
+            return None
+
+        return {
+            "total": self.data[SOURCE_TOTAL] if stale_total else None,
+            "plants": {plant_id: self.data[SOURCE_PLANTS][plant_id] for plant_id in stale_plants},
+            "stale_total": stale_total,
+            "stale_plants": stale_plants,
+        }
+
+    def _schedule_next_poll(self, data: dict | None) -> None:
+        """Let the adaptive scheduler set the interval until the next update
+
+        :param data: The data of the current update. None if it failed.
+        :type data: dict, optional
+        """
+        if not self._scheduler:
+            return
+
+        # without new data, the last known production is used
+        if data is None:
+            data = self.data
+
+        producing = bool(get_data_value(data, (SOURCE_TOTAL, "current_power_kw")))
+
+        self.poll_decision = self._scheduler.next_poll(producing)
+        self.update_interval = self.poll_decision.interval
+
+        _LOGGER.debug(
+            f"Next poll in {self.poll_decision.interval} at "
+            f"{self.poll_decision.next_poll.isoformat()}: {self.poll_decision.reason}"
+        )
+
+    def _log_update_timing(self) -> None:
+        """Log the duration of the last update cycle and of every plant request"""
+        _LOGGER.debug(
+            f"Update of {len(self.plant_ids or [])} plants took {self.last_update_duration:.2f} s "
+            f"(max. {self._max_concurrent_requests} parallel plant requests)"
+        )
+
+        for plant_id, latency in self.plant_latencies.items():
+            _LOGGER.debug(f"Plant {plant_id} responded in {latency:.2f} s")
+
+    def _apply_backoff(self) -> None:
+        """Do not poll before the circuit breaker lets the next probe through"""
+        if self.breaker.state == STATE_OPEN:
+            self.update_interval = max(self.update_interval, self.breaker.retry_in)
 
     async def _async_update_data(self):
         """Fetch data from API endpoint.
@@ -46,60 +686,366 @@ class FusionSolarCoordinator(DataUpdateCoordinator):
         This is the place to pre-process the data to lookup tables
         so entities can quickly look up their data.
         """
+        if not self.breaker.allow_request():
+            self._apply_backoff()
+
+            if kept_data := self._get_kept_data():
+                return kept_data
+
+            raise UpdateFailed(
+                f"Circuit breaker open after {self.breaker.last_error_kind} errors. "
+                f"Next attempt in {self.breaker.retry_in}"
+            )
+
+        update_start = time.monotonic()
+        self.plant_latencies = {}
+
         try:
             # Note: asyncio.TimeoutError and aiohttp.ClientError are already
             # handled by the data update coordinator.
             async with async_timeout.timeout(60):
-                # get the plant ids
+                power_status = None
+
+                # while half-open, a single probe decides whether the whole cycle is sent
+                # Note: The probe must reach the API, so it is never served from the cache
+                if self.breaker.state == STATE_HALF_OPEN:
+                    power_status = await self.my_api.get_power_status(refresh=True)
+                    self.breaker.record_success()
+
+                # get the plant ids - known plant ids are rechecked in the background
                 if not self.plant_ids:
-                    self.plant_ids = await self.hass.async_add_executor_job(
-                        self.my_api.get_plant_ids
+                    await self._async_update_plant_ids()
+                elif (
+                    time.monotonic() >= self._plant_ids_expire
+                    and not self._plant_discovery_task
+                ):
+                    self._plant_discovery_task = self.config_entry.async_create_background_task(
+                        self.hass,
+                        self._async_discover_plants(),
+                        f"{self.name} plant discovery",
                     )
 
-                # overall power status
-                power_status = await self.hass.async_add_executor_job(
-                    self.my_api.get_power_status
+                # the plant discovery may replace self.plant_ids while the plants are
+                # fetched, so the results are matched with the ids they were requested for
+                plant_ids = list(self.plant_ids)
+
+                # only the sources whose tier is due are fetched. The others keep their last values.
+                fetch_total = power_status is None and (
+                    self._is_due(SOURCE_TOTAL) or not self.data
+                )
+                fetch_plants = not self.sharded and (
+                    self._is_due(SOURCE_PLANTS) or not self.data
                 )
 
-                _LOGGER.debug(f"Got power status: {power_status.current_power_kw}")
+                # fetch the overall power status alongside the plant specific values
+                # Note: get_power_status is not counted against the request limit
+                # With sharded polling, the plants are fetched by their own coordinators
+                # A failed fetch only affects its own part of the data, so the errors
+                # are returned and all fetches are awaited.
+                results = await asyncio.gather(
+                    *([self._async_try_fetch_power_status()] if fetch_total else []),
+                    *[
+                        self._async_try_fetch_plant_stats(plant_id)
+                        for plant_id in (plant_ids if fetch_plants else [])
+                    ],
+                )
+
+                errors = [result for result in results if isinstance(result, Exception)]
+
+                # the session is shared by all requests
+                for error in errors:
+                    if isinstance(error, AuthenticationException):
+                        raise error
 
-                # initialize the data
-                data = {
-                    "total": {
-                        "current_power_kw": power_status.current_power_kw,
-                        "power_today_kwh": power_status.energy_today_kwh,
-                    },
-                    "plants": {},
+                if fetch_total:
+                    power_status, *plants_stats = results
+                else:
+                    plants_stats = results
+
+                # the day series of all plants are parsed in a single executor job
+                # A plant with invalid stats fails like a plant whose request failed.
+                valid_stats = {
+                    plant_id: plant_stats
+                    for plant_id, plant_stats in zip(plant_ids, plants_stats)
+                    if not isinstance(plant_stats, Exception)
                 }
+                processed = (
+                    await self.hass.async_add_executor_job(process_plants_data, valid_stats)
+                    if valid_stats
+                    else {}
+                )
+
+                plants_data = [
+                    processed.get(plant_id, plant_stats)
+                    for plant_id, plant_stats in zip(plant_ids, plants_stats)
+                ]
+                results = [power_status, *plants_data] if fetch_total else plants_data
+                errors = [result for result in results if isinstance(result, Exception)]
 
-                # get the plant specific values
-                for plant_id in self.plant_ids:
-                    plant_status = await self.hass.async_add_executor_job(
-                        self.my_api.get_plant_stats, plant_id
+                # the data is assembled on the event loop
+                with self.loop_monitor.section("assemble data", self.name):
+                    stale_total = None
+
+                    if isinstance(power_status, Exception):
+                        self.failed_total_fetches += 1
+                        _LOGGER.warning(f"Failed to fetch the power status: {power_status}")
+                        power_status = None
+
+                        # the totals are left out and become unavailable once they expired
+                        stale_total = self._get_total_stale_since()
+                        total = self.data[SOURCE_TOTAL] if stale_total else None
+                    elif power_status:
+                        _LOGGER.debug(f"Got power status: {power_status.current_power_kw}")
+                        self.total_updated = dt_util.utcnow()
+                        total = {
+                            "current_power_kw": power_status.current_power_kw,
+                            "power_today_kwh": power_status.energy_today_kwh,
+                            # the power status has no measurement time of its own
+                            "time": self.total_updated.isoformat(),
+                        }
+                    else:
+                        total = self.data[SOURCE_TOTAL]
+                        stale_total = self.data.get("stale_total")
+
+                    stale_plants = {}
+
+                    if fetch_plants:
+                        plants, stale_plants = self._merge_plant_results(plant_ids, plants_data)
+                    elif self.sharded:
+                        plants = {}
+                    else:
+                        # the values of removed plants are dropped
+                        plants = {
+                            plant_id: plant_data
+                            for plant_id, plant_data in self.data["plants"].items()
+                            if plant_id in self.plant_ids
+                        }
+                        stale_plants = {
+                            plant_id: stale_since
+                            for plant_id, stale_since in self.data.get("stale_plants", {}).items()
+                            if plant_id in plants
+                        }
+
+                    # the update only fails if there are neither new nor kept values
+                    if errors and total is None and not plants:
+                        raise errors[0]
+
+                    _LOGGER.debug(
+                        f"Fetched power status: {power_status is not None}, plants: {fetch_plants}"
+                    )
+
+                    # initialize the data
+                    data = {
+                        "total": total,
+                        "plants": plants,
+                        "stale_total": stale_total,
+                        "stale_plants": stale_plants,
+                    }
+
+                    self.counter_validator.validate(data)
+
+                    # only the fetched sections are stored, so kept values do not look fresh after a restart
+                    self.snapshot_store.async_update(
+                        {
+                            "total": total if power_status else None,
+                            "plants": {
+                                plant_id: plants[plant_id]
+                                for plant_id, plant_data in zip(plant_ids, plants_data)
+                                if fetch_plants and not isinstance(plant_data, Exception)
+                            },
+                        },
+                        self.plant_ids,
+                    )
+
+                if power_status:
+                    self._set_fetched(SOURCE_TOTAL)
+                if fetch_plants:
+                    self._set_fetched(SOURCE_PLANTS)
+
+                self.last_update_duration = time.monotonic() - update_start
+                self.stale = False
+
+                # only kept values: the API is backed off, but the values stay available
+                if errors and len(errors) == len(results):
+                    self.metrics.record_cycle(self.last_update_duration, success=False)
+                    self.breaker.record_failure(
+                        classify_error(errors[0]), get_retry_after(errors[0])
                     )
+                    self._schedule_next_poll(data)
+                    self._apply_backoff()
 
-                    plant_data = self.my_api.get_last_plant_data(plant_status)
+                    return data
 
-                    # save the power data
-                    data["plants"][plant_id] = plant_data
+                self.breaker.record_success()
+                self.update_interval = DEFAULT_UPDATE_INTERVAL
+                self.metrics.record_cycle(self.last_update_duration, success=True)
 
-                # reset the counter if the update worked
-                self._update_failure_counter = 0
+                self._schedule_next_poll(data)
 
                 return data
         except AuthenticationException as err:
+            self.last_update_duration = time.monotonic() - update_start
+            self.metrics.record_cycle(self.last_update_duration, success=False)
+            self.breaker.record_failure(ERROR_AUTH)
             # Raising ConfigEntryAuthFailed will cancel future updates
             # and start a config flow with SOURCE_REAUTH (async_step_reauth)
             raise ConfigEntryAuthFailed from err
         except Exception as err:
-            _LOGGER.error(f"Error communicating with API: {err}")
-            _LOGGER.exception(err)
+            # also record the timing of failed or timed out updates
+            self.last_update_duration = time.monotonic() - update_start
+            self.metrics.record_cycle(
+                self.last_update_duration,
+                success=False,
+                timeout=isinstance(err, asyncio.TimeoutError),
+            )
+
+            # Note: The client logs in again by itself if the session expired
+            error_kind = classify_error(err)
+            self.breaker.record_failure(error_kind, get_retry_after(err))
+
+            if error_kind == ERROR_PARSE:
+                _LOGGER.exception(err)
+
+            self._schedule_next_poll(None)
+            self._apply_backoff()
+
+            raise UpdateFailed(f"Error communicating with API ({error_kind}): {err}") from err
+        except asyncio.CancelledError:
+            # a cancelled probe has no result, the next update probes again
+            self.breaker.release_probe()
+            raise
+        finally:
+            self._log_update_timing()
+
+
+class FusionSolarPlantCoordinator(FusionSolarBaseCoordinator):
+    """Polls a single plant. Used with sharded polling.
+
+    Every plant coordinator has its own timeout, backoff and availability. The
+    client is shared with the account's coordinator. The data has the same
+    structure as the account coordinator's data but only contains one plant.
+    """
+
+    def __init__(self, hass, account_coordinator: FusionSolarCoordinator, plant_id: str):
+        """Initialize the plant coordinator.
+
+        :param account_coordinator: The coordinator of the plant's account
+        :type account_coordinator: FusionSolarCoordinator
+        :param plant_id: The plant's id
+        :type plant_id: str
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"FusionSolarAPI {plant_id}",
+            update_interval=max(
+                account_coordinator.update_interval,
+                account_coordinator.get_source_interval(SOURCE_PLANTS),
+            ),
+        )
+        self.config_entry = account_coordinator.config_entry
+        self.plant_id = plant_id
+        self._account_coordinator = account_coordinator
+        self.loop_monitor = account_coordinator.loop_monitor
+        self.counter_validator = account_coordinator.counter_validator
+        self.max_plant_staleness = account_coordinator.max_plant_staleness
+        self._timeout = self.config_entry.options.get(
+            CONF_PLANT_TIMEOUT, DEFAULT_PLANT_TIMEOUT
+        )
+
+        # failing plants back off independently. The first backoff skips one update.
+        self.breaker = CircuitBreaker(self.name, 2 * DEFAULT_UPDATE_INTERVAL, MAX_BACKOFF)
+
+    @callback
+    def async_add_tier_reader(self, source: str, tier: str) -> Callable[[], None]:
+        """The tiers of the plant's entities are tracked by the account's coordinator"""
+        return self._account_coordinator.async_add_tier_reader(source, tier)
+
+    def _get_plant_interval(self) -> timedelta:
+        """The plant is polled at the interval of the plant data's tier, but
+        not more often than the account's coordinator.
+        """
+        return max(
+            self._account_coordinator.update_interval,
+            self._account_coordinator.get_source_interval(SOURCE_PLANTS),
+        )
+
+    def _get_stale_data(self) -> dict | None:
+        """The last good values of the plant, tagged as stale, if they did not expire yet"""
+        if not (stale_since := self._get_stale_since(self.plant_id)):
+            return None
+
+        return {
+            "plants": {self.plant_id: self.data[SOURCE_PLANTS][self.plant_id]},
+            "stale_plants": {self.plant_id: stale_since},
+        }
+
+    async def _async_update_data(self):
+        """Fetch the latest data of the plant"""
+        # no requests are sent while the account's circuit breaker is open
+        account_breaker = self._account_coordinator.breaker
+
+        if account_breaker.state == STATE_OPEN:
+            self.update_interval = max(
+                self._get_plant_interval(), account_breaker.retry_in
+            )
+
+            if stale_data := self._get_stale_data():
+                return stale_data
+
+            raise UpdateFailed(f"Account circuit breaker open. Next attempt in {account_breaker.retry_in}")
+
+        if not self.breaker.allow_request():
+            self.update_interval = max(self.update_interval, self.breaker.retry_in)
+
+            if stale_data := self._get_stale_data():
+                return stale_data
+
+            raise UpdateFailed(f"Circuit breaker open. Next attempt in {self.breaker.retry_in}")
+
+        update_start = time.monotonic()
+
+        try:
+            async with async_timeout.timeout(self._timeout):
+                plant_data = await self._account_coordinator.async_fetch_plant_data(
+                    self.plant_id
+                )
+        except asyncio.CancelledError:
+            # a cancelled probe has no result, the next update probes again
+            self.breaker.release_probe()
+            raise
+        except AuthenticationException as err:
+            self.metrics.record_cycle(time.monotonic() - update_start, success=False)
+            self.breaker.record_failure(ERROR_AUTH)
+            raise ConfigEntryAuthFailed from err
+        except Exception as err:
+            self.metrics.record_cycle(
+                time.monotonic() - update_start,
+                success=False,
+                timeout=isinstance(err, asyncio.TimeoutError),
+            )
+
+            # back off exponentially - the shared client is not reset
+            error_kind = classify_error(err)
+            backoff = self.breaker.record_failure(error_kind, get_retry_after(err))
+            self.update_interval = max(self._get_plant_interval(), backoff)
+            self.failed_plant_fetches += 1
+
+            if stale_data := self._get_stale_data():
+                _LOGGER.debug(f"Failed to fetch plant {self.plant_id}, keeping the last values: {err}")
+                return stale_data
+
+            raise UpdateFailed(f"Error communicating with API ({error_kind}): {err}") from err
 
-            self._update_failure_counter += 1
+        self.metrics.record_cycle(time.monotonic() - update_start, success=True)
+        self.breaker.record_success()
+        self.update_interval = self._get_plant_interval()
+        self.stale = False
+        self.plant_updated[self.plant_id] = dt_util.utcnow()
 
-            # reset the fusion solar client after 2 attempts
-            if self._update_failure_counter >= 2:
-                _LOGGER.info("Reached 2 failures. Resetting fusion_solar client")
-                await self.hass.async_add_executor_job(self._reset_client)
+        with self.loop_monitor.section("assemble data", self.name):
+            data = {"plants": {self.plant_id: plant_data}, "stale_plants": {}}
+            self.counter_validator.validate(data)
+            self._account_coordinator.snapshot_store.async_update(data)
 
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        return data
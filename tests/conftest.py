@@ -0,0 +1,35 @@
+"""Fixtures shared by the tests of the FusionSolar integration"""
+
+from collections.abc import Callable
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+
+class FakeClock:
+    """Monotonic clock that only moves when advanced"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(monkeypatch) -> Callable[[ModuleType], FakeClock]:
+    """Replace the clock of a module. The event loop keeps the real one.
+
+    Usage: clock = fake_clock(circuit_breaker)
+    """
+
+    def patch_clock(module: ModuleType) -> FakeClock:
+        clock = FakeClock()
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=clock.monotonic))
+
+        return clock
+
+    return patch_clock
@@ -0,0 +1,154 @@
+"""Tests of the asynchronous FusionSolar client"""
+
+import asyncio
+
+import pytest
+
+from custom_components.fusion_solar import response_cache
+from custom_components.fusion_solar.api import FusionSolarAsyncClient
+
+from .conftest import FakeClock
+
+
+class FakeApi:
+    """Answers the requests of a client. Every response holds the number of the request."""
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, dict | None]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def request(
+        self, method: str, path: str, params: dict | None = None, json_data: dict | None = None
+    ) -> dict:
+        self.requests.append((path, params))
+        await self.release.wait()
+
+        return {
+            "success": True,
+            "data": {
+                "currentPower": len(self.requests),
+                "dailyEnergy": 1,
+                "cumulativeEnergy": 2,
+                "list": [{"dn": "NE=100000"}],
+                "total": 1,
+            },
+        }
+
+
+@pytest.fixture
+def api() -> FakeApi:
+    return FakeApi()
+
+
+@pytest.fixture
+def client(api) -> FusionSolarAsyncClient:
+    """A client whose requests are answered by the fake API"""
+    client = FusionSolarAsyncClient(None, "user", "password", cache_size=0)
+    client._request = api.request
+
+    return client
+
+
+@pytest.fixture
+def cached_client(api) -> FusionSolarAsyncClient:
+    """A client with a response cache"""
+    client = FusionSolarAsyncClient(None, "user", "password")
+    client._request = api.request
+
+    return client
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch) -> FakeClock:
+    """Replace the cache's clock. The next data slot is always 5 minutes away."""
+    monkeypatch.setattr(response_cache, "seconds_until_next_slot", lambda: 300)
+
+    return fake_clock(response_cache)
+
+
+async def test_identical_requests_are_merged(client, api):
+    """Identical calls issued while the first one is in flight share its request"""
+    api.release.clear()
+
+    tasks = [asyncio.create_task(client.get_plant_stats("NE=100000")) for _ in range(3)]
+    other_plant = asyncio.create_task(client.get_plant_stats("NE=100001"))
+    await asyncio.sleep(0)
+    api.release.set()
+
+    results = await asyncio.gather(*tasks, other_plant)
+
+    assert len(api.requests) == 2
+    assert client.merged_requests == 2
+    assert results[0] is results[1] is results[2]
+    assert not client._in_flight
+
+
+async def test_finished_requests_are_not_merged(client, api):
+    """A call after the request finished sends a new request"""
+    await client.get_plant_stats("NE=100000")
+    await client.get_plant_stats("NE=100000")
+
+    assert len(api.requests) == 2
+    assert client.merged_requests == 0
+
+
+async def test_cancelled_caller_does_not_cancel_merged_request(client, api):
+    """The other callers still get the response if one of them is cancelled"""
+    api.release.clear()
+
+    first = asyncio.create_task(client.get_plant_stats("NE=100000"))
+    second = asyncio.create_task(client.get_plant_stats("NE=100000"))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    api.release.set()
+
+    assert (await second)["currentPower"] == 1
+    assert first.cancelled()
+
+
+async def test_responses_are_cached(cached_client, api, clock):
+    """Within the endpoint's ttl, the cached response is returned"""
+    first_status = await cached_client.get_power_status()
+    clock.advance(29)
+
+    assert await cached_client.get_power_status() == first_status
+    assert len(api.requests) == 1
+
+    clock.advance(11)
+
+    # the stale response is served while it is refreshed
+    assert await cached_client.get_power_status() == first_status
+
+    # let the refresh finish
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert (await cached_client.get_power_status()).current_power_kw == 2
+
+
+async def test_refresh_bypasses_cache(cached_client, api, clock):
+    """A refresh always sends a request and updates the cache"""
+    await cached_client.get_power_status()
+    status = await cached_client.get_power_status(refresh=True)
+
+    assert status.current_power_kw == 2
+    assert await cached_client.get_power_status() == status
+    assert len(api.requests) == 2
+
+
+async def test_cache_key_includes_arguments(cached_client, api, clock):
+    """The station list is cached once, the stats of every plant on their own"""
+    await cached_client.get_plant_ids()
+    await cached_client.get_plant_ids()
+    await cached_client.get_plant_stats("NE=100000")
+    await cached_client.get_plant_stats("NE=100001")
+    await cached_client.get_plant_stats("NE=100000")
+
+    assert len(api.requests) == 3
+
+    clock.advance(301)
+    await cached_client.get_plant_ids()
+
+    assert len(api.requests) == 4
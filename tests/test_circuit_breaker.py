@@ -0,0 +1,192 @@
+"""Tests of the circuit breaker"""
+
+import asyncio
+from datetime import timedelta
+import random
+
+import aiohttp
+from fusion_solar_py.exceptions import AuthenticationException
+import pytest
+
+from custom_components.fusion_solar import circuit_breaker
+from custom_components.fusion_solar.circuit_breaker import (
+    ERROR_AUTH,
+    ERROR_PARSE,
+    ERROR_RATE_LIMIT,
+    ERROR_TRANSIENT,
+    RATE_LIMIT_FACTOR,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    classify_error,
+    get_retry_after,
+)
+
+from .conftest import FakeClock
+
+BASE_DELAY = 60
+MAX_DELAY = 3600
+
+
+@pytest.fixture
+def clock(fake_clock) -> FakeClock:
+    """Replace the breaker's clock"""
+    return fake_clock(circuit_breaker)
+
+
+@pytest.fixture
+def breaker(clock) -> CircuitBreaker:
+    """A closed breaker with a seeded jitter"""
+    return CircuitBreaker(
+        "test",
+        timedelta(seconds=BASE_DELAY),
+        timedelta(seconds=MAX_DELAY),
+        rng=random.Random(0),
+    )
+
+
+def _open_and_expire(breaker: CircuitBreaker, clock: FakeClock) -> None:
+    """Record a failure and wait until the backoff expired"""
+    backoff = breaker.record_failure(ERROR_TRANSIENT)
+    clock.advance(backoff.total_seconds())
+
+
+def _client_response_error(status: int, headers: dict | None = None) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status, headers=headers)
+
+
+def test_closed_breaker_allows_requests(breaker):
+    """A closed breaker lets every request through"""
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert breaker.retry_in == timedelta(0)
+
+
+def test_failure_opens_breaker(breaker, clock):
+    """A failure opens the breaker until the backoff expired"""
+    backoff = breaker.record_failure(ERROR_TRANSIENT)
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.failures == 1
+    assert breaker.trips == 1
+    assert BASE_DELAY / 2 <= backoff.total_seconds() <= BASE_DELAY
+    assert breaker.retry_in == backoff
+    assert not breaker.allow_request()
+
+    clock.advance(backoff.total_seconds() - 1)
+
+    assert not breaker.allow_request()
+    assert breaker.state == STATE_OPEN
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    """Once the backoff expired, only a single probe is let through"""
+    _open_and_expire(breaker, clock)
+
+    assert breaker.allow_request()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow_request()
+
+
+def test_successful_probe_closes_breaker(breaker, clock):
+    """A successful probe closes the breaker and resets the failures"""
+    _open_and_expire(breaker, clock)
+    breaker.allow_request()
+
+    breaker.record_success()
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_failed_probe_backs_off_longer(breaker, clock):
+    """A failed probe opens the breaker again with a longer backoff"""
+    _open_and_expire(breaker, clock)
+    breaker.allow_request()
+
+    backoff = breaker.record_failure(ERROR_TRANSIENT)
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.failures == 2
+    # the breaker opened again from half-open
+    assert breaker.trips == 2
+    assert BASE_DELAY <= backoff.total_seconds() <= 2 * BASE_DELAY
+    assert not breaker.allow_request()
+
+
+def test_backoff_is_capped(breaker):
+    """The backoff does not grow beyond the maximum delay"""
+    for _ in range(20):
+        backoff = breaker.record_failure(ERROR_TRANSIENT)
+
+    assert MAX_DELAY / 2 <= backoff.total_seconds() <= MAX_DELAY
+
+
+def test_rate_limit_backs_off_longer(breaker):
+    """Rate limits start with a longer backoff"""
+    backoff = breaker.record_failure(ERROR_RATE_LIMIT)
+
+    assert backoff.total_seconds() >= BASE_DELAY * RATE_LIMIT_FACTOR / 2
+
+
+def test_retry_after_is_respected(breaker):
+    """The breaker waits at least as long as the server requested"""
+    backoff = breaker.record_failure(ERROR_RATE_LIMIT, retry_after=MAX_DELAY * 2)
+
+    assert backoff.total_seconds() == MAX_DELAY * 2
+
+
+def test_released_probe_allows_new_probe(breaker, clock):
+    """A probe without a result, e.g. a cancelled one, does not block the breaker"""
+    _open_and_expire(breaker, clock)
+    breaker.allow_request()
+
+    breaker.release_probe()
+
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_as_dict(breaker):
+    """The state is reported for the diagnostics"""
+    breaker.record_failure(ERROR_PARSE)
+
+    assert breaker.as_dict() == {
+        "state": STATE_OPEN,
+        "failures": 1,
+        "trips": 1,
+        "last_error_kind": ERROR_PARSE,
+        "retry_in_seconds": breaker.retry_in.total_seconds(),
+    }
+
+
+@pytest.mark.parametrize(
+    ("error", "error_kind"),
+    [
+        (AuthenticationException("invalid credentials"), ERROR_AUTH),
+        (_client_response_error(401), ERROR_AUTH),
+        (_client_response_error(403), ERROR_AUTH),
+        (_client_response_error(429), ERROR_RATE_LIMIT),
+        (_client_response_error(500), ERROR_TRANSIENT),
+        (KeyError("data"), ERROR_PARSE),
+        (ValueError("invalid value"), ERROR_PARSE),
+        (asyncio.TimeoutError(), ERROR_TRANSIENT),
+        (aiohttp.ClientConnectionError(), ERROR_TRANSIENT),
+    ],
+)
+def test_classify_error(error, error_kind):
+    """The errors are sorted into their kinds"""
+    assert classify_error(error) == error_kind
+
+
+def test_get_retry_after():
+    """The Retry-After header is read from rate limited responses"""
+    assert get_retry_after(_client_response_error(429, {"Retry-After": "120"})) == 120
+    assert get_retry_after(_client_response_error(429, {"Retry-After": "soon"})) is None
+    assert get_retry_after(_client_response_error(429)) is None
+    assert get_retry_after(asyncio.TimeoutError()) is None
@@ -0,0 +1,50 @@
+"""Tests of the registry sharing the clients of an account"""
+
+from custom_components.fusion_solar.client_registry import FusionSolarClientRegistry
+from custom_components.fusion_solar.rate_limiter import RateLimiter
+
+
+class FakeClient:
+    """A client of the account user@region01eu5"""
+
+    def __init__(self) -> None:
+        self._huawei_subdomain = "region01eu5"
+        self._user = "user"
+        self.rate_limiter = RateLimiter(1, 10)
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+async def _acquire(registry: FusionSolarClientRegistry) -> FakeClient:
+    async def async_create_client() -> FakeClient:
+        return FakeClient()
+
+    return await registry.async_acquire("region01eu5", "user", async_create_client)
+
+
+async def test_limits_follow_the_remaining_entries(hass):
+    """The strictest limit applies while its entry holds the client"""
+    registry = FusionSolarClientRegistry(hass)
+
+    client = await _acquire(registry)
+    registry.async_set_limits(client, "relaxed", 2, 10)
+    assert await _acquire(registry) is client
+    registry.async_set_limits(client, "strict", 0.5, 2)
+
+    assert (client.rate_limiter.rate, client.rate_limiter.burst) == (0.5, 2)
+
+    registry.async_release(client, entry_id="strict")
+
+    assert (client.rate_limiter.rate, client.rate_limiter.burst) == (2, 10)
+
+    # changed options of the remaining entry apply as well
+    registry.async_set_limits(client, "relaxed", 4, 5)
+
+    assert (client.rate_limiter.rate, client.rate_limiter.burst) == (4, 5)
+
+    registry.async_release(client, entry_id="relaxed")
+    await hass.async_block_till_done()
+
+    assert client.closed
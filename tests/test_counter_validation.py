@@ -0,0 +1,141 @@
+"""Tests of the validation of the daily counters"""
+
+from custom_components.fusion_solar.counter_validation import (
+    CONFIRM_READINGS,
+    MIN_RESET_THRESHOLD,
+    CounterState,
+    CounterValidator,
+)
+
+PLANT_ID = "NE=100000"
+PLANT_PATH = ("plants", PLANT_ID, "totalUsePower")
+TOTAL_PATH = ("total", "power_today_kwh")
+
+
+def test_increasing_readings_are_accepted():
+    """Rising counters are passed through"""
+    state = CounterState()
+
+    assert state.validate(1.0) == (1.0, None)
+    assert state.validate(2.5) == (2.5, None)
+    assert state.validate(2.5) == (2.5, None)
+
+
+def test_small_decrease_is_glitch():
+    """A slightly lower reading is replaced by the last accepted value"""
+    state = CounterState()
+    state.validate(20.0)
+
+    assert state.validate(19.5) == (20.0, "glitch")
+    assert state.value == 20.0
+
+    # the next rising reading is accepted again
+    assert state.validate(21.0) == (21.0, None)
+
+
+def test_repeated_decrease_is_correction():
+    """A decrease reported CONFIRM_READINGS times in a row is accepted"""
+    state = CounterState()
+    state.validate(20.0)
+
+    for _ in range(CONFIRM_READINGS - 1):
+        assert state.validate(19.5) == (20.0, "glitch")
+
+    assert state.validate(19.5) == (19.5, "correction")
+    assert state.validate(19.6) == (19.6, None)
+
+
+def test_drop_close_to_zero_is_reset():
+    """A drop to close to zero is the daily reset"""
+    state = CounterState()
+    state.validate(20.0)
+
+    value, rule = state.validate(0.2)
+
+    assert (value, rule) == (0.2, "reset")
+    assert state.last_reset is not None
+
+
+def test_reset_threshold_scales_with_plant():
+    """Large plants reset to values that would be glitches of small plants"""
+    large_plant = CounterState()
+    large_plant.validate(500.0)
+
+    assert large_plant.validate(40.0) == (40.0, "reset")
+
+    small_plant = CounterState()
+    small_plant.validate(MIN_RESET_THRESHOLD * 2)
+
+    assert small_plant.validate(MIN_RESET_THRESHOLD * 1.5)[1] == "glitch"
+    assert small_plant.validate(MIN_RESET_THRESHOLD / 2)[1] == "reset"
+
+
+def test_validator_replaces_glitches_in_data():
+    """Glitches are replaced within the coordinator's data"""
+    validator = CounterValidator()
+    validator.async_add_counter(PLANT_PATH)
+    validator.async_add_counter(TOTAL_PATH)
+
+    validator.validate(
+        {
+            "total": {"power_today_kwh": 10.0},
+            "plants": {PLANT_ID: {"totalUsePower": 20.0}},
+        }
+    )
+
+    data = {
+        "total": {"power_today_kwh": 9.8},
+        "plants": {PLANT_ID: {"totalUsePower": 0.1}},
+    }
+    validator.validate(data)
+
+    assert data["total"]["power_today_kwh"] == 10.0
+    assert data["plants"][PLANT_ID]["totalUsePower"] == 0.1
+    assert validator.glitches == 1
+    assert validator.resets == 1
+    assert validator.get_last_reset(PLANT_PATH) is not None
+    assert validator.get_last_reset(TOTAL_PATH) is None
+
+
+def test_validator_skips_unchanged_sections():
+    """Data that was not fetched again is not validated again"""
+    validator = CounterValidator()
+    validator.async_add_counter(PLANT_PATH)
+
+    plant_data = {"totalUsePower": 20.0}
+    validator.validate({"plants": {PLANT_ID: plant_data}})
+
+    # a kept section is the same object - its value does not count as a new reading
+    for _ in range(CONFIRM_READINGS):
+        plant_data["totalUsePower"] = 19.0
+        validator.validate({"plants": {PLANT_ID: plant_data}})
+
+    assert validator.glitches == 0
+    assert validator.corrections == 0
+
+
+def test_validator_ignores_missing_values():
+    """Missing or invalid values are left as they are"""
+    validator = CounterValidator()
+    validator.async_add_counter(PLANT_PATH)
+
+    data = {"plants": {PLANT_ID: {"totalUsePower": None}}}
+    validator.validate(data)
+
+    assert data["plants"][PLANT_ID]["totalUsePower"] is None
+    assert validator.as_dict() == {"counters": 1, "resets": 0, "glitches": 0, "corrections": 0}
+
+
+def test_removed_counter_is_no_longer_validated():
+    """A counter is dropped once its last reader was removed"""
+    validator = CounterValidator()
+    remove_first = validator.async_add_counter(PLANT_PATH)
+    remove_second = validator.async_add_counter(PLANT_PATH)
+
+    remove_first()
+
+    assert validator.as_dict()["counters"] == 1
+
+    remove_second()
+
+    assert validator.as_dict()["counters"] == 0
@@ -0,0 +1,66 @@
+"""Tests of the metrics derived from the day series"""
+
+import pytest
+
+from custom_components.fusion_solar.derived import DERIVED_METRICS, compute_derived_metrics
+
+
+def test_metrics_of_a_plant():
+    """The metrics of a plant whose series are complete"""
+    metrics = compute_derived_metrics(
+        {
+            "NE=1": {
+                "productPower": [2.0, 4.0, 6.0],
+                "usePower": [4.0, 4.0, 4.0],
+                "selfUsePower": [2.0, 3.0, 4.0],
+                "onGridPower": [0.0, 1.0, 2.0],
+            }
+        }
+    )["NE=1"]
+
+    assert metrics["peak_power_kw"] == 6.0
+    assert metrics["integrated_energy_kwh"] == pytest.approx(12.0 * 5 / 60)
+    assert metrics["self_consumption_ratio"] == pytest.approx(9 / 12 * 100)
+    assert metrics["autarky_ratio"] == pytest.approx(9 / 12 * 100)
+    assert metrics["export_ratio"] == pytest.approx(3 / 12 * 100)
+
+
+def test_missing_values_are_skipped():
+    """Missing values are skipped and the ratios only compare slots with both values"""
+    metrics = compute_derived_metrics(
+        {
+            "NE=1": {
+                "productPower": ["--", 4.0, 6.0, "invalid"],
+                "usePower": [1.0, 4.0],
+                "selfUsePower": [1.0, 2.0, "--"],
+            }
+        }
+    )["NE=1"]
+
+    assert metrics["peak_power_kw"] == 6.0
+    assert metrics["integrated_energy_kwh"] == pytest.approx(10.0 * 5 / 60)
+    # slot 2 only: the first slot has no production, the third no self use
+    assert metrics["self_consumption_ratio"] == pytest.approx(50.0)
+    assert metrics["autarky_ratio"] == pytest.approx(3 / 5 * 100)
+    # the plant has no grid series
+    assert metrics["export_ratio"] is None
+
+
+def test_plants_are_computed_independently():
+    """Plants with series of different lengths and plants without production"""
+    metrics = compute_derived_metrics(
+        {
+            "NE=1": {"productPower": [1.0]},
+            "NE=2": {"productPower": [1.0, 2.0, 3.0], "usePower": "--"},
+            "NE=3": {"productPower": ["--", "--"], "usePower": [1.0, 1.0]},
+        }
+    )
+
+    assert metrics["NE=1"]["peak_power_kw"] == 1.0
+    assert metrics["NE=2"]["peak_power_kw"] == 3.0
+    assert metrics["NE=2"]["autarky_ratio"] is None
+    assert metrics["NE=3"] == {metric: None for metric in DERIVED_METRICS}
+
+
+def test_no_plants():
+    assert compute_derived_metrics({}) == {}
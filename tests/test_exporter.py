@@ -0,0 +1,104 @@
+"""Tests of the export to a time-series database"""
+
+import pytest
+
+from custom_components.fusion_solar import exporter
+from custom_components.fusion_solar.exporter import FusionSolarExporter
+
+ENTRY_ID = "entry"
+
+
+class FakeSink:
+    """Collects the written batches, or fails if asked to"""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.failing = False
+
+    async def async_write(self, lines: list[str]) -> None:
+        if self.failing:
+            raise ConnectionError("the database is offline")
+
+        self.batches.append(lines)
+
+
+def _plant_data(value: float) -> dict:
+    """Values of a plant as stored in the coordinator's data"""
+    return {
+        "productPower": {"time": "2024-03-01 10:05", "value": value},
+        "totalUsePower": value,
+    }
+
+
+@pytest.fixture
+def sink() -> FakeSink:
+    return FakeSink()
+
+
+@pytest.fixture
+async def export(hass, sink, monkeypatch) -> FusionSolarExporter:
+    """An exporter that retries failed writes without waiting"""
+    monkeypatch.setattr(exporter, "RETRY_DELAY", 0)
+
+    export = FusionSolarExporter(hass, ENTRY_ID, sink)
+    await export.async_load()
+
+    return export
+
+
+async def test_points_are_written_in_batches(export, sink, monkeypatch):
+    """The queued points are split into batches of the maximum size"""
+    monkeypatch.setattr(exporter, "MAX_BATCH_SIZE", 2)
+
+    export._queue_points({"plants": {f"NE={index}": _plant_data(index) for index in range(5)}})
+    await export.async_flush()
+
+    assert [len(batch) for batch in sink.batches] == [2, 2, 1]
+    assert export.exported_points == 5
+    assert export.as_dict()["queued_points"] == 0
+
+
+async def test_unchanged_plants_are_not_exported_again(export, sink):
+    """Only plants whose data was fetched again are exported"""
+    plants = {"NE=1": _plant_data(1), "NE=2": _plant_data(2)}
+
+    export._queue_points({"plants": plants})
+    export._queue_points({"plants": {**plants, "NE=2": _plant_data(3)}})
+    await export.async_flush()
+
+    lines = [line for batch in sink.batches for line in batch]
+
+    assert len(lines) == 3
+    assert "productPower=3.0" in lines[-1]
+
+
+async def test_failed_points_are_spooled(hass, export, sink):
+    """Points that cannot be written stay queued and are loaded again after a restart"""
+    sink.failing = True
+
+    export._queue_points({"plants": {"NE=1": _plant_data(1)}})
+    await export.async_flush()
+
+    assert export.failed_writes == exporter.MAX_ATTEMPTS
+    assert export.as_dict()["queued_points"] == 1
+
+    await export.async_stop()
+
+    sink.failing = False
+    restarted = FusionSolarExporter(hass, ENTRY_ID, sink)
+    await restarted.async_load()
+    await restarted.async_flush()
+
+    assert len(sink.batches) == 1
+    assert sink.batches[0][0].startswith("fusion_solar_plant,plant=NE\\=1 ")
+
+
+async def test_full_queue_drops_oldest_points(export, monkeypatch):
+    """The oldest points are dropped once the queue is full"""
+    monkeypatch.setattr(exporter, "MAX_QUEUE_SIZE", 2)
+
+    for index in range(3):
+        export._queue_points({"plants": {f"NE={index}": _plant_data(index)}})
+
+    assert export.dropped_points == 1
+    assert list(export._queue)[0].startswith("fusion_solar_plant,plant=NE\\=1 ")
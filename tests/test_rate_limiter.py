@@ -0,0 +1,161 @@
+"""Tests of the rate limiter"""
+
+import asyncio
+import time
+
+from custom_components.fusion_solar.rate_limiter import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    RateLimiter,
+    get_strictest_limits,
+    request_priority,
+)
+
+# fast enough to keep the tests short (in requests per second)
+RATE = 20
+
+
+async def _acquire(limiter: RateLimiter, priority: int, released: list) -> None:
+    """Acquire a token with the given priority and note the release"""
+    with request_priority(priority):
+        await limiter.acquire()
+
+    released.append(priority)
+
+
+async def test_burst_is_sent_at_once():
+    """Up to burst requests are not delayed"""
+    limiter = RateLimiter(RATE, burst=3)
+    start = time.monotonic()
+
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert time.monotonic() - start < 1 / RATE
+    assert limiter.delayed_requests == 0
+
+
+async def test_requests_beyond_burst_are_delayed():
+    """Once the bucket is empty, the requests wait for the refill"""
+    limiter = RateLimiter(RATE, burst=2)
+
+    await limiter.acquire()
+    await limiter.acquire()
+
+    start = time.monotonic()
+    await limiter.acquire()
+
+    assert time.monotonic() - start >= 0.8 / RATE
+    assert limiter.delayed_requests == 1
+
+
+async def test_refill_is_capped_at_burst():
+    """An idle bucket does not hold more than burst tokens"""
+    limiter = RateLimiter(RATE, burst=2)
+
+    await limiter.acquire()
+    await limiter.acquire()
+
+    # enough time for many more tokens than the burst
+    await asyncio.sleep(10 / RATE)
+
+    for _ in range(3):
+        await limiter.acquire()
+
+    assert limiter.delayed_requests == 1
+
+
+async def test_waiting_requests_are_released_by_priority():
+    """Waiting requests are released by priority, then in the order they arrived"""
+    limiter = RateLimiter(RATE, burst=1)
+    released = []
+
+    await limiter.acquire()
+
+    tasks = [
+        asyncio.create_task(_acquire(limiter, priority, released))
+        for priority in (PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_LOW, PRIORITY_HIGH)
+    ]
+    await asyncio.sleep(0)
+
+    assert limiter.waiting == 4
+
+    await asyncio.gather(*tasks)
+
+    assert released == [PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, PRIORITY_LOW]
+    assert limiter.waiting == 0
+
+
+async def test_cancelled_waiter_is_skipped():
+    """A cancelled request does not use a token"""
+    limiter = RateLimiter(RATE, burst=1)
+    released = []
+
+    await limiter.acquire()
+
+    cancelled = asyncio.create_task(_acquire(limiter, PRIORITY_HIGH, released))
+    waiting = asyncio.create_task(_acquire(limiter, PRIORITY_LOW, released))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    start = time.monotonic()
+    await waiting
+
+    assert released == [PRIORITY_LOW]
+    # the remaining request got the next token
+    assert time.monotonic() - start < 2 / RATE
+
+
+async def test_zero_rate_disables_limit():
+    """Without a rate, no request waits"""
+    limiter = RateLimiter(0, burst=1)
+
+    for _ in range(10):
+        await limiter.acquire()
+
+    assert limiter.delayed_requests == 0
+
+
+def test_strictest_limits_apply():
+    """Shared clients use the strictest limits of their entries. 0 does not limit the rate."""
+    assert get_strictest_limits([(RATE, 5), (RATE * 2, 2)]) == (RATE, 2)
+    assert get_strictest_limits([(0, 5), (RATE, 10)]) == (RATE, 5)
+    assert get_strictest_limits([(0, 5)]) == (0, 5)
+
+
+async def test_limits_can_be_relaxed():
+    """Waiting requests are released at the new rate"""
+    limiter = RateLimiter(RATE / 100, burst=1)
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(1 / RATE)
+    assert not waiting.done()
+
+    limiter.set_limits(RATE, 5)
+    await asyncio.wait_for(waiting, 2 / RATE)
+
+    assert limiter.burst == 5
+
+
+async def test_removed_rate_releases_waiters():
+    """Without a rate, the waiting requests are sent right away"""
+    limiter = RateLimiter(RATE / 100, burst=1)
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    limiter.set_limits(0, 1)
+    await asyncio.wait_for(waiting, 1 / RATE)
+
+
+async def test_delays_are_recorded_by_priority():
+    """The queueing delays are reported per priority"""
+    limiter = RateLimiter(RATE, burst=1)
+
+    await limiter.acquire()
+
+    assert list(limiter.as_dict()["delays"]) == ["normal"]
+    assert limiter.mean_delay == 0
@@ -0,0 +1,173 @@
+"""Tests of the response cache"""
+
+import asyncio
+
+import pytest
+
+from custom_components.fusion_solar import response_cache
+from custom_components.fusion_solar.response_cache import (
+    CachePolicy,
+    ResponseCache,
+    seconds_until_next_slot,
+)
+
+from .conftest import FakeClock
+
+KEY = ("get_power_status",)
+POLICY = CachePolicy(ttl=30)
+STALE_POLICY = CachePolicy(ttl=30, stale_ttl=30)
+
+
+class FakeEndpoint:
+    """Returns the number of the request, or fails if asked to"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.error: Exception | None = None
+
+    async def fetch(self) -> int:
+        self.requests += 1
+
+        if self.error:
+            raise self.error
+
+        return self.requests
+
+
+@pytest.fixture
+def clock(fake_clock) -> FakeClock:
+    """Replace the cache's clock"""
+    return fake_clock(response_cache)
+
+
+@pytest.fixture
+def endpoint() -> FakeEndpoint:
+    return FakeEndpoint()
+
+
+async def _wait_for_refreshes() -> None:
+    """Let the background refreshes finish"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_fresh_response_is_served_from_cache(clock, endpoint):
+    """Within the ttl, no request is sent"""
+    cache = ResponseCache()
+
+    assert await cache.async_get(KEY, POLICY, endpoint.fetch) == 1
+
+    clock.advance(29)
+
+    assert await cache.async_get(KEY, POLICY, endpoint.fetch) == 1
+    assert endpoint.requests == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+async def test_expired_response_is_fetched_again(clock, endpoint):
+    """After the ttl, the request is sent and awaited again"""
+    cache = ResponseCache()
+    await cache.async_get(KEY, POLICY, endpoint.fetch)
+
+    clock.advance(30)
+
+    assert await cache.async_get(KEY, POLICY, endpoint.fetch) == 2
+    assert endpoint.requests == 2
+    assert cache.misses == 2
+
+
+async def test_refresh_bypasses_cache(clock, endpoint):
+    """A forced refresh sends the request and caches its response"""
+    cache = ResponseCache()
+    await cache.async_get(KEY, POLICY, endpoint.fetch)
+
+    assert await cache.async_get(KEY, POLICY, endpoint.fetch, refresh=True) == 2
+    assert await cache.async_get(KEY, POLICY, endpoint.fetch) == 2
+    assert endpoint.requests == 2
+
+
+async def test_stale_response_is_served_while_revalidating(clock, endpoint):
+    """A stale response is returned right away and refreshed once in the background"""
+    cache = ResponseCache()
+    await cache.async_get(KEY, STALE_POLICY, endpoint.fetch)
+
+    clock.advance(45)
+
+    assert await cache.async_get(KEY, STALE_POLICY, endpoint.fetch) == 1
+    assert await cache.async_get(KEY, STALE_POLICY, endpoint.fetch) == 1
+    assert cache.stale_hits == 2
+
+    await _wait_for_refreshes()
+
+    # a single refresh was sent and its response is fresh
+    assert endpoint.requests == 2
+    assert await cache.async_get(KEY, STALE_POLICY, endpoint.fetch) == 2
+    assert cache.hits == 1
+
+
+async def test_failed_refresh_keeps_stale_response(clock, endpoint):
+    """A failing refresh does not drop the stale response"""
+    cache = ResponseCache()
+    await cache.async_get(KEY, STALE_POLICY, endpoint.fetch)
+
+    clock.advance(45)
+    endpoint.error = ConnectionError("offline")
+
+    assert await cache.async_get(KEY, STALE_POLICY, endpoint.fetch) == 1
+
+    await _wait_for_refreshes()
+
+    assert cache.refresh_errors == 1
+    assert await cache.async_get(KEY, STALE_POLICY, endpoint.fetch) == 1
+
+
+async def test_response_expires_after_stale_period(clock, endpoint):
+    """After the stale period, the request is awaited again"""
+    cache = ResponseCache()
+    await cache.async_get(KEY, STALE_POLICY, endpoint.fetch)
+
+    clock.advance(60)
+
+    assert await cache.async_get(KEY, STALE_POLICY, endpoint.fetch) == 2
+    assert cache.stale_hits == 0
+
+
+async def test_least_recently_used_response_is_evicted(clock, endpoint):
+    """The cache keeps at most max_size responses"""
+    cache = ResponseCache(max_size=2)
+
+    await cache.async_get(("a",), POLICY, endpoint.fetch)
+    await cache.async_get(("b",), POLICY, endpoint.fetch)
+    # "a" is used again, so "b" is evicted
+    await cache.async_get(("a",), POLICY, endpoint.fetch)
+    await cache.async_get(("c",), POLICY, endpoint.fetch)
+
+    assert cache.evictions == 1
+    assert await cache.async_get(("a",), POLICY, endpoint.fetch) == 1
+    assert await cache.async_get(("b",), POLICY, endpoint.fetch) == 4
+
+
+async def test_disabled_cache(clock, endpoint):
+    """A cache without space sends every request"""
+    cache = ResponseCache(max_size=0)
+
+    await cache.async_get(KEY, POLICY, endpoint.fetch)
+    await cache.async_get(KEY, POLICY, endpoint.fetch)
+
+    assert endpoint.requests == 2
+
+
+def test_slot_aligned_ttl(monkeypatch):
+    """Slot aligned responses expire with the publication of the next slot"""
+    monkeypatch.setattr(response_cache, "seconds_until_next_slot", lambda: 10.0)
+
+    assert CachePolicy(ttl=300, slot_aligned=True).get_ttl() == 10.0
+    assert CachePolicy(ttl=5, slot_aligned=True).get_ttl() == 5
+    assert CachePolicy(ttl=300).get_ttl() == 300
+
+
+def test_seconds_until_next_slot():
+    """The next publication is at most one slot away"""
+    assert 0 < seconds_until_next_slot(1_700_000_000.0) <= 300
+    assert seconds_until_next_slot(1_700_000_000.0) - seconds_until_next_slot(1_700_000_060.0) == 60
@@ -0,0 +1,65 @@
+"""Tests of the aggregation of the plant series into hourly statistics"""
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.fusion_solar.statistics_import import (
+    MISSING_HOUR_TIMEOUT,
+    aggregate_hours,
+)
+
+DAY = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def _plant_stats(hour_values: dict[int, object]) -> dict:
+    """Stats with 12 slots of the same power value in every given hour"""
+    times = []
+    values = []
+
+    for hour, value in hour_values.items():
+        for minute in range(0, 60, 5):
+            times.append(f"2024-03-01 {hour:02d}:{minute:02d}")
+            values.append(value)
+
+    return {"xAxis": times, "productPower": values}
+
+
+def _aggregate(plant_stats: dict, now: datetime, watermark: datetime | None = None):
+    return aggregate_hours(plant_stats, watermark, now, timezone.utc)
+
+
+def test_complete_hours_are_integrated():
+    """Every complete hour becomes its energy. The current hour is left out."""
+    energies, watermark = _aggregate(_plant_stats({8: 1.2, 9: 2.4, 10: 3.0}), DAY.replace(hour=10, minute=30))
+
+    assert [(start.hour, round(energy, 6)) for start, energy in energies["productPower"]] == [
+        (8, 1.2),
+        (9, 2.4),
+    ]
+    assert watermark == DAY.replace(hour=9)
+
+
+def test_watermark_skips_imported_hours():
+    """Hours up to the watermark are not imported again"""
+    energies, watermark = _aggregate(
+        _plant_stats({8: 1.0, 9: 1.0}), DAY.replace(hour=11), watermark=DAY.replace(hour=8)
+    )
+
+    assert [start.hour for start, _ in energies["productPower"]] == [9]
+    assert watermark == DAY.replace(hour=9)
+
+
+def test_missing_hour_holds_watermark():
+    """An hour without values may still be published, so the import stops before it"""
+    energies, watermark = _aggregate(_plant_stats({8: 1.0, 9: "--", 10: 1.0}), DAY.replace(hour=11, minute=30))
+
+    assert [start.hour for start, _ in energies["productPower"]] == [8]
+    assert watermark == DAY.replace(hour=8)
+
+
+def test_old_missing_hour_is_skipped():
+    """Once the missing hour timed out, the later hours are imported"""
+    now = DAY.replace(hour=10) + MISSING_HOUR_TIMEOUT + timedelta(minutes=1)
+    energies, watermark = _aggregate(_plant_stats({8: 1.0, 9: "--", 10: 1.0}), now)
+
+    assert [start.hour for start, _ in energies["productPower"]] == [8, 10]
+    assert watermark == DAY.replace(hour=10)
@@ -0,0 +1,52 @@
+"""Tests of the recording of the API traffic"""
+
+import gzip
+import json
+
+from custom_components.fusion_solar import traffic
+from custom_components.fusion_solar.traffic import TrafficRecorder, read_recording
+
+URL = "https://eu5.fusionsolar.huawei.com"
+
+
+async def test_bodies_are_stored_once(tmp_path):
+    """Repeated response bodies are only written once and login responses are redacted"""
+    recorder = TrafficRecorder(tmp_path / "traffic.jsonl.gz")
+
+    for _ in range(3):
+        recorder.record("GET", f"{URL}/rest/plants", {"_": 1}, None, 0.1, response="plants")
+    recorder.record(
+        "POST", f"{URL}/unisso/login", None, {"password": "secret"}, 0.1,
+        response=json.dumps({"ticket": "secret"}),
+    )
+    recorder.record("GET", f"{URL}/rest/plants", None, None, 0.1, error=503)
+    await recorder.async_flush()
+
+    recording = read_recording(recorder.path)
+
+    assert len(recording.entries) == 5
+    assert len(recording.bodies) == 2
+    assert recording.bodies[recording.entries[0]["b"]] == "plants"
+    assert "secret" not in recording.bodies[recording.entries[3]["b"]]
+    assert recording.entries[3]["j"]["password"] == traffic.REDACTED
+    assert recording.entries[4]["e"] == 503
+
+
+async def test_body_ids_are_capped(tmp_path, monkeypatch):
+    """Only the most recent body ids are kept. Older bodies are written again."""
+    monkeypatch.setattr(traffic, "MAX_BODY_IDS", 2)
+    recorder = TrafficRecorder(tmp_path / "traffic.jsonl.gz")
+
+    for body in ("a", "b", "c", "a"):
+        recorder.record("GET", f"{URL}/rest/plants", None, None, 0.1, response=body)
+    await recorder.async_flush()
+
+    recording = read_recording(recorder.path)
+
+    with gzip.open(recorder.path, "rt") as reader:
+        body_lines = [line for line in reader if '"body"' in line]
+
+    # "a" was evicted by "c", so it is written again
+    assert len(body_lines) == 4
+    assert len(recorder._body_ids) == 2
+    assert [recording.bodies[entry["b"]] for entry in recording.entries] == ["a", "b", "c", "a"]
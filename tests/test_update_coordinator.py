@@ -0,0 +1,177 @@
+"""Tests of the account's update coordinator"""
+
+import asyncio
+
+from fusion_solar_py.client import PowerStatus
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.fusion_solar.const import DOMAIN, TIER_FAST, TIER_SLOW
+from custom_components.fusion_solar.snapshot_store import FusionSolarSnapshotStore
+from custom_components.fusion_solar.update_coordinator import (
+    SOURCE_PLANTS,
+    SOURCE_TOTAL,
+    FusionSolarCoordinator,
+)
+
+PLANT_IDS = ["NE=100000", "NE=100001"]
+
+
+def _plant_stats(value: float) -> dict:
+    """Stats of a plant whose power is the given value"""
+    return {
+        "xAxis": ["2024-03-01 10:00", "2024-03-01 10:05"],
+        "productPower": [value, value],
+        "totalUsePower": value,
+    }
+
+
+class FakeClient:
+    """Returns stats whose value identifies the plant they were requested for"""
+
+    def __init__(self) -> None:
+        self.values = {plant_id: float(index + 1) for index, plant_id in enumerate(PLANT_IDS)}
+        self.failing: set[str] = set()
+        self.power_failing = False
+        self.power_requests = 0
+        self.stats_requests = 0
+        # called while a plant's stats are requested
+        self.on_request = None
+
+    async def get_power_status(self, refresh: bool = False) -> PowerStatus:
+        self.power_requests += 1
+
+        if self.power_failing:
+            raise ConnectionError("the account is offline")
+
+        return PowerStatus(current_power_kw=1.0, energy_today_kwh=2.0, energy_kwh=3.0)
+
+    async def get_plant_ids(self) -> list[str]:
+        return list(PLANT_IDS)
+
+    async def get_plant_stats(self, plant_id: str) -> dict:
+        self.stats_requests += 1
+
+        if self.on_request:
+            self.on_request(plant_id)
+
+        # let the other requests start
+        await asyncio.sleep(0)
+
+        if plant_id in self.failing:
+            raise ConnectionError(f"{plant_id} is offline")
+
+        return _plant_stats(self.values[plant_id])
+
+
+@pytest.fixture
+def client() -> FakeClient:
+    return FakeClient()
+
+
+@pytest.fixture
+async def coordinator(hass, client) -> FusionSolarCoordinator:
+    """A coordinator whose plant ids are known"""
+    entry = MockConfigEntry(domain=DOMAIN, data={}, options={})
+    entry.add_to_hass(hass)
+
+    coordinator = FusionSolarCoordinator(
+        hass, client, entry, FusionSolarSnapshotStore(hass, entry.entry_id)
+    )
+    await coordinator._async_update_plant_ids()
+
+    return coordinator
+
+
+def _get_power(data: dict, plant_id: str) -> float:
+    return data["plants"][plant_id]["productPower"]["value"]
+
+
+async def test_plants_are_fetched(coordinator, client):
+    """Every plant gets its own values"""
+    data = await coordinator._async_update_data()
+
+    assert data["total"]["current_power_kw"] == 1.0
+    assert {plant_id: _get_power(data, plant_id) for plant_id in PLANT_IDS} == client.values
+    assert data["plants"][PLANT_IDS[0]]["peak_power_kw"] == 1.0
+
+
+async def test_plant_list_changes_during_fetch(coordinator, client):
+    """A plant discovery during the fetch does not mix up the plants' values"""
+    new_plant_id = "NE=100002"
+
+    def discover_plants(plant_id: str) -> None:
+        # the discovery adds a plant in front of the known ones
+        coordinator.plant_ids = [new_plant_id, *PLANT_IDS]
+
+    client.on_request = discover_plants
+
+    data = await coordinator._async_update_data()
+
+    assert {plant_id: _get_power(data, plant_id) for plant_id in data["plants"]} == client.values
+
+
+async def test_plant_stats_are_slow_data(coordinator, client):
+    """With the default options, only the power status is fetched with every update"""
+    coordinator.async_add_tier_reader(SOURCE_TOTAL, TIER_FAST)
+    coordinator.async_add_tier_reader(SOURCE_PLANTS, TIER_SLOW)
+
+    first_data = await coordinator._async_update_data()
+    coordinator.async_set_updated_data(first_data)
+    data = await coordinator._async_update_data()
+
+    assert client.power_requests == 2
+    assert client.stats_requests == len(PLANT_IDS)
+    # the plants keep their values until the slow tier is due
+    assert data["plants"] == first_data["plants"]
+
+
+async def test_fast_reader_fetches_plants_with_every_update(coordinator, client):
+    """A plant sensor on the fast tier fetches the plant stats with every update"""
+    coordinator.async_add_tier_reader(SOURCE_PLANTS, TIER_FAST)
+
+    coordinator.async_set_updated_data(await coordinator._async_update_data())
+    await coordinator._async_update_data()
+
+    assert client.stats_requests == 2 * len(PLANT_IDS)
+
+
+async def test_kept_data_does_not_refresh_snapshot(coordinator, client):
+    """If every fetch fails, the kept values are returned but the snapshot keeps their fetch times"""
+    coordinator.async_add_tier_reader(SOURCE_TOTAL, TIER_FAST)
+    coordinator.async_add_tier_reader(SOURCE_PLANTS, TIER_FAST)
+
+    first_data = await coordinator._async_update_data()
+    coordinator.async_set_updated_data(first_data)
+    snapshot = dict(coordinator.snapshot_store._snapshot)
+
+    client.power_failing = True
+    client.failing = set(PLANT_IDS)
+    data = await coordinator._async_update_data()
+
+    assert data["total"] == first_data["total"]
+    assert data["plants"] == first_data["plants"]
+    assert data["stale_total"] is not None
+    assert set(data["stale_plants"]) == set(PLANT_IDS)
+
+    for key in ("updated", "total_updated", "plants_updated"):
+        assert coordinator.snapshot_store._snapshot[key] == snapshot[key]
+
+
+async def test_failed_plant_keeps_last_values(coordinator, client):
+    """A failed plant keeps its last values while the other plants are updated"""
+    coordinator.async_add_tier_reader(SOURCE_PLANTS, TIER_FAST)
+
+    first_data = await coordinator._async_update_data()
+    coordinator.async_set_updated_data(first_data)
+
+    client.failing = {PLANT_IDS[0]}
+    client.values[PLANT_IDS[1]] = 5.0
+    data = await coordinator._async_update_data()
+
+    assert data["plants"][PLANT_IDS[0]] == first_data["plants"][PLANT_IDS[0]]
+    assert _get_power(data, PLANT_IDS[1]) == 5.0
+    assert list(data["stale_plants"]) == [PLANT_IDS[0]]
+    # only the fetched plant is stored as fresh
+    plants_updated = coordinator.snapshot_store._snapshot["plants_updated"]
+    assert plants_updated[PLANT_IDS[1]] > plants_updated[PLANT_IDS[0]]